@@ -0,0 +1,151 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+benchmark_litserve.py
+=====================
+Gerador de carga para o /predict do server.py: dispara --requests requisições com
+--concurrency clientes simultâneos e mede vazão (req/s) e latências p50/p99.
+
+Para cada configuração em --batch-sizes o script sobe o server.py em um
+subprocesso (variáveis SENTIMENT_MAX_BATCH_SIZE, SENTIMENT_BATCH_TIMEOUT e
+SENTIMENT_PORT), espera o /health, aplica a carga e encerra o servidor. Com --url
+a carga vai para um servidor já em execução, sem subir nada.
+
+Run
+===
+uv run benchmark_litserve.py --batch-sizes 1,8,16,32 --concurrency 64 --requests 2000
+uv run benchmark_litserve.py --url http://localhost:8000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+SAMPLE_TEXTS = [
+    "O lucro líquido do banco cresceu 18% no trimestre, acima das projeções do mercado.",
+    "A empresa anunciou demissões e revisou para baixo o guidance de receita do ano.",
+    "O Copom manteve a taxa Selic inalterada, em linha com o esperado.",
+    "As ações da varejista despencaram após a divulgação de prejuízo bilionário.",
+    "A mineradora aprovou o pagamento de dividendos extraordinários aos acionistas.",
+    "O índice de inadimplência subiu pelo terceiro mês consecutivo.",
+    "A fusão deve gerar sinergias relevantes e ampliar a participação de mercado da companhia.",
+    "O dólar fechou estável, enquanto investidores aguardam dados de inflação nos EUA.",
+    "A agência rebaixou a nota de crédito da empresa, citando alavancagem elevada e fraca geração de caixa.",
+    "A receita de serviços avançou, mas a margem operacional foi pressionada pelos custos logísticos.",
+]
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+async def run_load(url: str, requests: int, concurrency: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    # Textos únicos por requisição, para que nenhum cache mascare o custo de inferência:
+    payloads = [{"input": f"{rng.choice(SAMPLE_TEXTS)} (#{i})"} for i in range(requests)]
+    queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+    latencies, errors = [], 0
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120.0) as client:
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                payload = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/predict", json=payload)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    errors += 1
+
+        # Aquecimento (carrega o modelo nos caches da CPU e abre as conexões):
+        await asyncio.gather(*(client.post("/predict", json={"input": text}) for text in SAMPLE_TEXTS))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else float("nan"),
+        "errors": errors,
+    }
+
+
+def start_server(env_overrides: dict, port: int, startup_timeout: float) -> subprocess.Popen:
+    """Sobe o server.py com as variáveis dadas e espera o /health responder."""
+    server_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    env = {**os.environ, **env_overrides, "SENTIMENT_PORT": str(port)}
+    process = subprocess.Popen([sys.executable, server_script], env=env, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server.py terminou durante a inicialização (código {process.returncode})")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).text == "ok":
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(1.0)
+    process.terminate()
+    raise TimeoutError("server.py não ficou pronto a tempo")
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def print_row(label: str, result: dict):
+    print(
+        f"{label:<28}{result['throughput']:>10.1f}{result['p50_ms']:>10.1f}"
+        f"{result['p99_ms']:>10.1f}{result['errors']:>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Servidor já em execução (não sobe o server.py)")
+    parser.add_argument("--batch-sizes", default="1,8,16,32", help="SENTIMENT_MAX_BATCH_SIZE a comparar")
+    parser.add_argument("--batch-timeout", type=float, default=0.01, help="SENTIMENT_BATCH_TIMEOUT (s)")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    print(f"{'configuração':<28}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'erros':>8}")
+    if args.url:
+        print_row(args.url, asyncio.run(run_load(args.url, args.requests, args.concurrency)))
+        return
+
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        env = {"SENTIMENT_MAX_BATCH_SIZE": str(batch_size), "SENTIMENT_BATCH_TIMEOUT": str(args.batch_timeout)}
+        process = start_server(env, args.port, args.startup_timeout)
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", args.requests, args.concurrency))
+        finally:
+            stop_server(process)
+        label = f"batch={batch_size}" + (f", espera={args.batch_timeout * 1000:.0f}ms" if batch_size > 1 else "")
+        print_row(label, result)
+
+
+if __name__ == "__main__":
+    main()
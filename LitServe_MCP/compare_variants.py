@@ -0,0 +1,148 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+compare_variants.py
+===================
+Relatório de acurácia x latência das variantes do modelo (fp32, int8, onnx) em CPU.
+
+Para cada variante mede:
+- tempo de carga;
+- latência de um texto por chamada (p50 / p99);
+- vazão em lote (textos/s com --batch-size);
+- concordância com o fp32 (mesmo rótulo) e diferença média do score;
+- acurácia contra os rótulos de --dataset (JSONL ou CSV com colunas text,label), se houver.
+
+Sem --dataset, as frases de exemplo do benchmark_litserve.py são usadas e só a
+concordância com o fp32 é reportada. O relatório sai em Markdown (--output).
+
+Run
+===
+uv run compare_variants.py --variants fp32,int8,onnx --threads 4 --output variants_report.md
+uv run compare_variants.py --dataset financial_pt.jsonl --batch-size 32
+"""
+import argparse
+import csv
+import json
+import statistics
+import time
+
+from benchmark_litserve import SAMPLE_TEXTS, percentile
+from model_variants import MODEL_VARIANTS, load_classifier
+from server import MODEL_NAME
+
+
+def load_dataset(path: str) -> tuple[list[str], list[str] | None]:
+    if path.endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    texts = [row["text"] for row in rows]
+    labels = [row["label"] for row in rows] if rows and "label" in rows[0] else None
+    return texts, labels
+
+
+def evaluate_variant(
+    model_name: str, variant: str, texts: list[str], threads: int, batch_size: int, single_calls: int
+) -> dict:
+    start = time.perf_counter()
+    classifier = load_classifier(model_name, variant, device="cpu", threads=threads)
+    load_seconds = time.perf_counter() - start
+
+    # Aquecimento:
+    classifier(texts[:batch_size], batch_size=batch_size, truncation=True)
+
+    latencies = []
+    for text in (texts * (single_calls // len(texts) + 1))[:single_calls]:
+        start = time.perf_counter()
+        classifier(text, truncation=True)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    predictions = classifier(texts, batch_size=batch_size, truncation=True)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "variant": variant,
+        "load_s": load_seconds,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput": len(texts) / batch_seconds,
+        "predictions": predictions,
+    }
+
+
+def build_report(results: list[dict], labels: list[str] | None, args) -> str:
+    reference = next((r["predictions"] for r in results if r["variant"] == "fp32"), None)
+    header = ["variante", "carga (s)", "p50 (ms)", "p99 (ms)", f"textos/s (lote {args.batch_size})"]
+    if reference is not None:
+        header += ["concordância c/ fp32", "Δ score médio"]
+    if labels is not None:
+        header.append("acurácia")
+
+    lines = [
+        f"# Variantes de {args.model} em CPU",
+        "",
+        f"{len(results[0]['predictions'])} textos, {args.threads} threads, {args.single_calls} chamadas unitárias.",
+        "",
+        "| " + " | ".join(header) + " |",
+        "|" + "---|" * len(header),
+    ]
+    for result in results:
+        predictions = result["predictions"]
+        row = [
+            result["variant"],
+            f"{result['load_s']:.1f}",
+            f"{result['p50_ms']:.1f}",
+            f"{result['p99_ms']:.1f}",
+            f"{result['throughput']:.1f}",
+        ]
+        if reference is not None:
+            agreement = statistics.mean(p["label"] == r["label"] for p, r in zip(predictions, reference))
+            score_delta = statistics.mean(
+                abs(p["score"] - r["score"]) for p, r in zip(predictions, reference) if p["label"] == r["label"]
+            ) if agreement else float("nan")
+            row += [f"{agreement:.2%}", f"{score_delta:.4f}"]
+        if labels is not None:
+            accuracy = statistics.mean(p["label"].lower() == str(l).lower() for p, l in zip(predictions, labels))
+            row.append(f"{accuracy:.2%}")
+        lines.append("| " + " | ".join(row) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--variants", default=",".join(MODEL_VARIANTS))
+    parser.add_argument("--dataset", help="JSONL ou CSV com colunas text e (opcional) label")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--single-calls", type=int, default=200, help="Chamadas de um texto para p50/p99")
+    parser.add_argument("--output", help="Arquivo Markdown para salvar o relatório")
+    args = parser.parse_args()
+
+    if args.dataset:
+        texts, labels = load_dataset(args.dataset)
+    else:
+        texts, labels = SAMPLE_TEXTS * 20, None
+
+    results = []
+    for variant in args.variants.split(","):
+        try:
+            results.append(evaluate_variant(args.model, variant, texts, args.threads, args.batch_size, args.single_calls))
+        except ImportError as e:
+            print(f"Variante '{variant}' ignorada: {e}")
+
+    if not results:
+        return
+    report = build_report(results, labels, args)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+
+if __name__ == "__main__":
+    main()
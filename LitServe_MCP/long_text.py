@@ -0,0 +1,176 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+long_text.py
+============
+Sentimento de documentos longos por janelas de tokens sobrepostas.
+
+O texto é tokenizado uma única vez, em blocos de caracteres cortados em espaços
+em branco (o pré-tokenizador do BERT já separa palavras nos espaços, então o
+resultado é o mesmo de tokenizar tudo de uma vez). Os tokens fluem por um
+gerador de janelas de `window_tokens` tokens com `overlap` tokens de
+sobreposição. As janelas são classificadas em lotes de `batch_size`, um forward
+por lote, e as probabilidades são somadas à medida que chegam. Nem a lista
+completa de tokens nem todos os logits ficam em memória: o custo extra é
+limitado a um bloco de texto e um lote de janelas.
+
+O rótulo final é o argmax da média das probabilidades das janelas, ponderada
+pelo número de tokens de cada janela.
+"""
+import functools
+import os
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import torch
+
+WINDOW_OVERLAP = int(os.environ.get("SENTIMENT_WINDOW_OVERLAP", "64"))
+WINDOW_BATCH_SIZE = int(os.environ.get("SENTIMENT_WINDOW_BATCH_SIZE", "16"))
+TOKENIZE_CHUNK_CHARS = 20_000
+
+
+@dataclass
+class LongDocument:
+    """Pedido de classificação em modo documento longo (saída do decode_request)."""
+
+    text: str
+    window_tokens: int | None = None
+    overlap: int = WINDOW_OVERLAP
+    return_windows: bool = True
+
+
+def iter_text_chunks(text: str, chunk_chars: int = TOKENIZE_CHUNK_CHARS) -> Iterator[tuple[int, str]]:
+    """Blocos (posição inicial, trecho) cortados no último espaço antes de `chunk_chars`."""
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            cut = max(text.rfind(" ", start, end), text.rfind("\n", start, end))
+            if cut > start:
+                end = cut
+        yield start, text[start:end]
+        start = end
+
+
+def iter_tokens(tokenizer, text: str) -> Iterator[tuple[int, int, int]]:
+    """(id do token, início, fim no texto original), bloco a bloco."""
+    for offset, chunk in iter_text_chunks(text):
+        encoding = tokenizer(chunk, add_special_tokens=False, return_offsets_mapping=True)
+        for token_id, (start, end) in zip(encoding["input_ids"], encoding["offset_mapping"]):
+            yield token_id, offset + start, offset + end
+
+
+def iter_windows(tokens: Iterator[tuple[int, int, int]], window_tokens: int, overlap: int) -> Iterator[list]:
+    """Janelas de até `window_tokens` tokens; janelas consecutivas compartilham `overlap` tokens."""
+    step = window_tokens - overlap
+    window = deque()
+    new_tokens = 0
+    emitted = False
+    for token in tokens:
+        window.append(token)
+        new_tokens += 1
+        if len(window) == window_tokens:
+            yield list(window)
+            emitted = True
+            for _ in range(step):
+                window.popleft()
+            new_tokens = 0
+    # Sobra final (ou o documento inteiro, mesmo vazio, se coube em uma janela só):
+    if new_tokens or not emitted:
+        yield list(window)
+
+
+def max_window_tokens(tokenizer, config) -> int:
+    """Tokens de conteúdo que cabem no modelo, descontando [CLS] e [SEP]."""
+    limit = min(tokenizer.model_max_length, getattr(config, "max_position_embeddings", 512))
+    return limit - tokenizer.num_special_tokens_to_add(pair=False)
+
+
+@functools.cache
+def model_window_limit(model_name: str) -> int:
+    """max_window_tokens de `model_name` lido só do tokenizer e da configuração, sem os pesos.
+
+    Usado pelo servidor de API para validar window_tokens/overlap antes de o pedido
+    entrar num lote.
+    """
+    from transformers import AutoConfig, AutoTokenizer
+
+    return max_window_tokens(AutoTokenizer.from_pretrained(model_name), AutoConfig.from_pretrained(model_name))
+
+
+def _batched(iterable: Iterator, size: int) -> Iterator[list]:
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def classify_long_text(classifier, document: LongDocument, batch_size: int = WINDOW_BATCH_SIZE) -> dict:
+    """Classificar `document.text` por janelas e agregar os scores.
+
+    `classifier` é o pipeline do model_variants.load_classifier (usa-se o modelo e o
+    tokenizer dele diretamente, para controlar as janelas e os lotes).
+    """
+    tokenizer, model = classifier.tokenizer, classifier.model
+    labels = [model.config.id2label[i] for i in range(len(model.config.id2label))]
+    limit = max_window_tokens(tokenizer, model.config)
+    window_tokens = min(document.window_tokens or limit, limit)
+    if not 0 <= document.overlap < window_tokens:
+        raise ValueError(f"overlap deve estar entre 0 e {window_tokens - 1}.")
+
+    weighted_sum = torch.zeros(len(labels))
+    total_weight = 0
+    num_windows = 0
+    num_tokens = 0
+    windows = []
+
+    tokens = iter_tokens(tokenizer, document.text)
+    for batch in _batched(iter_windows(tokens, window_tokens, document.overlap), batch_size):
+        inputs = tokenizer.pad(
+            {"input_ids": [tokenizer.build_inputs_with_special_tokens([t[0] for t in w]) for w in batch]},
+            return_tensors="pt",
+        )
+        if "token_type_ids" in tokenizer.model_input_names:
+            inputs["token_type_ids"] = torch.zeros_like(inputs["input_ids"])
+        inputs = inputs.to(getattr(model, "device", "cpu"))
+        with torch.inference_mode():
+            probabilities = torch.softmax(model(**inputs).logits.float(), dim=-1).cpu()
+
+        lengths = torch.tensor([max(len(w), 1) for w in batch], dtype=torch.float32)
+        weighted_sum += (probabilities * lengths[:, None]).sum(dim=0)
+        total_weight += float(lengths.sum())
+        for window, probs in zip(batch, probabilities):
+            best = int(probs.argmax())
+            if document.return_windows:
+                windows.append({
+                    "index": num_windows,
+                    "start_char": window[0][1] if window else 0,
+                    "end_char": window[-1][2] if window else 0,
+                    "label": labels[best],
+                    "score": float(probs[best]),
+                    "scores": {label: float(p) for label, p in zip(labels, probs)},
+                })
+            num_windows += 1
+            # Tokens novos desta janela (sem contar a sobreposição com a anterior):
+            num_tokens += len(window) - (document.overlap if num_windows > 1 else 0)
+
+    mean = weighted_sum / total_weight
+    best = int(mean.argmax())
+    result = {
+        "label": labels[best],
+        "score": float(mean[best]),
+        "scores": {label: float(p) for label, p in zip(labels, mean)},
+        "num_windows": num_windows,
+        "num_tokens": num_tokens,
+        "window_tokens": window_tokens,
+        "overlap": document.overlap,
+    }
+    if document.return_windows:
+        result["windows"] = windows
+    return result
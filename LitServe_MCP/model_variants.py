@@ -0,0 +1,88 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+model_variants.py
+=================
+Carregamento do classificador de sentimento em três variantes para CPU:
+
+- "fp32": o modelo original, em precisão cheia;
+- "int8": quantização dinâmica do PyTorch (pesos das camadas Linear em int8,
+  ativações quantizadas em tempo de execução). Não exige calibração;
+- "onnx": modelo exportado para ONNX e executado pelo ONNX Runtime (requer o
+  pacote opcional 'optimum[onnxruntime]').
+
+As três retornam um pipeline "sentiment-analysis" do transformers, com a
+mesma interface usada pelo server.py.
+"""
+import os
+import shutil
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+MODEL_VARIANTS = ("fp32", "int8", "onnx")
+ONNX_DIR = os.environ.get("SENTIMENT_ONNX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_models"))
+
+
+def configure_threads(threads: int):
+    """Fixar as threads de inferência deste processo (intra-op) e desligar o paralelismo inter-op."""
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Só pode ser chamado antes do primeiro trabalho paralelo do processo.
+        pass
+
+
+def _import_ort_model():
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError(
+            "A variante 'onnx' requer o pacote 'optimum[onnxruntime]'. Instale com: uv add 'optimum[onnxruntime]'"
+        ) from e
+    return ORTModelForSequenceClassification
+
+
+def load_classifier(model_name: str, variant: str = "fp32", device="cpu", threads: int | None = None):
+    """Pipeline de classificação do `model_name` na variante pedida."""
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"Variante '{variant}' não suportada. Use uma de {list(MODEL_VARIANTS)}.")
+    if threads is not None:
+        configure_threads(threads)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if variant == "fp32":
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, device=device)
+
+    if str(device) != "cpu":
+        raise ValueError(f"A variante '{variant}' é só para CPU (dispositivo recebido: {device}).")
+
+    if variant == "int8":
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, device="cpu")
+
+    ORTModelForSequenceClassification = _import_ort_model()
+    import onnxruntime
+
+    session_options = onnxruntime.SessionOptions()
+    if threads is not None:
+        session_options.intra_op_num_threads = threads
+        session_options.inter_op_num_threads = 1
+
+    # A exportação para ONNX é feita uma vez e reaproveitada entre execuções e workers.
+    export_dir = os.path.join(ONNX_DIR, model_name.replace("/", "__"))
+    if not os.path.isdir(export_dir):
+        # Cada worker exporta numa pasta própria; o primeiro a renomear vence.
+        tmp_dir = f"{export_dir}.tmp-{os.getpid()}"
+        ORTModelForSequenceClassification.from_pretrained(model_name, export=True).save_pretrained(tmp_dir)
+        tokenizer.save_pretrained(tmp_dir)
+        try:
+            os.rename(tmp_dir, export_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    model = ORTModelForSequenceClassification.from_pretrained(export_dir, session_options=session_options)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
@@ -0,0 +1,190 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+result_cache.py
+===============
+Cache dos resultados de sentimento, na frente do predict do server.py.
+
+A chave é o texto normalizado (Unicode NFKC, espaços colapsados e, opcionalmente,
+sem diferença de maiúsculas), com o nome e a variante do modelo como namespace,
+guardada como hash SHA-256. Assim, textos que só diferem em espaços ou na forma
+Unicode compartilham o resultado, e textos longos não viram chaves enormes.
+
+Os resultados ficam em um LRU em memória por worker e, opcionalmente, em um
+arquivo SQLite (SENTIMENT_CACHE_DB). O arquivo é compartilhado por todos os
+workers e sobrevive a reinicializações.
+
+As métricas de acerto de cada worker vão pelo logger do LitServe
+(`LitAPI.log`) até o CacheMetricsLogger. Ele soma as métricas de todos os
+workers e as grava num arquivo JSON, lido pelo endpoint GET /cache/stats
+(metrics_app). O arquivo é SENTIMENT_CACHE_METRICS ou, por padrão, um por porta
+no diretório temporário, para que dois servidores não misturem as métricas.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import litserve as ls
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+CACHE_SIZE = int(os.environ.get("SENTIMENT_CACHE_SIZE", "10000"))
+CACHE_DB = os.environ.get("SENTIMENT_CACHE_DB")
+CACHE_CASEFOLD = os.environ.get("SENTIMENT_CACHE_CASEFOLD", "0") == "1"
+METRICS_PATH = os.environ.get("SENTIMENT_CACHE_METRICS")
+METRICS_KEY = "result_cache"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str, casefold: bool = False) -> str:
+    text = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return text.casefold() if casefold else text
+
+
+class ResultCache:
+    """LRU em memória com armazenamento opcional em SQLite (compartilhado entre workers)."""
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = CACHE_SIZE,
+        db_path: str | None = CACHE_DB,
+        casefold: bool = CACHE_CASEFOLD,
+    ):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.casefold = casefold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, payload TEXT NOT NULL)")
+
+    def key(self, text: str) -> str:
+        normalized = normalize_text(text, self.casefold)
+        return hashlib.sha256(f"{self.namespace}\x00{normalized}".encode()).hexdigest()
+
+    def get_many(self, keys: list[str]) -> list:
+        """Resultados em cache para cada chave (None nas ausentes)."""
+        with self._lock:
+            results = [self._entries.get(key) for key in keys]
+            missing = list({key for key, result in zip(keys, results) if result is None})
+            if missing and self._db is not None:
+                placeholders = ",".join("?" * len(missing))
+                rows = self._db.execute(
+                    f"SELECT key, payload FROM results WHERE key IN ({placeholders})", missing
+                ).fetchall()
+                found = {key: json.loads(payload) for key, payload in rows}
+                for key, result in found.items():
+                    self._remember(key, result)
+                results = [result if result is not None else found.get(key) for key, result in zip(keys, results)]
+            for key, result in zip(keys, results):
+                if result is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+            return results
+
+    def set_many(self, items: dict):
+        with self._lock:
+            for key, result in items.items():
+                self._remember(key, result)
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO results (key, payload) VALUES (?, ?)",
+                        [(key, json.dumps(result)) for key, result in items.items()],
+                    )
+
+    def _remember(self, key: str, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "persistent": self._db is not None,
+            }
+
+
+def default_metrics_path(port: int) -> str:
+    return os.path.join(tempfile.gettempdir(), f"sentiment_cache_metrics_{port}.json")
+
+
+class CacheMetricsLogger(ls.Logger):
+    """Soma as métricas de cache enviadas pelos workers e as grava em `metrics_path`.
+
+    O processamento roda no processo de logger do LitServe e o endpoint
+    (metrics_app), nos servidores de API; os dois se comunicam pelo arquivo.
+    O logger só guarda o caminho e os contadores, então vai para o processo de
+    logger como está.
+    """
+
+    def __init__(self, metrics_path: str):
+        super().__init__()
+        self.metrics_path = metrics_path
+        self._workers = {}
+        # Zera as métricas de uma execução anterior:
+        write_metrics(aggregate_metrics([]), metrics_path)
+
+    def process(self, key, value):
+        if key != METRICS_KEY:
+            return
+        # Cada worker envia seus contadores acumulados; guarda-se o último de cada um.
+        self._workers[value["worker"]] = value
+        write_metrics(aggregate_metrics(list(self._workers.values())), self.metrics_path)
+
+
+def aggregate_metrics(workers: list[dict]) -> dict:
+    hits = sum(w["hits"] for w in workers)
+    misses = sum(w["misses"] for w in workers)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+        "entries_per_worker": {str(w["worker"]): w["entries"] for w in workers},
+        "persistent": any(w["persistent"] for w in workers),
+        "updated_at": time.time(),
+    }
+
+
+def write_metrics(metrics: dict, path: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metrics, f)
+    os.replace(tmp_path, path)
+
+
+def metrics_app(metrics_path: str) -> Starlette:
+    """App com GET /stats, que devolve as métricas gravadas pelo CacheMetricsLogger em `metrics_path`."""
+
+    async def read_metrics(request):
+        try:
+            with open(metrics_path, encoding="utf-8") as f:
+                return JSONResponse(json.load(f))
+        except FileNotFoundError:
+            return JSONResponse({"hits": 0, "misses": 0, "hit_ratio": 0.0, "entries_per_worker": {}})
+
+    return Starlette(routes=[Route("/stats", read_metrics)])
@@ -2,32 +2,142 @@
 """
 Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
 
+Batching dinâmico: requisições que chegam juntas (HTTP ou ferramenta MCP, que
+usa a mesma rota) são agrupadas em um lote de até SENTIMENT_MAX_BATCH_SIZE textos,
+esperando no máximo SENTIMENT_BATCH_TIMEOUT segundos para o lote encher, e
+passam pelo modelo em um único forward. Com SENTIMENT_MAX_BATCH_SIZE=1 cada
+requisição é processada sozinha, como antes.
+
+Inferência em CPU: SENTIMENT_WORKERS processos de inferência, cada um com
+SENTIMENT_THREADS_PER_WORKER threads fixas (padrão: núcleos / workers, para que
+os workers não disputem os mesmos núcleos). SENTIMENT_MODEL_VARIANT escolhe o
+modelo: "fp32" (padrão), "int8" (quantização dinâmica) ou "onnx" (ONNX Runtime);
+veja model_variants.py e compare_variants.py.
+
+Os resultados passam por um cache LRU chaveado pelo texto normalizado
+(result_cache.py): SENTIMENT_CACHE_SIZE entradas por worker (0 desliga) e, com
+SENTIMENT_CACHE_DB, um SQLite compartilhado e persistente. Como a ferramenta MCP
+usa a mesma rota /predict, os dois caminhos passam pelo cache. A taxa de acerto
+de todos os workers fica em GET /cache/stats.
+
+Documentos longos: com "long_text": true o texto é dividido em janelas de tokens
+sobrepostas (long_text.py), classificadas em lotes, e a resposta traz o rótulo
+agregado e os scores de cada janela. Sem a opção, textos acima do limite do
+modelo são truncados.
+
 Run
 ===
 uv run server.py
+SENTIMENT_MAX_BATCH_SIZE=32 SENTIMENT_BATCH_TIMEOUT=0.02 uv run server.py
+SENTIMENT_WORKERS=4 SENTIMENT_MODEL_VARIANT=int8 uv run server.py
 """
-from transformers import pipeline
-from pydantic import BaseModel
+import os
+from pydantic import BaseModel, Field, model_validator
 from litserve.mcp import MCP
 import litserve as ls
+from model_variants import load_classifier
+from long_text import WINDOW_OVERLAP, LongDocument, classify_long_text, model_window_limit
+from result_cache import (
+    CACHE_SIZE, METRICS_KEY, METRICS_PATH, CacheMetricsLogger, ResultCache, default_metrics_path, metrics_app
+)
+
+MODEL_NAME = "lucas-leme/FinBERT-PT-BR"
+MODEL_VARIANT = os.environ.get("SENTIMENT_MODEL_VARIANT", "fp32")
+MAX_BATCH_SIZE = int(os.environ.get("SENTIMENT_MAX_BATCH_SIZE", "16"))
+BATCH_TIMEOUT = float(os.environ.get("SENTIMENT_BATCH_TIMEOUT", "0.01"))
+PORT = int(os.environ.get("SENTIMENT_PORT", "8000"))
+ACCELERATOR = os.environ.get("SENTIMENT_ACCELERATOR", "auto")
+WORKERS = int(os.environ.get("SENTIMENT_WORKERS", "1"))
+THREADS_PER_WORKER = int(os.environ.get("SENTIMENT_THREADS_PER_WORKER", max(1, (os.cpu_count() or 1) // WORKERS)))
 
 class TextClassificationRequest(BaseModel):
     input: str
+    long_text: bool = False
+    window_tokens: int | None = Field(None, ge=1)
+    overlap: int | None = Field(None, ge=0)
+    return_windows: bool = True
+
+    @model_validator(mode="after")
+    def check_window(self):
+        # Validado aqui (422 só para este pedido): um erro dentro do lote derrubaria os pedidos vizinhos.
+        if not self.long_text:
+            return self
+        limit = model_window_limit(MODEL_NAME)
+        if self.window_tokens is not None and self.window_tokens > limit:
+            raise ValueError(f"window_tokens deve estar entre 1 e {limit} para este modelo.")
+        window_tokens = self.window_tokens or limit
+        overlap = WINDOW_OVERLAP if self.overlap is None else self.overlap
+        if overlap >= window_tokens:
+            raise ValueError(f"overlap deve estar entre 0 e {window_tokens - 1}.")
+        return self
 
 class TextClassificationAPI(ls.LitAPI):
     def setup(self, device):
-        self.model = pipeline("sentiment-analysis", model="lucas-leme/FinBERT-PT-BR", device=device)
+        threads = THREADS_PER_WORKER if str(device) == "cpu" else None
+        self.model = load_classifier(MODEL_NAME, MODEL_VARIANT, device=device, threads=threads)
+        # Um resultado só vale para o mesmo modelo e variante:
+        self.cache = ResultCache(namespace=f"{MODEL_NAME}:{MODEL_VARIANT}") if CACHE_SIZE > 0 else None
 
     def decode_request(self, request: TextClassificationRequest):
-        return request.input
+        if not request.long_text:
+            return request.input
+        document = LongDocument(request.input, request.window_tokens, return_windows=request.return_windows)
+        if request.overlap is not None:
+            document.overlap = request.overlap
+        return document
 
     def predict(self, x):
-        return self.model(x)
-    
+        # Com batching, x é a lista de textos do lote (o LitAPI.batch padrão mantém a
+        # lista e o pipeline faz o padding); sem batching, um único texto.
+        items = x if isinstance(x, list) else [x]
+        outputs = [None] * len(items)
+        short = [i for i, item in enumerate(items) if isinstance(item, str)]
+        if short:
+            for i, output in zip(short, self.classify([items[i] for i in short])):
+                outputs[i] = output
+        # Documentos longos fazem o próprio lote de janelas (e não passam pelo cache):
+        for i, item in enumerate(items):
+            if isinstance(item, LongDocument):
+                outputs[i] = classify_long_text(self.model, item)
+        return outputs if isinstance(x, list) else outputs[0]
+
+    def classify(self, texts: list[str]) -> list[dict]:
+        if self.cache is None:
+            return self.model(texts, batch_size=len(texts), truncation=True)
+
+        keys = [self.cache.key(text) for text in texts]
+        outputs = self.cache.get_many(keys)
+        # Textos ausentes do cache (e repetidos dentro do lote) passam uma única vez pelo modelo:
+        pending = {}
+        for key, text, output in zip(keys, texts, outputs):
+            if output is None:
+                pending.setdefault(key, text)
+        if pending:
+            computed = dict(zip(pending, self.model(list(pending.values()), batch_size=len(pending), truncation=True)))
+            self.cache.set_many(computed)
+            outputs = [output if output is not None else computed[key] for key, output in zip(keys, outputs)]
+        self.log(METRICS_KEY, {"worker": os.getpid(), **self.cache.stats()})
+        return outputs
+
     def encode_response(self, output):
-        return output[0]
+        return output
 
 if __name__ == "__main__":
-    api = TextClassificationAPI(mcp=MCP(description="Classifica sentimentos em textos"))
-    server = ls.LitServer(api)
-    server.run(port=8000)
+    # Herdado pelos workers: limita também os pools de threads do OpenMP/MKL e dos tokenizers.
+    os.environ.setdefault("OMP_NUM_THREADS", str(THREADS_PER_WORKER))
+    os.environ.setdefault("MKL_NUM_THREADS", str(THREADS_PER_WORKER))
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    # Carregado antes de os servidores de API subirem (por fork), para validar os pedidos sem esperar:
+    model_window_limit(MODEL_NAME)
+
+    api = TextClassificationAPI(
+        max_batch_size=MAX_BATCH_SIZE,
+        batch_timeout=BATCH_TIMEOUT,
+        mcp=MCP(description="Classifica sentimentos em textos"),
+    )
+    metrics_path = METRICS_PATH or default_metrics_path(PORT)
+    server = ls.LitServer(
+        api, accelerator=ACCELERATOR, workers_per_device=WORKERS, loggers=[CacheMetricsLogger(metrics_path)]
+    )
+    server.app.mount("/cache", metrics_app(metrics_path))
+    server.run(port=PORT)
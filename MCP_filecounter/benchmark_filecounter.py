@@ -0,0 +1,141 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+Script benchmark_filecounter.py
+===============================
+Gera uma árvore sintética (fanout^1 + ... + fanout^depth pastas, com
+--files-per-dir arquivos pequenos em cada uma) e compara:
+
+- os.walk + os.path.getsize (um stat extra por arquivo, uma thread);
+- dir_stats.collect_stats com 1 thread;
+- dir_stats.collect_stats com N threads (com e sem leitura de tamanhos);
+- dir_index.DirIndex: construção do índice, consulta repetida sem mudanças e
+  consulta depois de criar um arquivo em --touch-dirs pastas.
+
+A árvore fica em --root (reaproveitada se já existir) ou em uma pasta temporária
+removida ao final. Para medir a leitura do disco e não do page cache, esvazie o
+cache entre as execuções (ex.: `echo 3 | sudo tee /proc/sys/vm/drop_caches`).
+
+Run
+===
+uv run benchmark_filecounter.py --fanout 10 --depth 3 --files-per-dir 200 --workers 16
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from contextlib import suppress
+
+from dir_index import RACY_WINDOW_NS, DirIndex
+from dir_stats import DEFAULT_WORKERS, collect_stats
+
+
+EXTENSIONS = [".py", ".txt", ".csv", ".json", ".md", ".png", ""]
+
+
+def build_tree(root: str, fanout: int, depth: int, files_per_dir: int, seed: int = 0) -> int:
+    """Criar a árvore sintética e retornar quantos arquivos foram criados."""
+    rng = random.Random(seed)
+    created = 0
+    level = [root]
+    for _ in range(depth):
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                folder = os.path.join(parent, f"d{i}")
+                os.makedirs(folder, exist_ok=True)
+                for j in range(files_per_dir):
+                    with open(os.path.join(folder, f"f{j}{rng.choice(EXTENSIONS)}"), "wb") as f:
+                        f.write(b"x" * rng.randint(0, 512))
+                    created += 1
+                next_level.append(folder)
+        level = next_level
+    return created
+
+
+def walk_baseline(root: str) -> tuple[int, int]:
+    """Abordagem ingênua: os.walk e um os.path.getsize por arquivo."""
+    files = total_bytes = 0
+    for folder, _, names in os.walk(root):
+        for name in names:
+            files += 1
+            total_bytes += os.path.getsize(os.path.join(folder, name))
+    return files, total_bytes
+
+
+def timed(label: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    files = result[0] if isinstance(result, tuple) else result.files
+    print(f"{label:<46}{elapsed:>9.3f}s{files / elapsed:>14,.0f} arquivos/s")
+    return result
+
+
+def benchmark_index(root: str, workers: int, touch_dirs: int, expected_files: int):
+    """Construção do índice, consulta repetida e consulta após alterar algumas pastas."""
+    db_dir = tempfile.mkdtemp(prefix="filecounter-index-")
+    index = DirIndex(os.path.join(db_dir, "index.sqlite"), max_workers=workers)
+    folders = sorted(folder for folder, _, _ in os.walk(root))[1 : touch_dirs + 1]
+    try:
+        # Pastas alteradas dentro da janela "racy" seriam revarridas de novo; espera-se ela passar.
+        newest = max(os.stat(folder).st_mtime_ns for folder, _, _ in os.walk(root))
+        time.sleep(max(0.0, (newest + RACY_WINDOW_NS - time.time_ns()) / 1e9))
+
+        timed("índice: construção", index.stats, root)
+        timed("índice: consulta repetida", index.stats, root)
+        print(f"{'':<46}{index.last_refresh['directories_rescanned']} pastas revarridas")
+
+        for folder in folders:
+            with open(os.path.join(folder, "novo.txt"), "w") as f:
+                f.write("x")
+        time.sleep(RACY_WINDOW_NS / 1e9)
+        stats = timed(f"índice: após alterar {len(folders)} pastas", index.stats, root)
+        print(f"{'':<46}{index.last_refresh['directories_rescanned']} pastas revarridas")
+        assert stats.files == expected_files + len(folders), "índice desatualizado"
+    finally:
+        index.close()
+        shutil.rmtree(db_dir, ignore_errors=True)
+        for folder in folders:
+            with suppress(FileNotFoundError):
+                os.remove(os.path.join(folder, "novo.txt"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", help="Onde criar (ou reaproveitar) a árvore sintética")
+    parser.add_argument("--fanout", type=int, default=8, help="Subpastas por pasta")
+    parser.add_argument("--depth", type=int, default=3, help="Níveis de subpastas")
+    parser.add_argument("--files-per-dir", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--touch-dirs", type=int, default=10, help="Pastas alteradas antes da consulta incremental")
+    args = parser.parse_args()
+
+    root = args.root or tempfile.mkdtemp(prefix="filecounter-bench-")
+    os.makedirs(root, exist_ok=True)
+    try:
+        if not os.listdir(root):
+            start = time.perf_counter()
+            created = build_tree(root, args.fanout, args.depth, args.files_per_dir)
+            print(f"Árvore sintética: {created:,} arquivos em {root} ({time.perf_counter() - start:.1f}s)\n")
+
+        baseline_files, baseline_bytes = timed("os.walk + getsize", walk_baseline, root)
+        timed("collect_stats (1 thread)", collect_stats, root, max_workers=1)
+        stats = timed(f"collect_stats ({args.workers} threads)", collect_stats, root, max_workers=args.workers)
+        timed(f"collect_stats ({args.workers} threads, sem tamanhos)", collect_stats, root,
+              max_workers=args.workers, with_sizes=False)
+
+        assert (stats.files, stats.total_bytes) == (baseline_files, baseline_bytes), "contagens divergentes"
+        print(f"\n{stats.files:,} arquivos, {stats.directories:,} pastas, {stats.total_bytes:,} bytes\n")
+
+        benchmark_index(root, args.workers, args.touch_dirs, stats.files)
+    finally:
+        if args.root is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
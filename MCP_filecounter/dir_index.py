@@ -0,0 +1,275 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+Script dir_index.py
+===================
+Índice persistente (SQLite) de diretórios para consultas repetidas do FileCounter.
+
+Para cada diretório o índice guarda o mtime, as estatísticas locais (arquivos,
+bytes, extensões, links...) e os nomes das subpastas, mas não uma linha por
+arquivo. Uma consulta percorre a árvore pelo índice e só faz `scandir` dos
+diretórios cujo mtime mudou (entrada criada, removida ou renomeada), então uma
+árvore inalterada custa um stat por diretório em vez de um por arquivo.
+
+Limitação do modo sem watcher: alterar o conteúdo de um arquivo não muda o mtime
+da pasta, então os bytes daquele arquivo ficam desatualizados até a pasta mudar.
+Diretórios modificados no mesmo instante da varredura são revarridos na
+consulta seguinte (mesma ideia do "racy clean" do git).
+
+Com um watcher (watch_roots, que usa o pacote opcional 'watchfiles'/inotify) as
+mudanças marcam as pastas como sujas. Depois da primeira validação completa de
+uma raiz observada, as consultas só revarrem as pastas sujas, sem stat nenhum
+nas demais, o que também captura alterações de tamanho.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dir_stats import DEFAULT_WORKERS, DirStats, scan_into
+
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "filecounter_index.sqlite")
+
+# Pastas alteradas há menos que isto (em relação à varredura) são revarridas na próxima consulta:
+RACY_WINDOW_NS = 2_000_000_000
+# Acima disto o watcher desiste do rastreamento fino e a próxima consulta volta a checar todos os mtimes:
+MAX_DIRTY_PATHS = 100_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    scanned_ns INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+"""
+
+
+def scan_directory(path: str) -> tuple[int, dict]:
+    """Varrer um único diretório e retornar (mtime_ns, payload com as estatísticas locais)."""
+    # O mtime é lido antes do scandir: uma mudança durante a varredura deixa a pasta suja.
+    mtime_ns = os.stat(path).st_mtime_ns
+    local = DirStats()
+    subdirs = scan_into(local, path, 1)
+    payload = {
+        "files": local.files,
+        "symlinks": local.symlinks,
+        "other": local.other,
+        "bytes": local.total_bytes,
+        "errors": local.errors,
+        "extensions": {ext: [count, local.extension_bytes[ext]] for ext, count in local.extension_files.items()},
+        "subdirs": sorted(os.path.basename(subdir) for subdir, _ in subdirs),
+    }
+    return mtime_ns, payload
+
+
+def add_payload(stats: DirStats, payload: dict, depth: int):
+    """Somar as estatísticas locais de uma pasta (suas entradas ficam na profundidade `depth`)."""
+    directories = len(payload["subdirs"])
+    stats.files += payload["files"]
+    stats.directories += directories
+    stats.symlinks += payload["symlinks"]
+    stats.other += payload["other"]
+    stats.total_bytes += payload["bytes"]
+    stats.errors += payload["errors"]
+    for ext, (count, size) in payload["extensions"].items():
+        stats.extension_files[ext] += count
+        stats.extension_bytes[ext] += size
+    if payload["files"]:
+        stats.depth_files[depth] += payload["files"]
+        stats.depth_bytes[depth] += payload["bytes"]
+    if directories:
+        stats.depth_directories[depth] += directories
+
+
+def _subtree_bounds(path: str) -> tuple[str, str]:
+    # Caminhos abaixo de `path` ficam entre "path/" e "path0" ('0' vem logo após '/').
+    prefix = path.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+class DirIndex:
+    """Índice SQLite de diretórios com atualização incremental por mtime."""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH, max_workers: int = DEFAULT_WORKERS):
+        self.db_path = db_path
+        self.max_workers = max(1, max_workers)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._watched = set()
+        self._trusted = set()
+        self.last_refresh = {}
+
+    # --- Integração com o watcher ---------------------------------------------------
+
+    def start_watching(self, roots: list[str]):
+        with self._lock:
+            self._watched.update(os.path.abspath(root) for root in roots)
+
+    def stop_watching(self, roots: list[str]):
+        with self._lock:
+            for root in roots:
+                root = os.path.abspath(root)
+                self._watched.discard(root)
+                self._trusted = {t for t in self._trusted if not _is_within(t, root)}
+
+    def mark_dirty(self, paths):
+        """Registrar caminhos alterados (arquivos ou pastas) vindos do watcher."""
+        with self._lock:
+            for path in paths:
+                self._dirty.add(os.path.dirname(path))
+                self._dirty.add(path)
+            if len(self._dirty) > MAX_DIRTY_PATHS:
+                self._dirty.clear()
+                self._trusted.clear()
+
+    def _watched_root(self, path: str) -> bool:
+        return any(_is_within(path, root) for root in self._watched)
+
+    # --- Consulta -------------------------------------------------------------------
+
+    def stats(self, root: str) -> DirStats:
+        """Estatísticas recursivas de `root`, revarrendo só o que mudou desde a última consulta."""
+        root = os.path.abspath(os.path.expanduser(root))
+        if not os.path.isdir(root):
+            raise NotADirectoryError(f"'{root}' não existe ou não é um diretório.")
+
+        with self._lock:
+            start = time.perf_counter()
+            rows = self._load_subtree(root)
+            trusted = any(_is_within(root, t) for t in self._trusted) and self._watched_root(root)
+            dirty = {path for path in self._dirty if _is_within(path, root)}
+            self._dirty -= dirty
+
+            total = DirStats()
+            checked = rescanned = 0
+            updates, removed = [], []
+            frontier = [root]
+            depth = 1
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dir-index") as executor:
+                while frontier:
+                    # Com watcher confiável só as pastas sujas (ou novas) são tocadas; sem ele, um stat por pasta.
+                    to_check = [p for p in frontier if not trusted or p in dirty or p not in rows]
+                    checked += len(to_check)
+                    results = executor.map(
+                        self._check, to_check, [rows.get(p) for p in to_check], [p in dirty for p in to_check]
+                    )
+                    for path, result in zip(to_check, results):
+                        if result is None:
+                            # A pasta sumiu entre a listagem do pai e a verificação:
+                            rows.pop(path, None)
+                            removed.append(path)
+                        elif result is not rows.get(path):
+                            rows[path] = result
+                            updates.append((path, *result))
+                            rescanned += 1
+
+                    next_frontier = []
+                    for path in frontier:
+                        row = rows.get(path)
+                        if row is None:
+                            continue
+                        add_payload(total, row[2], depth)
+                        next_frontier.extend(os.path.join(path, name) for name in row[2]["subdirs"])
+                    frontier = next_frontier
+                    depth += 1
+
+            # Pastas indexadas que não são mais alcançáveis foram removidas ou renomeadas:
+            reachable = self._reachable(root, rows)
+            removed.extend(path for path in rows if path not in reachable)
+            self._save(updates, removed)
+            if self._watched_root(root):
+                self._trusted.add(root)
+
+            self.last_refresh = {
+                "root": root,
+                "directories_indexed": len(reachable),
+                "directories_checked": checked,
+                "directories_rescanned": rescanned,
+                "watched": trusted,
+                "seconds": round(time.perf_counter() - start, 4),
+            }
+            return total
+
+    def _check(self, path: str, row: tuple | None, force: bool = False) -> tuple | None:
+        """Retornar a linha atual da pasta: a mesma `row` se não mudou, uma nova se mudou, None se sumiu.
+
+        `force` (pasta marcada pelo watcher) revarre mesmo com o mtime igual, pois o
+        evento pode ter sido a alteração de um arquivo, que só muda o tamanho.
+        """
+        try:
+            if row is not None and not force:
+                mtime_ns = os.stat(path).st_mtime_ns
+                mtime_changed = mtime_ns != row[0]
+                racy = mtime_ns >= row[1] - RACY_WINDOW_NS
+                if not mtime_changed and not racy and row[2]["errors"] == 0:
+                    return row
+            scanned_ns = time.time_ns()
+            mtime_ns, payload = scan_directory(path)
+            return (mtime_ns, scanned_ns, payload)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    @staticmethod
+    def _reachable(root: str, rows: dict) -> set:
+        reachable, stack = set(), [root]
+        while stack:
+            path = stack.pop()
+            if path in rows and path not in reachable:
+                reachable.add(path)
+                stack.extend(os.path.join(path, name) for name in rows[path][2]["subdirs"])
+        return reachable
+
+    def _load_subtree(self, root: str) -> dict:
+        low, high = _subtree_bounds(root)
+        cursor = self._db.execute(
+            "SELECT path, mtime_ns, scanned_ns, payload FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+            (root, low, high),
+        )
+        return {path: (mtime_ns, scanned_ns, json.loads(payload)) for path, mtime_ns, scanned_ns, payload in cursor}
+
+    def _save(self, updates: list[tuple], removed: list[str]):
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, scanned_ns, payload) VALUES (?, ?, ?, ?)",
+                [(path, mtime_ns, scanned_ns, json.dumps(payload, separators=(",", ":")))
+                 for path, mtime_ns, scanned_ns, payload in updates],
+            )
+            self._db.executemany("DELETE FROM dirs WHERE path = ?", [(path,) for path in removed])
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "directories": self._db.execute("SELECT COUNT(*) FROM dirs").fetchone()[0],
+                "watched_roots": sorted(self._watched),
+                "pending_dirty": len(self._dirty),
+                "last_refresh": self.last_refresh,
+            }
+
+    def close(self):
+        self._db.close()
+
+
+def _is_within(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+async def watch_roots(index: DirIndex, roots: list[str], debounce_ms: int = 200):
+    """Tarefa de fundo: marcar no índice as pastas alteradas sob `roots` (inotify via 'watchfiles')."""
+    from watchfiles import awatch
+
+    roots = [os.path.abspath(os.path.expanduser(root)) for root in roots]
+    index.start_watching(roots)
+    try:
+        async for changes in awatch(*roots, debounce=debounce_ms, recursive=True):
+            index.mark_dirty(path for _, path in changes)
+    finally:
+        index.stop_watching(roots)
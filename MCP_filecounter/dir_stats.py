@@ -0,0 +1,193 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+Script dir_stats.py
+===================
+Motor de estatísticas recursivas de diretórios para o servidor FileCounter.
+
+A varredura usa `os.scandir`, cujo `DirEntry` já traz o tipo da entrada (d_type
+do readdir): arquivos e pastas são classificados sem nenhum stat extra, e o
+único stat por arquivo é o que lê o tamanho (dispensável com `with_sizes=False`).
+
+As subárvores são percorridas em paralelo por um pool de threads (o scandir
+libera o GIL durante as chamadas de sistema). Cada tarefa desce em profundidade
+com uma pilha local e, quando há threads ociosas, entrega metade da pilha para
+uma nova tarefa. Cada thread acumula em um `DirStats` próprio, e os parciais só
+são somados no final, então não há lock por arquivo.
+"""
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+
+DEFAULT_WORKERS = int(os.environ.get("FILECOUNTER_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+NO_EXTENSION = "(sem extensão)"
+
+
+@dataclass
+class DirStats:
+    """Contagens de uma varredura. Profundidade 1 = entradas diretamente na raiz."""
+
+    files: int = 0
+    directories: int = 0
+    symlinks: int = 0
+    other: int = 0
+    total_bytes: int = 0
+    errors: int = 0
+    extension_files: dict = field(default_factory=lambda: defaultdict(int))
+    extension_bytes: dict = field(default_factory=lambda: defaultdict(int))
+    depth_files: dict = field(default_factory=lambda: defaultdict(int))
+    depth_directories: dict = field(default_factory=lambda: defaultdict(int))
+    depth_bytes: dict = field(default_factory=lambda: defaultdict(int))
+
+    def merge(self, other: "DirStats"):
+        self.files += other.files
+        self.directories += other.directories
+        self.symlinks += other.symlinks
+        self.other += other.other
+        self.total_bytes += other.total_bytes
+        self.errors += other.errors
+        for mine, theirs in (
+            (self.extension_files, other.extension_files),
+            (self.extension_bytes, other.extension_bytes),
+            (self.depth_files, other.depth_files),
+            (self.depth_directories, other.depth_directories),
+            (self.depth_bytes, other.depth_bytes),
+        ):
+            for key, value in theirs.items():
+                mine[key] += value
+
+    def to_dict(self, top_extensions: int = 20) -> dict:
+        """Resumo serializável; só as `top_extensions` extensões com mais arquivos."""
+        extensions = sorted(self.extension_files.items(), key=lambda item: (-item[1], item[0]))
+        depths = sorted(set(self.depth_files) | set(self.depth_directories))
+        return {
+            "files": self.files,
+            "directories": self.directories,
+            "symlinks": self.symlinks,
+            "other": self.other,
+            "total_bytes": self.total_bytes,
+            "errors": self.errors,
+            "extensions": {
+                ext: {"files": count, "bytes": self.extension_bytes.get(ext, 0)}
+                for ext, count in extensions[:top_extensions]
+            },
+            "distinct_extensions": len(extensions),
+            "depths": {
+                depth: {
+                    "files": self.depth_files.get(depth, 0),
+                    "directories": self.depth_directories.get(depth, 0),
+                    "bytes": self.depth_bytes.get(depth, 0),
+                }
+                for depth in depths
+            },
+        }
+
+
+def file_extension(name: str) -> str:
+    ext = os.path.splitext(name)[1].lower()
+    return ext or NO_EXTENSION
+
+
+def scan_into(stats: DirStats, path: str, depth: int, with_sizes: bool = True) -> list[tuple[str, int]]:
+    """Varrer um único diretório, somando em `stats`, e retornar as subpastas (caminho, profundidade).
+
+    Links simbólicos são contados, mas não seguidos (evita ciclos e contagem dupla).
+    """
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stats.directories += 1
+                        stats.depth_directories[depth] += 1
+                        subdirs.append((entry.path, depth + 1))
+                    elif entry.is_file(follow_symlinks=False):
+                        size = entry.stat(follow_symlinks=False).st_size if with_sizes else 0
+                        ext = file_extension(entry.name)
+                        stats.files += 1
+                        stats.total_bytes += size
+                        stats.extension_files[ext] += 1
+                        stats.extension_bytes[ext] += size
+                        stats.depth_files[depth] += 1
+                        stats.depth_bytes[depth] += size
+                    elif entry.is_symlink():
+                        stats.symlinks += 1
+                    else:
+                        stats.other += 1
+                except OSError:
+                    # Entrada removida durante a varredura ou sem permissão de stat:
+                    stats.errors += 1
+    except OSError:
+        stats.errors += 1
+    return subdirs
+
+
+class ParallelWalker:
+    """Percorre uma árvore com um pool de threads e divisão de trabalho sob demanda."""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, with_sizes: bool = True):
+        self.max_workers = max(1, max_workers)
+        self.with_sizes = with_sizes
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._done = threading.Event()
+        self._pending = 0
+        self._partials = []
+        self._error = None
+        self._executor = None
+
+    def walk(self, root: str) -> DirStats:
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dir-stats") as executor:
+            self._executor = executor
+            self._submit([(root, 1)])
+            self._done.wait()
+        if self._error is not None:
+            raise self._error
+
+        total = DirStats()
+        for partial in self._partials:
+            total.merge(partial)
+        return total
+
+    def _submit(self, stack: list[tuple[str, int]]):
+        with self._lock:
+            self._pending += 1
+        self._executor.submit(self._run, stack)
+
+    def _thread_stats(self) -> DirStats:
+        # Um acumulador por thread: tarefas da mesma thread rodam em sequência.
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            stats = self._local.stats = DirStats()
+            with self._lock:
+                self._partials.append(stats)
+        return stats
+
+    def _run(self, stack: list[tuple[str, int]]):
+        try:
+            stats = self._thread_stats()
+            while stack:
+                path, depth = stack.pop()
+                stack.extend(scan_into(stats, path, depth, self.with_sizes))
+                # Há threads ociosas: entregar metade da pilha (as pastas mais rasas) a outra tarefa.
+                if len(stack) > 1 and self._pending < self.max_workers:
+                    half = len(stack) // 2
+                    self._submit(stack[:half])
+                    del stack[:half]
+        except BaseException as e:
+            self._error = e
+        finally:
+            with self._lock:
+                self._pending -= 1
+                if self._pending == 0:
+                    self._done.set()
+
+
+def collect_stats(root: str, max_workers: int = DEFAULT_WORKERS, with_sizes: bool = True) -> DirStats:
+    """Estatísticas recursivas de `root` (contagens, bytes, por extensão e por profundidade)."""
+    return ParallelWalker(max_workers=max_workers, with_sizes=with_sizes).walk(root)
@@ -0,0 +1,327 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+Script file_query.py
+====================
+Consultas de arquivos (find_files) avaliadas durante uma única varredura com `scandir`.
+
+Filtros:
+- include / exclude: globs no estilo gitignore. Sem '/', o padrão vale para o nome
+  ("*.py", "node_modules"); com '/', para o caminho relativo à raiz ("src/**/*.py").
+  `**` atravessa pastas. Uma pasta que casa com um exclude é podada inteira.
+- tamanho mínimo/máximo ("512", "10KB", "1.5G"; múltiplos de 1024);
+- data de modificação: ISO 8601 ("2024-05-01", "2024-05-01T12:00") ou relativa ("30m", "12h", "7d", "2w");
+- profundidade máxima (1 = só o próprio diretório).
+
+A varredura é em profundidade e em ordem alfabética, e nada além das entradas
+de uma pasta por nível fica em memória. A paginação usa um cursor com o caminho
+do último resultado: a próxima página poda toda subárvore que vem antes dele
+sem listá-la, e o cursor também carrega a contagem acumulada.
+"""
+import base64
+import hashlib
+import json
+import os
+import re
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+_SIZE_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?$")
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+_DURATION_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhdw])$")
+
+
+def parse_size(value: str | int | None) -> int | None:
+    """'10MB' -> 10485760. Inteiros são bytes."""
+    if value is None or isinstance(value, int):
+        return value
+    match = _SIZE_PATTERN.match(value.strip().lower())
+    if match is None:
+        raise ValueError(f"Tamanho inválido: '{value}'. Use, por exemplo, '512', '10KB' ou '1.5G'.")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def parse_time(value: str | None, now: float | None = None) -> float | None:
+    """'7d' -> agora menos 7 dias; '2024-05-01' -> timestamp (hora local se não houver fuso)."""
+    if value is None:
+        return None
+    text = value.strip()
+    match = _DURATION_PATTERN.match(text.lower())
+    if match is not None:
+        return (now if now is not None else time.time()) - float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise ValueError(f"Data inválida: '{value}'. Use ISO 8601 ('2024-05-01') ou relativa ('7d', '12h').") from None
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Traduzir um glob (com suporte a `**`) para uma expressão regular ancorada."""
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        c = pattern[i]
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            elif body.startswith("^"):
+                body = "\\" + body
+            out.append("[" + body + "]")
+            i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out) + r"\Z"
+
+
+class GlobSet:
+    """Conjunto de globs compilados em duas regex: uma para nomes e outra para caminhos."""
+
+    def __init__(self, patterns: list[str] | None):
+        names, paths = [], []
+        for pattern in patterns or []:
+            pattern = pattern.strip().removeprefix("./").lstrip("/")
+            if pattern.endswith("/"):
+                # "build/" = a pasta build: a poda da pasta já exclui todo o conteúdo.
+                pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+            (paths if "/" in pattern else names).append(glob_to_regex(pattern))
+        self._names = re.compile("|".join(names)) if names else None
+        self._paths = re.compile("|".join(paths)) if paths else None
+        self.empty = not names and not paths
+
+    def matches(self, name: str, rel_path: str) -> bool:
+        return bool(
+            (self._names is not None and self._names.match(name))
+            or (self._paths is not None and self._paths.match(rel_path))
+        )
+
+
+@dataclass
+class FileQuery:
+    """Filtros de uma busca. Tamanhos e datas chegam como texto e são resolvidos aqui.
+
+    Datas relativas ("7d") são resolvidas em relação a `now`, que o cursor preserva
+    para que todas as páginas usem o mesmo instante.
+    """
+
+    include: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    min_size: str | int | None = None
+    max_size: str | int | None = None
+    modified_after: str | None = None
+    modified_before: str | None = None
+    max_depth: int | None = None
+    now: float | None = None
+
+    def __post_init__(self):
+        if self.max_depth is not None and self.max_depth < 1:
+            raise ValueError(f"max_depth inválido: {self.max_depth}. Use 1 ou mais (1 = só o próprio diretório).")
+        if self.now is None:
+            self.now = time.time()
+        self._include = GlobSet(self.include)
+        self._exclude = GlobSet(self.exclude)
+        self._min_size = parse_size(self.min_size)
+        self._max_size = parse_size(self.max_size)
+        self._after = parse_time(self.modified_after, self.now)
+        self._before = parse_time(self.modified_before, self.now)
+        self.needs_stat = any(v is not None for v in (self._min_size, self._max_size, self._after, self._before))
+
+    def fingerprint(self) -> str:
+        """Identifica a consulta dentro do cursor (um cursor não vale para outra consulta)."""
+        key = json.dumps(
+            [self.include, self.exclude, self.min_size, self.max_size,
+             self.modified_after, self.modified_before, self.max_depth],
+            default=str,
+        )
+        return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+    def excludes(self, name: str, rel_path: str) -> bool:
+        return not self._exclude.empty and self._exclude.matches(name, rel_path)
+
+    def accepts_name(self, name: str, rel_path: str) -> bool:
+        return self._include.empty or self._include.matches(name, rel_path)
+
+    def accepts_stat(self, st: os.stat_result) -> bool:
+        if self._min_size is not None and st.st_size < self._min_size:
+            return False
+        if self._max_size is not None and st.st_size > self._max_size:
+            return False
+        if self._after is not None and st.st_mtime < self._after:
+            return False
+        if self._before is not None and st.st_mtime > self._before:
+            return False
+        return True
+
+
+@dataclass
+class WalkCounters:
+    scanned: int = 0
+    errors: int = 0
+
+
+def _sorted_entries(path: str, counters: WalkCounters) -> list[os.DirEntry]:
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entries, key=lambda entry: entry.name)
+    except OSError:
+        counters.errors += 1
+        return []
+
+
+def iter_matches(
+    root: str, query: FileQuery, after: tuple[str, ...] | None = None, counters: WalkCounters | None = None
+) -> Iterator[tuple[tuple[str, ...], os.stat_result]]:
+    """Gerar (partes do caminho relativo, stat) dos arquivos que atendem à consulta, em ordem.
+
+    Com `after`, começa logo depois desse caminho, pulando sem listar as subárvores anteriores.
+    """
+    counters = counters if counters is not None else WalkCounters()
+    stack = [iter(_sorted_entries(root, counters))]
+    parts: list[str] = []
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            if parts:
+                parts.pop()
+            continue
+
+        counters.scanned += 1
+        rel_parts = (*parts, entry.name)
+        if after is not None:
+            if rel_parts == after[: len(rel_parts)] and len(rel_parts) < len(after):
+                # Pasta no caminho até o cursor: descer nela.
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+            elif rel_parts <= after:
+                continue  # Arquivo ou subárvore inteira antes do cursor.
+            else:
+                after = None  # Daqui em diante tudo vem depois do cursor.
+
+        rel_path = "/".join(rel_parts)
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                depth = len(rel_parts)
+                if (query.max_depth is None or depth < query.max_depth) and not query.excludes(entry.name, rel_path):
+                    stack.append(iter(_sorted_entries(entry.path, counters)))
+                    parts.append(entry.name)
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if not query.accepts_name(entry.name, rel_path) or query.excludes(entry.name, rel_path):
+                continue
+            # O stat só acontece para arquivos que passaram pelos globs.
+            st = entry.stat(follow_symlinks=False)
+            if query.needs_stat and not query.accepts_stat(st):
+                continue
+        except OSError:
+            counters.errors += 1
+            continue
+        yield rel_parts, st
+
+
+def encode_cursor(query: FileQuery, after: tuple[str, ...], matched: int, matched_bytes: int) -> str:
+    state = {
+        "q": query.fingerprint(),
+        "now": query.now,
+        "after": list(after),
+        "matched": matched,
+        "bytes": matched_bytes,
+    }
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode()
+
+
+def _valid_cursor_state(state: dict) -> bool:
+    """Confere as chaves e os tipos que o find_page lê do cursor (bool não vale como número)."""
+    def is_count(value) -> bool:
+        return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+    return (
+        isinstance(state.get("q"), str)
+        and isinstance(state.get("now"), (int, float)) and not isinstance(state.get("now"), bool)
+        and isinstance(state.get("after"), list) and all(isinstance(part, str) for part in state["after"])
+        and is_count(state.get("matched"))
+        and is_count(state.get("bytes"))
+    )
+
+
+def decode_cursor(query: FileQuery, cursor: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("Cursor inválido.") from None
+    if not isinstance(state, dict) or not _valid_cursor_state(state):
+        raise ValueError("Cursor inválido.")
+    if state["q"] != query.fingerprint():
+        raise ValueError("Este cursor pertence a outra consulta; repita a consulta sem cursor.")
+    return state
+
+
+def find_page(
+    root: str,
+    query: FileQuery,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    count_only: bool = False,
+) -> dict:
+    """Uma página de resultados (ou só a contagem total, com `count_only`)."""
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    state = {"after": None, "matched": 0, "bytes": 0}
+    if cursor:
+        state = decode_cursor(query, cursor)
+        query = replace(query, now=state["now"])
+    after = tuple(state["after"]) if state["after"] else None
+    matched, matched_bytes = state["matched"], state["bytes"]
+    counters = WalkCounters()
+    items = []
+    next_cursor = None
+
+    for rel_parts, st in iter_matches(root, query, after, counters):
+        matched += 1
+        matched_bytes += st.st_size
+        if count_only:
+            continue
+        items.append({
+            "path": "/".join(rel_parts),
+            "size": st.st_size,
+            "modified": datetime.fromtimestamp(st.st_mtime).isoformat(timespec="seconds"),
+        })
+        if len(items) == page_size:
+            next_cursor = encode_cursor(query, rel_parts, matched, matched_bytes)
+            break
+
+    result = {
+        "root": root,
+        "matched_so_far": matched,
+        "matched_bytes_so_far": matched_bytes,
+        "entries_scanned": counters.scanned,
+        "errors": counters.errors,
+        "complete": next_cursor is None,
+    }
+    if not count_only:
+        result["items"] = items
+        result["next_cursor"] = next_cursor
+    return result
@@ -3,19 +3,67 @@
 Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
 
 Este script é um servidor MCP que conta o número de arquivos em um diretório específico.
+Com recursive=True (ou pela ferramenta directory_stats) a contagem desce por toda a
+árvore em paralelo, usando o motor do dir_stats.py.
+
+As consultas recursivas passam pelo índice persistente do dir_index.py (arquivo
+definido por FILECOUNTER_INDEX_DB): repetir a consulta sobre uma árvore inalterada
+só revarre as pastas cujo mtime mudou. Com FILECOUNTER_WATCH (caminhos separados
+por os.pathsep) e o pacote 'watchfiles' instalado, uma tarefa de fundo mantém o
+índice atualizado via inotify.
+
+A ferramenta find_files (file_query.py) filtra por globs, tamanho, data e
+profundidade durante uma única varredura, com resultados paginados por cursor.
 """
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
 from mcp.server.fastmcp import FastMCP
 import os
+from dir_index import DEFAULT_INDEX_PATH, DirIndex, watch_roots
+from dir_stats import DEFAULT_WORKERS, collect_stats
+from file_query import DEFAULT_PAGE_SIZE, FileQuery, find_page
+
+logger = logging.getLogger(__name__)
+
+INDEX_DB = os.environ.get("FILECOUNTER_INDEX_DB", DEFAULT_INDEX_PATH)
+WATCH_ROOTS = [root for root in os.environ.get("FILECOUNTER_WATCH", "").split(os.pathsep) if root]
+
+dir_index = DirIndex(INDEX_DB)
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Inicia o watcher do índice (se configurado) e o encerra junto com o servidor."""
+    watcher = None
+    if WATCH_ROOTS:
+        try:
+            import watchfiles  # noqa: F401
+        except ImportError:
+            logger.warning("FILECOUNTER_WATCH definido, mas o pacote 'watchfiles' não está instalado.")
+        else:
+            watcher = asyncio.create_task(watch_roots(dir_index, WATCH_ROOTS))
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await watcher
+
 
 # Cria um servidor MCP chamado "FileCounter":
-mcp = FastMCP("FileCounter")
+mcp = FastMCP("FileCounter", lifespan=lifespan)
 
 @mcp.tool()
-def count_files(directory_path: str = "/home/karinag/Documentos") -> str: # # Obtém o caminho da área de trabalho (ex., /home/karinag/Documentos)
+def count_files(directory_path: str = "/home/karinag/Documentos", recursive: bool = False, use_index: bool = True) -> str: # # Obtém o caminho da área de trabalho (ex., /home/karinag/Documentos)
     """Conta o número de arquivos no diretório especificado
     
     Args:
         directory_path: Caminho do diretório para contar arquivos (padrão: Desktop)
+        recursive: Se True, conta também os arquivos de todas as subpastas
+        use_index: Se True, a contagem recursiva usa (e atualiza) o índice persistente
     """
     path = os.path.expanduser(directory_path)
     try:
@@ -25,11 +73,102 @@ def count_files(directory_path: str = "/home/karinag/Documentos") -> str: # # Ob
         if not os.path.isdir(path):
             return f"Erro: '{directory_path}' não é um diretório."
             
-        files = [f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
-        file_count = len(files)
+        if recursive:
+            # Sem índice, só contagens: sem stat por arquivo, o tipo vem do próprio scandir.
+            stats = dir_index.stats(path) if use_index else collect_stats(path, with_sizes=False)
+            return f"Existem {stats.files} arquivos em '{directory_path}' (incluindo {stats.directories} subpastas)."
+
+        # O DirEntry já sabe se é arquivo, sem um stat extra por entrada:
+        with os.scandir(path) as entries:
+            file_count = sum(1 for entry in entries if entry.is_file())
         return f"Existem {file_count} arquivos em '{directory_path}'."
     except Exception as e:
         return f"Erro ao contar arquivos: {str(e)}"
 
+@mcp.tool()
+def directory_stats(
+    directory_path: str = "/home/karinag/Documentos",
+    include_sizes: bool = True,
+    top_extensions: int = 20,
+    max_workers: int = DEFAULT_WORKERS,
+    use_index: bool = True,
+) -> dict:
+    """Estatísticas recursivas de um diretório: arquivos, pastas, bytes totais e
+    distribuição por extensão e por profundidade (1 = diretamente no diretório)
+
+    Args:
+        directory_path: Caminho do diretório a analisar
+        include_sizes: Se False, não lê o tamanho dos arquivos (mais rápido em árvores enormes)
+        top_extensions: Quantas extensões (as com mais arquivos) incluir no resultado
+        max_workers: Threads usadas para percorrer as subpastas em paralelo (sem índice)
+        use_index: Se True, usa o índice persistente (sempre com tamanhos) e só revarre o que mudou
+    """
+    path = os.path.expanduser(directory_path)
+    if not os.path.isdir(path):
+        return {"error": f"'{directory_path}' não existe ou não é um diretório."}
+    try:
+        if use_index:
+            stats = dir_index.stats(path)
+            return {
+                "directory": directory_path,
+                **stats.to_dict(top_extensions=top_extensions),
+                "index": dir_index.last_refresh,
+            }
+        stats = collect_stats(path, max_workers=max_workers, with_sizes=include_sizes)
+    except OSError as e:
+        return {"error": f"Erro ao analisar '{directory_path}': {e}"}
+    return {"directory": directory_path, **stats.to_dict(top_extensions=top_extensions)}
+
+@mcp.tool()
+def find_files(
+    directory_path: str = "/home/karinag/Documentos",
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    min_size: str | None = None,
+    max_size: str | None = None,
+    modified_after: str | None = None,
+    modified_before: str | None = None,
+    max_depth: int | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    count_only: bool = False,
+) -> dict:
+    """Busca arquivos por globs, tamanho, data de modificação e profundidade, com resultados paginados
+
+    Args:
+        directory_path: Diretório raiz da busca
+        include: Globs que o arquivo deve casar (ex.: ["*.py", "docs/**/*.md"]); vazio = todos
+        exclude: Globs de arquivos ou pastas a ignorar (ex.: ["node_modules", ".git", "*.tmp"])
+        min_size: Tamanho mínimo (ex.: "10KB", "1.5MB")
+        max_size: Tamanho máximo (ex.: "1G")
+        modified_after: Modificados depois de uma data ISO ("2024-05-01") ou há menos de ("7d", "12h")
+        modified_before: Modificados antes de uma data ISO ou há mais de ("30d")
+        max_depth: Profundidade máxima (1 = só o próprio diretório)
+        page_size: Resultados por página (máx. 1000)
+        cursor: Valor de next_cursor da página anterior, para continuar a busca
+        count_only: Se True, só conta os arquivos (e bytes) que atendem aos filtros, sem listá-los
+    """
+    path = os.path.expanduser(directory_path)
+    if not os.path.isdir(path):
+        return {"error": f"'{directory_path}' não existe ou não é um diretório."}
+    try:
+        query = FileQuery(
+            include=include or [],
+            exclude=exclude or [],
+            min_size=min_size,
+            max_size=max_size,
+            modified_after=modified_after,
+            modified_before=modified_before,
+            max_depth=max_depth,
+        )
+        return find_page(path, query, page_size=page_size, cursor=cursor, count_only=count_only)
+    except ValueError as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+def index_status() -> dict:
+    """Estado do índice persistente: arquivo, pastas indexadas, raízes observadas e a última atualização"""
+    return dir_index.info()
+
 if __name__ == "__main__":
     mcp.run()
@@ -0,0 +1,77 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+Script benchmark_squad.py
+=========================
+Mede quantos times por segundo o squad_optimizer consegue pontuar sobre o elenco
+completo do snapshot local (ou sobre um elenco sintético, se não houver snapshot)
+e quanto tempo leva uma otimização completa.
+
+Run
+===
+uv run benchmark_squad.py --teams 200000
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+from poke_snapshot import DEFAULT_SNAPSHOT_PATH, STAT_COLUMNS, PokedexSnapshot
+from squad_optimizer import TYPES, Roster, optimize_squad
+
+
+def synthetic_records(count: int, seed: int = 0) -> list[dict]:
+    """Elenco aleatório com o mesmo formato dos registros do snapshot."""
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"synthetic-{i}",
+            "types": [{"slot": slot, "type": {"name": name}} for slot, name in enumerate(rng.sample(TYPES, rng.choice([1, 2])), start=1)],
+            "abilities": [{"is_hidden": False, "ability": {"name": "pressure"}}],
+            "stats": [{"base_stat": rng.randint(20, 160), "stat": {"name": stat}} for stat in STAT_COLUMNS],
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.environ.get("POKE_SNAPSHOT_DB", DEFAULT_SNAPSHOT_PATH))
+    parser.add_argument("--teams", type=int, default=200_000, help="Times aleatórios pontuados no teste de vazão")
+    parser.add_argument("--batch", type=int, default=50_000, help="Times pontuados por chamada vetorizada")
+    parser.add_argument("--time-budget", type=float, default=2.0, help="Orçamento do beam search (s)")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        records = list(PokedexSnapshot(args.db).all_records())
+        source = args.db
+    else:
+        records = synthetic_records(1300)
+        source = "elenco sintético (snapshot não encontrado)"
+
+    start = time.perf_counter()
+    roster = Roster(records)
+    print(f"Elenco: {len(roster)} Pokémon de {source} (arrays montados em {time.perf_counter() - start:.3f}s)")
+
+    rng = np.random.default_rng(0)
+    scored = 0
+    start = time.perf_counter()
+    while scored < args.teams:
+        batch = min(args.batch, args.teams - scored)
+        roster.score_teams(rng.integers(0, len(roster), size=(batch, 6)))
+        scored += batch
+    elapsed = time.perf_counter() - start
+    print(f"Pontuação vetorizada: {scored:,} times em {elapsed:.3f}s ({scored / elapsed:,.0f} times/s)")
+
+    result = optimize_squad(roster, time_budget=args.time_budget)
+    print(
+        f"Beam search: {result.teams_scored:,} times em {result.elapsed:.3f}s "
+        f"({result.teams_scored / result.elapsed:,.0f} times/s, busca completa: {result.completed_search})"
+    )
+    print(f"Melhor time ({result.score:.3f}): {', '.join(result.names)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,27 +7,118 @@ Script poke.py
 Você pode usar o modo desenvolvimento, para testar a ferramenta.
 No README mostrarei os detalhes.
 mcp dev poke.py
+
+Todas as requisições à PokeAPI usam um único httpx.AsyncClient com pool de conexões,
+aberto na inicialização do servidor, e as respostas de /pokemon/{name} ficam em cache
+(ver poke_cache.py; defina POKE_CACHE_DB para persistir o cache em SQLite).
+
+Snapshot offline
+================
+Com um snapshot local (ver poke_snapshot.py) o servidor responde sem acessar a rede:
+    uv run poke.py snapshot                        # baixa todos os Pokémon da PokeAPI
+    uv run poke.py snapshot --dump pokemon.jsonl   # ou importa de um dump local
+O caminho do snapshot pode ser definido com POKE_SNAPSHOT_DB (padrão: pokedex.sqlite).
 """
+import argparse
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 import httpx
 from mcp.server.fastmcp import FastMCP
-
-mcp = FastMCP("poke")
+from poke_cache import PokemonCache
+from poke_snapshot import DEFAULT_SNAPSHOT_PATH, PokedexSnapshot, download_all, load_dump
+from squad_optimizer import Roster, max_team_size, optimize_squad
 
 POKEAPI_BASE = "https://pokeapi.co/api/v2"  # https://pokeapi.co/
+REQUEST_TIMEOUT = 30.0
+
+_http_client: httpx.AsyncClient | None = None
+_in_flight: dict[str, asyncio.Task] = {}
+pokemon_cache = PokemonCache(os.environ.get("POKE_CACHE_DB"))
+SNAPSHOT_PATH = os.environ.get("POKE_SNAPSHOT_DB", DEFAULT_SNAPSHOT_PATH)
+_snapshot: PokedexSnapshot | None = None
+_roster: tuple[float, Roster] | None = None  # (mtime do snapshot, elenco)
+
+# Elenco usado pelo otimizador quando não há snapshot local:
+POPULAR_POKEMON = [
+    "charizard", "garchomp", "lucario", "dragonite", "metagross", "gardevoir",
+    "tyranitar", "salamence", "gengar", "blissey", "skarmory", "ferrothorn",
+    "rotom-wash", "toxapex", "corviknight", "landorus-therian", "heatran", "volcarona",
+    "greninja", "scizor", "azumarill", "clefable", "excadrill", "gyarados",
+]
+
+
+def get_snapshot() -> PokedexSnapshot | None:
+    """Abre o snapshot local, se ele já foi criado com o subcomando 'snapshot'."""
+    global _snapshot
+    if _snapshot is None and os.path.exists(SNAPSHOT_PATH):
+        _snapshot = PokedexSnapshot(SNAPSHOT_PATH)
+    return _snapshot
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Retorna o cliente compartilhado, criando-o se ainda não existir."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Abre o pool de conexões na inicialização e o fecha no encerramento do servidor."""
+    global _http_client
+    get_http_client()
+    try:
+        yield
+    finally:
+        await _http_client.aclose()
+        _http_client = None
+
+
+mcp = FastMCP("poke", lifespan=lifespan)
 
 
 # --- Auxiliar para buscar dados de Pokémon ---
-async def fetch_pokemon_data(name: str) -> dict:
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{POKEAPI_BASE}/pokemon/{name.lower()}")
-            if response.status_code == 200:
-                return response.json()
-        except httpx.HTTPError:
-            pass
+async def _request_pokemon(name: str) -> dict:
+    try:
+        response = await get_http_client().get(f"{POKEAPI_BASE}/pokemon/{name}")
+        if response.status_code == 200:
+            data = response.json()
+            pokemon_cache.set(name, data)
+            return data
+    except httpx.HTTPError:
+        pass
     return {}
 
 
+async def fetch_pokemon_data(name: str) -> dict:
+    name = name.lower()
+
+    # O snapshot local responde sem rede; a PokeAPI só é usada para nomes fora dele:
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        data = snapshot.get(name)
+        if data is not None:
+            return data
+
+    data = pokemon_cache.get(name)
+    if data is not None:
+        return data
+
+    # Chamadas simultâneas para o mesmo Pokémon compartilham uma única requisição:
+    task = _in_flight.get(name)
+    if task is None:
+        task = asyncio.ensure_future(_request_pokemon(name))
+        _in_flight[name] = task
+        task.add_done_callback(lambda _: _in_flight.pop(name, None))
+    return await asyncio.shield(task)
+
+
 # --- Ferramenta (Tool): Obter informações sobre um Pokémon ---
 @mcp.tool()
 async def get_pokemon_info(name: str) -> str:
@@ -48,26 +139,48 @@ Stats: {', '.join(f"{k}: {v}" for k, v in stats.items())}
 """
 
 
+async def load_roster() -> Roster:
+    """Elenco do otimizador: o snapshot inteiro ou, sem snapshot, os Pokémon populares."""
+    global _roster
+    snapshot = get_snapshot()
+    if snapshot is None:
+        results = await asyncio.gather(*(fetch_pokemon_data(name) for name in POPULAR_POKEMON))
+        return Roster([data for data in results if data])
+
+    # Os arrays do elenco completo só são remontados quando o snapshot muda:
+    mtime = os.path.getmtime(SNAPSHOT_PATH)
+    if _roster is None or _roster[0] != mtime:
+        _roster = (mtime, await asyncio.to_thread(lambda: Roster(list(snapshot.all_records()))))
+    return _roster[1]
+
+
 # --- Ferramenta (Tool): Criar um time de Pokémon para um torneio ---
 @mcp.tool()
-async def create_tournament_squad() -> str:
-    """Criar um time poderoso de Pokémon para um torneio."""
-    top_pokemon = [
-        "charizard",
-        "garchomp",
-        "lucario",
-        "dragonite",
-        "metagross",
-        "gardevoir",
-    ]
-    squad = []
-
-    for name in top_pokemon:
-        data = await fetch_pokemon_data(name)
-        if data:
-            squad.append(data["name"].capitalize())
-
-    return "Tournament Squad:\n" + "\n".join(squad)
+async def create_tournament_squad(team_size: int = 6, time_budget: float = 2.0) -> str:
+    """Criar um time poderoso de Pokémon para um torneio.
+
+    O time é otimizado por stats, cobertura de tipos e fraquezas compartilhadas
+    sobre o elenco do snapshot local (ou sobre uma lista de Pokémon populares).
+
+    Args:
+        team_size: Número de Pokémon no time (padrão: 6)
+        time_budget: Tempo máximo de busca em segundos (padrão: 2.0)
+    """
+    roster = await load_roster()
+    if len(roster) == 0:
+        return "Não foi possível carregar Pokémon para montar o time."
+    if not 1 <= team_size <= max_team_size(roster):
+        return f"Erro: team_size deve estar entre 1 e {max_team_size(roster)}."
+
+    result = await asyncio.to_thread(optimize_squad, roster, team_size=team_size, time_budget=time_budget)
+    squad = [name.capitalize() for name in result.names]
+    return (
+        "Tournament Squad:\n" + "\n".join(squad)
+        + f"\n\nScore: {result.score:.3f} (média de stats: {result.breakdown['average_total']:.0f})"
+        + f"\nCobertura super efetiva: {', '.join(result.breakdown['coverage']) or 'nenhuma'}"
+        + f"\nExposto a: {', '.join(result.breakdown['exposed_to']) or 'nenhum tipo'}"
+        + f"\n({result.teams_scored:,} times avaliados em {result.elapsed:.2f}s)"
+    )
 
 
 # --- Ferramenta (Tool): Listar Pokémon populares ---
@@ -79,6 +192,78 @@ async def list_popular_pokemon() -> str:
     )
 
 
+# --- Ferramenta (Tool): Buscar Pokémon no snapshot local ---
+@mcp.tool()
+async def find_pokemon(
+    type_name: str | None = None,
+    ability: str | None = None,
+    stat: str | None = None,
+    min_value: int | None = None,
+    max_value: int | None = None,
+    limit: int = 50,
+) -> str:
+    """Buscar Pokémon por tipo, habilidade e faixa de um stat base no snapshot local.
+
+    Exemplo: todos os Pokémon do tipo fire com speed de pelo menos 100:
+    type_name="fire", stat="speed", min_value=100.
+
+    Args:
+        type_name: Tipo do Pokémon (ex.: fire, water, dragon)
+        ability: Habilidade (ex.: levitate, intimidate)
+        stat: hp, attack, defense, special-attack, special-defense, speed ou total (padrão: total)
+        min_value: Valor mínimo (inclusive) do stat
+        max_value: Valor máximo (inclusive) do stat
+        limit: Número máximo de resultados (pelo menos 1), ordenados pelo stat (decrescente)
+    """
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return "Snapshot local não encontrado. Crie-o com: uv run poke.py snapshot"
+    try:
+        results = snapshot.find(type_name, ability, stat, min_value, max_value, limit)
+    except ValueError as e:
+        return f"Erro: {e}"
+    if not results:
+        return "Nenhum Pokémon encontrado com esses critérios."
+
+    stat_column = next(key for key in results[0] if key not in ("name", "types"))
+    return "\n".join(
+        f"{r['name'].capitalize()} ({', '.join(r['types'])}) - {stat_column}: {r[stat_column]}"
+        for r in results
+    )
+
+
+# --- Ferramenta (Tool): Estatísticas do cache ---
+@mcp.tool()
+async def get_cache_stats() -> dict:
+    """Obter as estatísticas do cache de respostas da PokeAPI."""
+    return pokemon_cache.stats()
+
+
+# --- Subcomando: criar o snapshot local ---
+async def build_snapshot(db_path: str, dump_path: str | None, concurrency: int):
+    if dump_path:
+        records = load_dump(dump_path)
+    else:
+        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
+            records = await download_all(client, POKEAPI_BASE, concurrency)
+
+    snapshot = PokedexSnapshot(db_path)
+    written = snapshot.write(records)
+    print(f"Snapshot salvo em {db_path}: {written} Pokémon gravados ({snapshot.count()} no total).")
+    snapshot.close()
+
+
 # --- Ponto de entrada ---
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    parser = argparse.ArgumentParser(description="Servidor MCP de Pokémon")
+    subcommands = parser.add_subparsers(dest="command")
+    snapshot_parser = subcommands.add_parser("snapshot", help="Criar/atualizar o snapshot local da PokeAPI")
+    snapshot_parser.add_argument("--db", default=SNAPSHOT_PATH, help="Arquivo SQLite de destino")
+    snapshot_parser.add_argument("--dump", help="Importar de um dump local (JSONL ou pasta com .json)")
+    snapshot_parser.add_argument("--concurrency", type=int, default=16, help="Downloads simultâneos")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        asyncio.run(build_snapshot(args.db, args.dump, args.concurrency))
+    else:
+        mcp.run(transport="stdio")
@@ -0,0 +1,78 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+Script poke_cache.py
+====================
+Cache das respostas de /pokemon/{name} da PokeAPI.
+
+Os dados da PokeAPI são praticamente imutáveis, então as respostas ficam em um
+LRU em memória sem expiração e, opcionalmente, em um arquivo SQLite para que
+sobrevivam a reinicializações do servidor.
+"""
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+MAX_MEMORY_ENTRIES = 2048
+
+
+class PokemonCache:
+    """LRU em memória com armazenamento opcional em SQLite."""
+
+    def __init__(self, db_path: str | None = None, max_entries: int = MAX_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pokemon (name TEXT PRIMARY KEY, payload TEXT NOT NULL)"
+            )
+
+    def get(self, name: str) -> dict | None:
+        with self._lock:
+            data = self._entries.get(name)
+            if data is None and self._db is not None:
+                row = self._db.execute("SELECT payload FROM pokemon WHERE name = ?", (name,)).fetchone()
+                if row is not None:
+                    data = json.loads(row[0])
+                    self._remember(name, data)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self.hits += 1
+            return data
+
+    def set(self, name: str, data: dict):
+        with self._lock:
+            self._remember(name, data)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO pokemon (name, payload) VALUES (?, ?)",
+                        (name, json.dumps(data)),
+                    )
+
+    def _remember(self, name: str, data: dict):
+        self._entries[name] = data
+        self._entries.move_to_end(name)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "persistent": self._db is not None,
+            }
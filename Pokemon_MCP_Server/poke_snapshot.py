@@ -0,0 +1,266 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+Script poke_snapshot.py
+=======================
+Snapshot local (SQLite) de todos os Pokémon da PokeAPI.
+
+Cada Pokémon é guardado em forma compacta (nome, tipos, habilidades e stats base,
+no mesmo formato da PokeAPI) com índices por nome, tipo, habilidade e stats, para
+que o servidor responda sem rede e consultas como "tipo X com speed > N" sejam
+buscas indexadas.
+
+O snapshot é criado pelo subcomando do poke.py:
+    uv run poke.py snapshot                      # baixa tudo da PokeAPI
+    uv run poke.py snapshot --dump pokemon.jsonl  # importa de um dump local
+"""
+import asyncio
+import json
+import os
+import sqlite3
+from collections.abc import Iterable, Iterator
+
+import httpx
+
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pokedex.sqlite")
+
+# Nome do stat na PokeAPI -> coluna no SQLite:
+STAT_COLUMNS = {
+    "hp": "hp",
+    "attack": "attack",
+    "defense": "defense",
+    "special-attack": "special_attack",
+    "special-defense": "special_defense",
+    "speed": "speed",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pokemon (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    hp INTEGER, attack INTEGER, defense INTEGER,
+    special_attack INTEGER, special_defense INTEGER, speed INTEGER,
+    total INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pokemon_types (
+    pokemon_id INTEGER NOT NULL REFERENCES pokemon(id),
+    type TEXT NOT NULL,
+    slot INTEGER,
+    PRIMARY KEY (type, pokemon_id)
+);
+CREATE TABLE IF NOT EXISTS pokemon_abilities (
+    pokemon_id INTEGER NOT NULL REFERENCES pokemon(id),
+    ability TEXT NOT NULL,
+    is_hidden INTEGER,
+    PRIMARY KEY (ability, pokemon_id)
+);
+"""
+# Um índice por coluna de stat (e pelo total), para que find() nunca percorra a tabela inteira:
+_SCHEMA += "".join(
+    f"CREATE INDEX IF NOT EXISTS idx_pokemon_{column} ON pokemon({column});\n"
+    for column in (*STAT_COLUMNS.values(), "total")
+)
+
+
+def compact_record(data: dict) -> dict:
+    """Reduzir a resposta completa da PokeAPI aos campos usados pelo servidor.
+
+    Levanta ValueError se o registro não tiver o formato da PokeAPI (campo ausente ou de outro tipo).
+    """
+    try:
+        record = {
+            "id": data["id"],
+            "name": data["name"],
+            "types": [{"slot": t["slot"], "type": {"name": t["type"]["name"]}} for t in data["types"]],
+            "abilities": [
+                {"is_hidden": a.get("is_hidden", False), "ability": {"name": a["ability"]["name"]}}
+                for a in data["abilities"]
+            ],
+            "stats": [{"base_stat": s["base_stat"], "stat": {"name": s["stat"]["name"]}} for s in data["stats"]],
+        }
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"registro malformado ({type(e).__name__}: {e})") from None
+
+    names = [t["type"]["name"] for t in record["types"]] + [a["ability"]["name"] for a in record["abilities"]]
+    if (
+        not isinstance(record["id"], int)
+        or not isinstance(record["name"], str)
+        or not all(isinstance(name, str) for name in names + [s["stat"]["name"] for s in record["stats"]])
+        or not all(isinstance(s["base_stat"], int) for s in record["stats"])
+    ):
+        raise ValueError(f"registro malformado (tipos inválidos em '{record['name']}')")
+    return record
+
+
+class PokedexSnapshot:
+    """Acesso ao snapshot SQLite (leitura pelo servidor, escrita pelo subcomando)."""
+
+    def __init__(self, db_path: str = DEFAULT_SNAPSHOT_PATH):
+        self.db_path = db_path
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def write(self, records: Iterable[dict]) -> int:
+        """Gravar (ou substituir) os registros e retornar quantos foram gravados.
+
+        Registros malformados são ignorados (e informados), sem interromper a importação.
+        """
+        count = 0
+        with self._db:
+            for data in records:
+                try:
+                    record = compact_record(data)
+                except ValueError as e:
+                    print(f"Registro ignorado: {e}")
+                    continue
+                stats = {STAT_COLUMNS[s["stat"]["name"]]: s["base_stat"] for s in record["stats"] if s["stat"]["name"] in STAT_COLUMNS}
+                self._db.execute("DELETE FROM pokemon_types WHERE pokemon_id = ?", (record["id"],))
+                self._db.execute("DELETE FROM pokemon_abilities WHERE pokemon_id = ?", (record["id"],))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pokemon (id, name, hp, attack, defense, special_attack, "
+                    "special_defense, speed, total, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        record["id"], record["name"],
+                        *(stats.get(column) for column in STAT_COLUMNS.values()),
+                        sum(stats.values()),
+                        json.dumps(record, separators=(",", ":")),
+                    ),
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO pokemon_types (pokemon_id, type, slot) VALUES (?, ?, ?)",
+                    [(record["id"], t["type"]["name"], t["slot"]) for t in record["types"]],
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO pokemon_abilities (pokemon_id, ability, is_hidden) VALUES (?, ?, ?)",
+                    [(record["id"], a["ability"]["name"], int(a["is_hidden"])) for a in record["abilities"]],
+                )
+                count += 1
+        return count
+
+    def count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM pokemon").fetchone()[0]
+
+    def get(self, name: str) -> dict | None:
+        """Registro compacto de um Pokémon pelo nome (ou número na Pokédex)."""
+        column = "id" if name.isdigit() else "name"
+        row = self._db.execute(f"SELECT payload FROM pokemon WHERE {column} = ?", (name.lower(),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def all_records(self) -> Iterator[dict]:
+        for (payload,) in self._db.execute("SELECT payload FROM pokemon ORDER BY id"):
+            yield json.loads(payload)
+
+    def find(
+        self,
+        type_name: str | None = None,
+        ability: str | None = None,
+        stat: str | None = None,
+        min_value: int | None = None,
+        max_value: int | None = None,
+        limit: int = 50,
+    ) -> list[dict]:
+        """Buscar Pokémon por tipo, habilidade e faixa de um stat base (usando os índices).
+
+        Retorna dicionários com nome, tipos e o valor do stat, ordenados pelo stat (decrescente).
+        """
+        if limit < 1:
+            raise ValueError("limit deve ser pelo menos 1.")
+        if stat is not None and stat not in STAT_COLUMNS and stat != "total":
+            raise ValueError(f"Stat '{stat}' inválido. Use um de {list(STAT_COLUMNS) + ['total']}.")
+        stat_column = STAT_COLUMNS.get(stat, "total") if stat else "total"
+
+        query = [f"SELECT p.name, p.{stat_column}, p.payload FROM pokemon p"]
+        conditions, params = [], []
+        if type_name:
+            query.append("JOIN pokemon_types t ON t.pokemon_id = p.id")
+            conditions.append("t.type = ?")
+            params.append(type_name.lower())
+        if ability:
+            query.append("JOIN pokemon_abilities a ON a.pokemon_id = p.id")
+            conditions.append("a.ability = ?")
+            params.append(ability.lower())
+        if min_value is not None:
+            conditions.append(f"p.{stat_column} >= ?")
+            params.append(min_value)
+        if max_value is not None:
+            conditions.append(f"p.{stat_column} <= ?")
+            params.append(max_value)
+        if conditions:
+            query.append("WHERE " + " AND ".join(conditions))
+        query.append(f"ORDER BY p.{stat_column} DESC LIMIT ?")
+        params.append(limit)
+
+        results = []
+        for name, value, payload in self._db.execute(" ".join(query), params):
+            record = json.loads(payload)
+            results.append({
+                "name": name,
+                "types": [t["type"]["name"] for t in record["types"]],
+                stat_column: value,
+            })
+        return results
+
+    def close(self):
+        self._db.close()
+
+
+def load_dump(path: str) -> Iterator[dict]:
+    """Ler registros de um dump local: arquivo JSONL ou pasta com arquivos .json (ex.: api-data)."""
+    if os.path.isfile(path):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError as e:
+                    # Uma linha corrompida não interrompe a importação do resto do dump:
+                    print(f"Linha {line_number} ignorada: JSON inválido ({e})")
+                    continue
+                yield data
+        return
+
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            if not file_name.endswith(".json"):
+                continue
+            file_path = os.path.join(root, file_name)
+            try:
+                with open(file_path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except ValueError as e:
+                print(f"Arquivo {file_path} ignorado: JSON inválido ({e})")
+                continue
+            # Em dumps do api-data há outros recursos; só interessam registros de Pokémon:
+            if isinstance(data, dict) and {"id", "name", "stats", "types"} <= data.keys():
+                yield data
+
+
+async def download_all(client: httpx.AsyncClient, base_url: str, concurrency: int = 16) -> list[dict]:
+    """Baixar todos os registros /pokemon/{name} da PokeAPI com concorrência limitada."""
+    response = await client.get(f"{base_url}/pokemon", params={"limit": 100000})
+    response.raise_for_status()
+    names = [entry["name"] for entry in response.json()["results"]]
+    semaphore = asyncio.Semaphore(concurrency)
+    records = []
+
+    async def fetch(name: str):
+        async with semaphore:
+            for attempt in range(3):
+                try:
+                    result = await client.get(f"{base_url}/pokemon/{name}")
+                    result.raise_for_status()
+                    records.append(compact_record(result.json()))
+                    return
+                except httpx.HTTPError:
+                    await asyncio.sleep(2**attempt)
+                except ValueError as e:
+                    print(f"Registro de {name} ignorado: {e}")
+                    return
+            print(f"Falha ao baixar {name}")
+
+    await asyncio.gather(*(fetch(name) for name in names))
+    return records
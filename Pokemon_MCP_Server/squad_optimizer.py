@@ -0,0 +1,226 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+Script squad_optimizer.py
+=========================
+Otimizador de times para o create_tournament_squad.
+
+O elenco inteiro é carregado em arrays NumPy (stats totais, tipos one-hot e as
+matrizes de multiplicadores ofensivos/defensivos por tipo) e os times candidatos
+são pontuados em lote com operações vetorizadas:
+
+- stats: média do total de stats base do time;
+- cobertura: fração dos 18 tipos que algum membro acerta com dano super efetivo (STAB);
+- sobreposição de fraquezas: membros fracos ao mesmo tipo além do primeiro;
+- exposição: tipos aos quais o time tem mais membros fracos do que resistentes.
+
+A busca é um beam search sobre os `candidate_pool` Pokémon mais fortes, com
+orçamento de tempo: se o tempo acabar, os melhores times parciais são
+completados de forma gulosa.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+
+TYPES = [
+    "normal", "fire", "water", "electric", "grass", "ice", "fighting", "poison", "ground",
+    "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy",
+]
+TYPE_INDEX = {name: i for i, name in enumerate(TYPES)}
+
+# Multiplicadores diferentes de 1 (tipo atacante -> tipo defensor):
+_TYPE_CHART = {
+    "normal": {"rock": 0.5, "ghost": 0, "steel": 0.5},
+    "fire": {"fire": 0.5, "water": 0.5, "grass": 2, "ice": 2, "bug": 2, "rock": 0.5, "dragon": 0.5, "steel": 2},
+    "water": {"fire": 2, "water": 0.5, "grass": 0.5, "ground": 2, "rock": 2, "dragon": 0.5},
+    "electric": {"water": 2, "electric": 0.5, "grass": 0.5, "ground": 0, "flying": 2, "dragon": 0.5},
+    "grass": {"fire": 0.5, "water": 2, "grass": 0.5, "poison": 0.5, "ground": 2, "flying": 0.5,
+              "bug": 0.5, "rock": 2, "dragon": 0.5, "steel": 0.5},
+    "ice": {"fire": 0.5, "water": 0.5, "grass": 2, "ice": 0.5, "ground": 2, "flying": 2, "dragon": 2, "steel": 0.5},
+    "fighting": {"normal": 2, "ice": 2, "poison": 0.5, "flying": 0.5, "psychic": 0.5, "bug": 0.5, "rock": 2,
+                 "ghost": 0, "dark": 2, "steel": 2, "fairy": 0.5},
+    "poison": {"grass": 2, "poison": 0.5, "ground": 0.5, "rock": 0.5, "ghost": 0.5, "steel": 0, "fairy": 2},
+    "ground": {"fire": 2, "electric": 2, "grass": 0.5, "poison": 2, "flying": 0, "bug": 0.5, "rock": 2, "steel": 2},
+    "flying": {"electric": 0.5, "grass": 2, "fighting": 2, "bug": 2, "rock": 0.5, "steel": 0.5},
+    "psychic": {"fighting": 2, "poison": 2, "psychic": 0.5, "dark": 0, "steel": 0.5},
+    "bug": {"fire": 0.5, "grass": 2, "fighting": 0.5, "poison": 0.5, "flying": 0.5, "psychic": 2, "ghost": 0.5,
+            "dark": 2, "steel": 0.5, "fairy": 0.5},
+    "rock": {"fire": 2, "ice": 2, "fighting": 0.5, "ground": 0.5, "flying": 2, "bug": 2, "steel": 0.5},
+    "ghost": {"normal": 0, "psychic": 2, "ghost": 2, "dark": 0.5},
+    "dragon": {"dragon": 2, "steel": 0.5, "fairy": 0},
+    "dark": {"fighting": 0.5, "psychic": 2, "ghost": 2, "dark": 0.5, "fairy": 0.5},
+    "steel": {"fire": 0.5, "water": 0.5, "electric": 0.5, "ice": 2, "rock": 2, "steel": 0.5, "fairy": 2},
+    "fairy": {"fire": 0.5, "fighting": 2, "poison": 0.5, "dragon": 2, "dark": 2, "steel": 0.5},
+}
+
+# Habilidades que anulam um tipo de ataque:
+ABILITY_IMMUNITIES = {
+    "levitate": "ground",
+    "earth-eater": "ground",
+    "flash-fire": "fire",
+    "well-baked-body": "fire",
+    "water-absorb": "water",
+    "storm-drain": "water",
+    "dry-skin": "water",
+    "volt-absorb": "electric",
+    "lightning-rod": "electric",
+    "motor-drive": "electric",
+    "sap-sipper": "grass",
+}
+
+# Pesos dos componentes da pontuação:
+WEIGHT_STATS = 1.0
+WEIGHT_COVERAGE = 0.6
+WEIGHT_OVERLAP = 0.8
+WEIGHT_EXPOSED = 0.5
+
+# Pokémon de maior total de stats considerados pela busca:
+DEFAULT_CANDIDATE_POOL = 200
+
+
+def build_type_chart() -> np.ndarray:
+    """Matriz 18x18 de multiplicadores (linha: tipo atacante, coluna: tipo defensor)."""
+    chart = np.ones((len(TYPES), len(TYPES)))
+    for attacker, row in _TYPE_CHART.items():
+        for defender, multiplier in row.items():
+            chart[TYPE_INDEX[attacker], TYPE_INDEX[defender]] = multiplier
+    return chart
+
+
+TYPE_CHART = build_type_chart()
+
+
+class Roster:
+    """Elenco carregado em arrays NumPy, pronto para pontuação vetorizada."""
+
+    def __init__(self, records: list[dict]):
+        self.names = [record["name"] for record in records]
+        self.totals = np.array([sum(s["base_stat"] for s in record["stats"]) for record in records], dtype=float)
+
+        # Tipos one-hot (N x 18):
+        self.types = np.zeros((len(records), len(TYPES)), dtype=bool)
+        for i, record in enumerate(records):
+            for t in record["types"]:
+                if t["type"]["name"] in TYPE_INDEX:
+                    self.types[i, TYPE_INDEX[t["type"]["name"]]] = True
+
+        # Defesa (N x 18 atacantes): produto dos multiplicadores sobre os tipos do Pokémon.
+        self.defense = np.prod(np.where(self.types[:, :, None], TYPE_CHART.T[None, :, :], 1.0), axis=1)
+        for i, record in enumerate(records):
+            for a in record["abilities"]:
+                immune_type = ABILITY_IMMUNITIES.get(a["ability"]["name"])
+                if immune_type is not None:
+                    self.defense[i, TYPE_INDEX[immune_type]] = 0.0
+
+        # Ataque STAB (N x 18 defensores): melhor multiplicador entre os tipos do Pokémon.
+        self.offense = np.max(np.where(self.types[:, :, None], TYPE_CHART[None, :, :], 0.0), axis=1)
+        self.max_total = self.totals.max() if len(records) else 1.0
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def score_teams(self, teams: np.ndarray) -> np.ndarray:
+        """Pontuar um lote de times (B x k índices do elenco) de uma só vez."""
+        team_size = teams.shape[1]
+        stats = self.totals[teams].mean(axis=1) / self.max_total
+        coverage = (self.offense[teams].max(axis=1) >= 2).mean(axis=1)
+
+        defense = self.defense[teams]  # B x k x 18
+        weak = (defense > 1).sum(axis=1)
+        resist = (defense < 1).sum(axis=1)
+        overlap = np.clip(weak - 1, 0, None).sum(axis=1) / (len(TYPES) * max(team_size - 1, 1))
+        exposed = (weak > resist).mean(axis=1)
+
+        return (
+            WEIGHT_STATS * stats
+            + WEIGHT_COVERAGE * coverage
+            - WEIGHT_OVERLAP * overlap
+            - WEIGHT_EXPOSED * exposed
+        )
+
+    def breakdown(self, team: np.ndarray) -> dict:
+        """Componentes da pontuação de um único time."""
+        defense = self.defense[team]
+        weak = (defense > 1).sum(axis=0)
+        resist = (defense < 1).sum(axis=0)
+        covered = self.offense[team].max(axis=0) >= 2
+        return {
+            "average_total": float(self.totals[team].mean()),
+            "coverage": [TYPES[i] for i in np.flatnonzero(covered)],
+            "exposed_to": [TYPES[i] for i in np.flatnonzero(weak > resist)],
+        }
+
+
+@dataclass
+class SquadResult:
+    names: list[str]
+    score: float
+    breakdown: dict
+    teams_scored: int
+    elapsed: float
+    completed_search: bool
+
+
+def max_team_size(roster: Roster, candidate_pool: int = DEFAULT_CANDIDATE_POOL) -> int:
+    """Maior time possível: só os `candidate_pool` Pokémon de maior total entram na busca."""
+    return min(len(roster), candidate_pool)
+
+
+def optimize_squad(
+    roster: Roster,
+    team_size: int = 6,
+    beam_width: int = 256,
+    candidate_pool: int = DEFAULT_CANDIDATE_POOL,
+    time_budget: float = 2.0,
+) -> SquadResult:
+    """Buscar o melhor time com beam search sobre os Pokémon de maior total de stats."""
+    start = time.perf_counter()
+    if team_size < 1:
+        raise ValueError("team_size deve ser pelo menos 1.")
+    candidates = np.argsort(-roster.totals, kind="stable")[:candidate_pool]
+    team_size = min(team_size, len(candidates))
+    teams_scored = 0
+
+    beams = candidates[:, None]
+    scores = roster.score_teams(beams)
+    teams_scored += len(beams)
+    beams = beams[np.argsort(-scores)[:beam_width]]
+    completed_search = True
+
+    while beams.shape[1] < team_size:
+        if time.perf_counter() - start > time_budget:
+            completed_search = False
+            break
+
+        # Expandir cada time do beam com cada candidato que ainda não está nele:
+        expanded = np.concatenate(
+            [np.repeat(beams, len(candidates), axis=0), np.tile(candidates, len(beams))[:, None]], axis=1
+        )
+        already_in_team = (beams[:, :, None] == candidates[None, None, :]).any(axis=1).reshape(-1)
+        expanded = np.unique(np.sort(expanded[~already_in_team], axis=1), axis=0)
+
+        scores = roster.score_teams(expanded)
+        teams_scored += len(expanded)
+        keep = min(beam_width, len(expanded))
+        beams = expanded[np.argpartition(-scores, keep - 1)[:keep]]
+
+    # Orçamento esgotado: completar o melhor time parcial de forma gulosa.
+    best = beams[np.argmax(roster.score_teams(beams))]
+    while len(best) < team_size:
+        remaining = candidates[~np.isin(candidates, best)]
+        options = np.concatenate([np.tile(best, (len(remaining), 1)), remaining[:, None]], axis=1)
+        option_scores = roster.score_teams(options)
+        teams_scored += len(options)
+        best = options[np.argmax(option_scores)]
+
+    return SquadResult(
+        names=[roster.names[i] for i in best],
+        score=float(roster.score_teams(best[None, :])[0]),
+        breakdown=roster.breakdown(best),
+        teams_scored=teams_scored,
+        elapsed=time.perf_counter() - start,
+        completed_search=completed_search,
+    )
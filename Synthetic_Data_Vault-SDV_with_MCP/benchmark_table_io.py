@@ -0,0 +1,63 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.; Dr. Eddy Giusepe Chirinos Isidro
+
+Script benchmark_table_io.py
+============================
+Compara o tempo de carga de CSV e Parquet usando o arquivo data/guests.csv
+replicado N vezes (padrão: 1000x), tanto da tabela inteira quanto de uma
+única coluna (o caso do sdv_visualize).
+
+Run
+===
+uv run benchmark_table_io.py --repeat 1000 --column amenities_fee
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+from table_io import TABLE_FORMATS, read_table_file, table_path
+
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def time_call(func, rounds: int) -> float:
+    """Melhor tempo (em segundos) entre `rounds` execuções."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1000, help="Quantas vezes replicar data/guests.csv")
+    parser.add_argument("--column", default="amenities_fee", help="Coluna usada no teste de projeção")
+    parser.add_argument("--rounds", type=int, default=3, help="Execuções por medição (usa a melhor)")
+    args = parser.parse_args()
+
+    guests = pd.read_csv(os.path.join(DATA_FOLDER, "guests.csv"))
+    big_table = pd.concat([guests] * args.repeat, ignore_index=True)
+    print(f"Tabela de teste: {len(big_table):,} linhas x {len(big_table.columns)} colunas")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        big_table.to_csv(table_path(tmp_dir, "guests", "csv"), index=False)
+        big_table.to_parquet(table_path(tmp_dir, "guests", "parquet"), index=False)
+        big_table.to_feather(table_path(tmp_dir, "guests", "arrow"))
+
+        print(f"\n{'formato':<10}{'tamanho (MB)':>14}{'tabela (s)':>14}{'coluna (s)':>14}")
+        for table_format in TABLE_FORMATS:
+            path = table_path(tmp_dir, "guests", table_format)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            full_time = time_call(lambda: read_table_file(path, table_format), args.rounds)
+            column_time = time_call(lambda: read_table_file(path, table_format, columns=[args.column]), args.rounds)
+            print(f"{table_format:<10}{size_mb:>14.1f}{full_time:>14.3f}{column_time:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
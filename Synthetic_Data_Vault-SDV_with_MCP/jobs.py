@@ -0,0 +1,309 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.; Dr. Eddy Giusepe Chirinos Isidro
+
+Script jobs.py
+==============
+Subsistema de jobs assíncronos do servidor sdv_mcp.
+
+As ferramentas pesadas (generate, evaluate, visualize) são enviadas para um pool
+de processos e retornam imediatamente um ID de job. Assim o event loop do MCP
+continua respondendo (list_tools, outras chamadas) enquanto um fit de vários
+minutos roda, e vários jobs podem executar ao mesmo tempo.
+
+Todas as ferramentas usam a mesma pasta 'synthetic_data': o generate a reescreve
+e os demais jobs a leem. Para que dois generate não misturem tabelas de execuções
+diferentes (quebrando as chaves estrangeiras) e ninguém leia a pasta no meio de
+uma troca de arquivos, o JobManager libera os jobs em ordem de chegada como um
+lock de leitura/escrita: vários jobs de leitura juntos, ou um generate sozinho.
+Um job que espera a sua vez fica 'pending' (progresso: stage 'waiting').
+
+O visualize_many roda em duas etapas: um processo de trabalho carrega as tabelas
+e monta as figuras, e cada PNG é então renderizado como uma subtarefa no mesmo
+pool, em paralelo. O job só termina quando todas as subtarefas terminam.
+
+O progresso é publicado pelos processos de trabalho em um dicionário compartilhado
+(multiprocessing.Manager) e consultado pelas ferramentas sdv_job_status e sdv_job_result.
+
+Cache de tabelas: cada processo de trabalho tem o seu próprio table_cache
+(table_cache.py). SDV_TABLE_CACHE_MB é o orçamento total: cada um dos
+SDV_JOB_WORKERS processos recebe SDV_TABLE_CACHE_MB / SDV_JOB_WORKERS. O preço de
+tirar evaluate/visualize do processo do servidor é que a mesma tabela é lida uma
+vez por processo que a usar, e um acerto depende de qual processo pega o job.
+Com poucas tabelas grandes e muitas chamadas, SDV_JOB_WORKERS=1 faz todos os jobs
+compartilharem um único cache com o orçamento inteiro. As estatísticas de cada
+processo são devolvidas ao fim de cada job, com sucesso ou falha, e o
+sdv_cache_stats as mostra por processo.
+"""
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import tools
+from table_cache import DEFAULT_MAX_MEMORY_MB, table_cache
+
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("SDV_JOB_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_FINISHED_JOBS = 100
+# Jobs que reescrevem a pasta 'synthetic_data' (os demais só a leem):
+WRITER_JOBS = {"generate"}
+
+# Funções que podem ser executadas como job (nome -> função em tools.py):
+JOB_FUNCTIONS = {
+    "generate": tools.generate,
+    "evaluate": tools.evaluate,
+    "visualize": tools.visualize,
+    "visualize_many": tools.visualize_many,
+}
+
+
+def _init_worker(cache_memory_mb: float):
+    """Executado ao subir cada processo de trabalho: aplica a sua fatia do orçamento do cache."""
+    table_cache.max_bytes = int(cache_memory_mb * 1024 * 1024)
+
+
+def _run_job(job_id: str, kind: str, kwargs: dict, shared_state) -> dict:
+    """Executado no processo de trabalho: roda a função e publica o progresso."""
+    shared_state[job_id] = {"status": "running", "started_at": time.time(), "progress": None}
+
+    def report(progress: dict):
+        state = shared_state[job_id]
+        state["progress"] = progress
+        shared_state[job_id] = state
+
+    if kind == "generate":
+        kwargs = {**kwargs, "progress_callback": report}
+    elif kind == "visualize_many":
+        # A renderização dos PNGs vira subtarefas no pool do JobManager (ver _render_plots):
+        kwargs = {**kwargs, "render": False}
+
+    outcome = {"worker_pid": os.getpid()}
+    try:
+        outcome["result"] = JOB_FUNCTIONS[kind](**kwargs)
+    except Exception as e:
+        # A falha volta como dado para que as estatísticas do cache deste processo não se percam.
+        outcome["error"] = f"{type(e).__name__}: {e}"
+    outcome["worker_cache"] = table_cache.stats()
+    return outcome
+
+
+class JobManager:
+    """Mantém o pool de processos e o registro dos jobs submetidos."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        # 'spawn' evita herdar por fork as threads do event loop do servidor:
+        context = multiprocessing.get_context("spawn")
+        self._manager = context.Manager()
+        self._shared_state = self._manager.dict()
+        # SDV_TABLE_CACHE_MB vale para o pool inteiro, não para cada processo:
+        self.cache_memory_mb = DEFAULT_MAX_MEMORY_MB
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.cache_memory_mb / max_workers,),
+        )
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._worker_cache_stats = {}
+        # Lock de leitura/escrita da pasta 'synthetic_data' (ver o docstring do módulo):
+        self._waiting = deque()
+        self._active = {}
+        self._readers = 0
+        self._writing = False
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, **kwargs) -> str:
+        """Submeter um job e retornar o seu ID."""
+        if kind not in JOB_FUNCTIONS:
+            raise ValueError(f"Tipo de job '{kind}' desconhecido. Use um de {list(JOB_FUNCTIONS)}.")
+
+        job_id = uuid.uuid4().hex[:12]
+        done = Future()
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "kind": kind,
+                "arguments": kwargs,
+                "status": "pending",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "progress": {"stage": "waiting"},
+                "result": None,
+                "error": None,
+            }
+            self._prune()
+            # Resolvido quando o job termina de vez (no visualize_many, depois das subtarefas):
+            self._futures[job_id] = done
+            self._waiting.append((job_id, kind, kwargs))
+            ready = self._take_ready()
+        self._start(ready)
+        return job_id
+
+    def _take_ready(self) -> list[tuple]:
+        """Retirar da fila, em ordem, os jobs que já podem usar a pasta (chamado com o _lock)."""
+        ready = []
+        while self._waiting:
+            job_id, kind, kwargs = self._waiting[0]
+            if kind in WRITER_JOBS:
+                if self._writing or self._readers:
+                    break
+                self._writing = True
+            else:
+                if self._writing:
+                    break
+                self._readers += 1
+            self._active[job_id] = kind
+            ready.append(self._waiting.popleft())
+        return ready
+
+    def _start(self, ready: list[tuple]):
+        # Fora do _lock: o callback pode rodar nesta thread se o job já tiver terminado.
+        for job_id, kind, kwargs in ready:
+            try:
+                future = self._executor.submit(_run_job, job_id, kind, kwargs, self._shared_state)
+            except RuntimeError as e:
+                # Ex.: o pool já foi encerrado.
+                self._complete(job_id, {"error": f"{type(e).__name__}: {e}"})
+                continue
+            future.add_done_callback(lambda finished, job_id=job_id: self._finish(job_id, finished))
+
+    def _finish(self, job_id: str, future: Future):
+        state = self._shared_state.pop(job_id, {})
+        try:
+            outcome = future.result()
+        except Exception as e:
+            # Ex.: o processo de trabalho morreu (BrokenProcessPool) ou o job foi cancelado.
+            outcome = {"error": f"{type(e).__name__}: {e}"}
+        result = outcome.get("result")
+        pending_renders = isinstance(result, dict) and "pending_renders" in result
+        with self._lock:
+            if "worker_cache" in outcome:
+                self._worker_cache_stats[outcome["worker_pid"]] = outcome["worker_cache"]
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["started_at"] = state.get("started_at") or job["started_at"]
+                job["progress"] = state.get("progress")
+                if pending_renders:
+                    job["status"] = "running"
+                    job["progress"] = {"stage": "render", "plots": len(result["pending_renders"])}
+        if pending_renders:
+            # Fora do callback: ele roda na thread de gerenciamento do pool, que não deve submeter tarefas.
+            threading.Thread(target=self._render_plots, args=(job_id, outcome), daemon=True).start()
+        else:
+            self._complete(job_id, outcome)
+
+    def _render_plots(self, job_id: str, outcome: dict):
+        try:
+            outcome["result"] = tools.render_plots(outcome["result"], self._executor)
+        except Exception as e:
+            # Ex.: o pool foi encerrado enquanto as subtarefas eram submetidas.
+            outcome = {"error": f"{type(e).__name__}: {e}"}
+        self._complete(job_id, outcome)
+
+    def _complete(self, job_id: str, outcome: dict):
+        with self._lock:
+            if self._active.pop(job_id) in WRITER_JOBS:
+                self._writing = False
+            else:
+                self._readers -= 1
+            ready = self._take_ready()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["finished_at"] = time.time()
+                if "error" in outcome:
+                    job["status"] = "failed"
+                    job["error"] = outcome["error"]
+                else:
+                    job["status"] = "done"
+                    job["result"] = outcome["result"]
+            done = self._futures.pop(job_id, None)
+        if done is not None:
+            done.set_result(None)
+        self._start(ready)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job["finished_at"] is not None]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def status(self, job_id: str) -> dict:
+        """Status, progresso e tempo decorrido de um job (sem o resultado)."""
+        with self._lock:
+            if job_id not in self._jobs:
+                raise KeyError(job_id)
+            job = dict(self._jobs[job_id])
+        return self._describe(job)
+
+    def _describe(self, job: dict) -> dict:
+        """Completar a cópia de um job com o progresso publicado e os tempos."""
+        job_id = job["job_id"]
+        if job["finished_at"] is None:
+            state = self._shared_state.get(job_id)
+            if state is not None:
+                job["status"] = state["status"]
+                job["started_at"] = state["started_at"]
+                job["progress"] = state["progress"]
+
+        now = job["finished_at"] or time.time()
+        job["elapsed_seconds"] = now - job["started_at"] if job["started_at"] else 0.0
+        job["queued_seconds"] = (job["started_at"] or now) - job["submitted_at"]
+        job.pop("result")
+        return job
+
+    def future(self, job_id: str) -> Future | None:
+        with self._lock:
+            return self._futures.get(job_id)
+
+    def result(self, job_id: str) -> dict:
+        """Status completo do job, incluindo o resultado ou o erro quando terminado."""
+        with self._lock:
+            if job_id not in self._jobs:
+                raise KeyError(job_id)
+            job = dict(self._jobs[job_id])
+        result = job["result"]
+        job = self._describe(job)
+        job["result"] = result
+        return job
+
+    def list_jobs(self) -> list[dict]:
+        # Cópias feitas sob o _lock: um submit concorrente pode podar jobs antigos.
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values()]
+        return [self._describe(job) for job in jobs]
+
+    def worker_cache_stats(self) -> dict:
+        """Últimas estatísticas do cache de tabelas reportadas por cada processo de trabalho."""
+        with self._lock:
+            return dict(self._worker_cache_stats)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Criar o JobManager sob demanda (os processos só sobem no primeiro job)."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
+
+
+def shutdown_job_manager():
+    """Encerrar o pool de processos, se ele chegou a ser criado."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is not None:
+            _job_manager.shutdown()
+            _job_manager = None
@@ -0,0 +1,98 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.; Dr. Eddy Giusepe Chirinos Isidro
+
+Script model_store.py
+=====================
+Armazenamento em disco de sintetizadores SDV já treinados.
+
+Cada modelo é identificado por um hash do conteúdo dos arquivos de tabela e do
+metadata.json da pasta de dados reais. Enquanto esses arquivos não mudarem,
+o sintetizador salvo é reutilizado e a geração vai direto para o sample().
+
+Junto de cada modelo fica um JSON com o número de linhas de cada tabela real
+usada no fit, que o generate usa para estimar quantas linhas cada escala produz.
+"""
+import hashlib
+import json
+import os
+
+import sdv
+from sdv.multi_table import HMASynthesizer
+from table_io import list_table_files
+
+
+MODEL_STORE_FOLDER = "synthetic_models"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_data_fingerprint(folder_name: str, synthesizer_name: str = "HMASynthesizer") -> str:
+    """Calcular o hash SHA-256 das tabelas (CSV/Parquet/Arrow) e do metadata.json de uma pasta de dados."""
+    digest = hashlib.sha256()
+
+    # O sintetizador e a versão do SDV fazem parte da chave (arquivos .pkl não são portáveis entre versões):
+    digest.update(f"{synthesizer_name}:{sdv.__version__}".encode())
+
+    metadata_file = os.path.join(folder_name, "metadata.json")
+    for path in [metadata_file, *list_table_files(folder_name)]:
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """Guarda e recupera sintetizadores treinados indexados por fingerprint."""
+
+    def __init__(self, folder_name: str = MODEL_STORE_FOLDER):
+        self.folder_name = folder_name
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.folder_name, f"{key}.pkl")
+
+    def table_sizes_path_for(self, key: str) -> str:
+        return os.path.join(self.folder_name, f"{key}.table_sizes.json")
+
+    def load(self, key: str) -> HMASynthesizer | None:
+        """Carregar o sintetizador salvo para a chave ou None se não existir."""
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return HMASynthesizer.load(path)
+        except Exception:
+            # Arquivo corrompido ou incompatível: descartar e treinar novamente.
+            os.remove(path)
+            return None
+
+    def load_table_sizes(self, key: str) -> dict[str, int]:
+        """Linhas de cada tabela real usada no fit do modelo, ou {} se não foram salvas."""
+        try:
+            with open(self.table_sizes_path_for(key)) as f:
+                table_sizes = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(table_sizes, dict) or not all(isinstance(rows, int) for rows in table_sizes.values()):
+            return {}
+        return table_sizes
+
+    def save(self, key: str, synthesizer: HMASynthesizer, table_sizes: dict[str, int]) -> str:
+        """Salvar o sintetizador e os tamanhos das tabelas de forma atômica e retornar o caminho do modelo."""
+        os.makedirs(self.folder_name, exist_ok=True)
+        self.save_table_sizes(key, table_sizes)
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        synthesizer.save(tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def save_table_sizes(self, key: str, table_sizes: dict[str, int]):
+        """Salvar (de forma atômica) o número de linhas de cada tabela real do modelo."""
+        os.makedirs(self.folder_name, exist_ok=True)
+        path = self.table_sizes_path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(table_sizes, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,23 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.; Dr. Eddy Giusepe Chirinos Isidro
+
+Script plot_render.py
+=====================
+Renderização de figuras Plotly em PNG (kaleido), uma figura por tarefa. Nos jobs
+do sdv_visualize_many as tarefas rodam no pool do JobManager (jobs.py); no
+visualize_many chamado como biblioteca, no pool de renderização do tools.py.
+As figuras são montadas pelo sdv.evaluation no processo que chama; aqui só chega o
+JSON da figura, então a tarefa em si só depende do Plotly.
+"""
+import time
+
+import plotly.io as pio
+
+
+def render_figure(figure_json: str, filepath: str) -> float:
+    """Renderizar uma figura serializada em JSON e retornar o tempo gasto (s)."""
+    start = time.perf_counter()
+    fig = pio.from_json(figure_json)
+    fig.write_image(filepath)
+    return time.perf_counter() - start
@@ -0,0 +1,264 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.; Dr. Eddy Giusepe Chirinos Isidro
+
+Script quality_evaluation.py
+============================
+Avaliação de qualidade incremental e por amostragem para dados sintéticos grandes.
+
+Em vez de um único relatório multi-tabela, a avaliação é dividida em partes:
+
+- uma parte por tabela (Column Shapes e Column Pair Trends);
+- uma parte por relacionamento (Cardinality e Intertable Trends).
+
+O resultado de cada parte fica em cache, indexado pelo mtime/tamanho dos arquivos
+reais e sintéticos envolvidos. Ao regenerar uma tabela, só as partes que dependem
+dela são recalculadas. Como no relatório multi-tabela do SDV, a pontuação de cada
+propriedade é a média por parte (tabela ou relacionamento) e depois a média entre
+as partes; a pontuação geral é a média das propriedades.
+
+Com `sample_size`, cada parte é avaliada em amostras estratificadas (nos
+relacionamentos, as linhas filhas acompanham as linhas pai amostradas) e a
+avaliação é repetida `repeats` vezes para estimar um intervalo de confiança de 95%.
+"""
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from sdv.evaluation.single_table import evaluate_quality as evaluate_single_table_quality
+from sdmetrics.reports.multi_table import QualityReport as MultiTableQualityReport
+from sdmetrics.reports.multi_table._properties import Cardinality, InterTableTrends
+from sdv.metadata import Metadata
+from table_cache import file_stamp, table_cache
+from table_io import resolve_table_path
+
+
+TABLE_PROPERTIES = ("Column Shapes", "Column Pair Trends")
+# Só as propriedades de relacionamento: um relatório multi-tabela completo recalcularia
+# também Column Shapes e Column Pair Trends das duas tabelas.
+RELATIONSHIP_PROPERTIES = {"Cardinality": Cardinality, "Intertable Trends": InterTableTrends}
+MAX_CACHED_PARTS = 256
+_Z_95 = 1.96
+
+_parts_cache = OrderedDict()
+_parts_lock = threading.Lock()
+
+
+def _stratify_column(df: pd.DataFrame, table_metadata) -> str | None:
+    """Escolher a coluna categórica com menos categorias (>1) para estratificar a amostra."""
+    best_column, best_cardinality = None, None
+    for column_name, column_metadata in table_metadata.columns.items():
+        if column_metadata.get("sdtype") not in ("categorical", "boolean") or column_name not in df:
+            continue
+        cardinality = df[column_name].nunique(dropna=False)
+        if cardinality > 1 and (best_cardinality is None or cardinality < best_cardinality):
+            best_column, best_cardinality = column_name, cardinality
+    return best_column
+
+
+def stratified_sample(df: pd.DataFrame, sample_size: int, stratify_column: str | None, random_state: int) -> pd.DataFrame:
+    """Amostra de até `sample_size` linhas com alocação proporcional por estrato."""
+    if len(df) <= sample_size:
+        return df
+    if stratify_column is None:
+        return df.sample(n=sample_size, random_state=random_state)
+    fraction = sample_size / len(df)
+    return df.groupby(stratify_column, group_keys=False, dropna=False).sample(
+        frac=fraction, random_state=random_state
+    )
+
+
+def _sub_metadata(metadata: Metadata, table_names, relationships=()) -> Metadata:
+    return Metadata.load_from_dict({
+        "tables": {name: metadata.tables[name].to_dict() for name in table_names},
+        "relationships": list(relationships),
+        "METADATA_SPEC_VERSION": "V1",
+    })
+
+
+def _sample_table(real, synthetic, table_metadata, sample_size, random_state):
+    if sample_size is None:
+        return real, synthetic
+    stratify_column = _stratify_column(real, table_metadata)
+    return (
+        stratified_sample(real, sample_size, stratify_column, random_state),
+        stratified_sample(synthetic, sample_size, stratify_column, random_state),
+    )
+
+
+def _table_details(table_name, metadata, real, synthetic, sample_size, random_state) -> dict:
+    real, synthetic = _sample_table(real, synthetic, metadata.tables[table_name], sample_size, random_state)
+    report = evaluate_single_table_quality(
+        real_data=real,
+        synthetic_data=synthetic,
+        metadata=_sub_metadata(metadata, [table_name]),
+        verbose=False,
+    )
+    return {name: report.get_details(name).assign(Table=table_name) for name in TABLE_PROPERTIES}
+
+
+def _relationship_details(relationship, metadata, real_tables, synthetic_tables, sample_size, random_state) -> dict:
+    parent = relationship["parent_table_name"]
+    child = relationship["child_table_name"]
+    primary_key = relationship["parent_primary_key"]
+    foreign_key = relationship["child_foreign_key"]
+
+    real_data, synthetic_data = {}, {}
+    for data, tables in ((real_data, real_tables), (synthetic_data, synthetic_tables)):
+        parent_df, child_df = tables[parent], tables[child]
+        if sample_size is not None:
+            # As linhas filhas acompanham as linhas pai amostradas, preservando a cardinalidade:
+            stratify_column = _stratify_column(real_tables[parent], metadata.tables[parent])
+            parent_df = stratified_sample(parent_df, sample_size, stratify_column, random_state)
+            child_df = child_df[child_df[foreign_key].isin(parent_df[primary_key])]
+        data[parent], data[child] = parent_df, child_df
+
+    # Como no relatório do SDV, as colunas de data viram datetime (em cópias, sem tocar no cache):
+    sub_metadata = _sub_metadata(metadata, [parent, child], [relationship]).to_dict()
+    real_data = {name: df.copy(deep=False) for name, df in real_data.items()}
+    synthetic_data = {name: df.copy(deep=False) for name, df in synthetic_data.items()}
+    MultiTableQualityReport.convert_datetimes(real_data, synthetic_data, sub_metadata)
+
+    details = {}
+    for name, property_class in RELATIONSHIP_PROPERTIES.items():
+        quality_property = property_class()
+        quality_property.get_score(real_data, synthetic_data, sub_metadata)
+        details[name] = quality_property.get_details()
+    return details
+
+
+def _cached_part(key, compute):
+    with _parts_lock:
+        if key in _parts_cache:
+            _parts_cache.move_to_end(key)
+            return _parts_cache[key], True
+
+    value = compute()
+    with _parts_lock:
+        _parts_cache[key] = value
+        while len(_parts_cache) > MAX_CACHED_PARTS:
+            _parts_cache.popitem(last=False)
+    return value, False
+
+
+def _mean_and_interval(values: list[float]) -> tuple[float, float | None]:
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, None
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+    return mean, _Z_95 * math.sqrt(variance / len(values))
+
+
+def evaluate_by_parts(
+    folder_name: str,
+    metadata: Metadata,
+    table_format: str,
+    sample_size: int | None = None,
+    repeats: int = 3,
+    seed: int = 0,
+) -> dict:
+    """Avaliar a qualidade por tabela e por relacionamento, reaproveitando partes em cache."""
+    if sample_size is None:
+        repeats = 1
+    elif sample_size <= 0 or repeats <= 0:
+        raise ValueError("Os parâmetros 'sample_size' e 'repeats' devem ser positivos.")
+
+    # Identificar a versão atual (caminho, mtime, tamanho) dos arquivos de cada tabela:
+    stamps = {}
+    for table_name in metadata.tables:
+        real_path, _ = resolve_table_path(folder_name, table_name, table_format)
+        synthetic_path, _ = resolve_table_path("synthetic_data", table_name, table_format)
+        stamps[table_name] = tuple(
+            (os.path.abspath(path), *file_stamp(path)) for path in (real_path, synthetic_path)
+        )
+
+    real_tables, synthetic_tables = {}, {}
+
+    def load(table_name):
+        if table_name not in real_tables:
+            real_tables[table_name] = table_cache.get_table(folder_name, table_name, table_format)
+            synthetic_tables[table_name] = table_cache.get_table("synthetic_data", table_name, table_format)
+
+    sampling_key = (sample_size, repeats, seed)
+    recomputed, reused = [], []
+    parts = []
+
+    for table_name in metadata.tables:
+        table_metadata = metadata.tables[table_name].to_dict()
+        key = ("table", table_name, str(table_metadata), stamps[table_name], sampling_key)
+
+        def compute(table_name=table_name):
+            load(table_name)
+            return [
+                _table_details(
+                    table_name, metadata, real_tables[table_name], synthetic_tables[table_name],
+                    sample_size, seed + repeat,
+                )
+                for repeat in range(repeats)
+            ]
+
+        details, hit = _cached_part(key, compute)
+        (reused if hit else recomputed).append(table_name)
+        parts.append(details)
+
+    for relationship in metadata.relationships:
+        parent = relationship["parent_table_name"]
+        child = relationship["child_table_name"]
+        part_name = f"{parent}->{child}"
+        key = (
+            "relationship", str(sorted(relationship.items())),
+            str(metadata.tables[parent].to_dict()), str(metadata.tables[child].to_dict()),
+            stamps[parent], stamps[child], sampling_key,
+        )
+
+        def compute(relationship=relationship, parent=parent, child=child):
+            load(parent)
+            load(child)
+            return [
+                _relationship_details(
+                    relationship, metadata, real_tables, synthetic_tables, sample_size, seed + repeat,
+                )
+                for repeat in range(repeats)
+            ]
+
+        details, hit = _cached_part(key, compute)
+        (reused if hit else recomputed).append(part_name)
+        parts.append(details)
+
+    # Agregar as pontuações de cada propriedade em cada repetição: primeiro a média
+    # dentro de cada parte (tabela ou relacionamento), depois a média entre as partes:
+    property_scores = {}
+    overall_scores = []
+    for repeat in range(repeats):
+        repeat_scores = {}
+        for property_name in (*TABLE_PROPERTIES, *RELATIONSHIP_PROPERTIES):
+            part_scores = [
+                part[repeat][property_name]["Score"].dropna().mean()
+                for part in parts
+                if property_name in part[repeat] and "Score" in part[repeat][property_name]
+            ]
+            part_scores = [score for score in part_scores if pd.notna(score)]
+            if part_scores:
+                repeat_scores[property_name] = float(sum(part_scores) / len(part_scores))
+                property_scores.setdefault(property_name, []).append(repeat_scores[property_name])
+        if repeat_scores:
+            overall_scores.append(sum(repeat_scores.values()) / len(repeat_scores))
+
+    if not overall_scores:
+        raise ValueError("Nenhuma propriedade de qualidade pôde ser calculada para estes dados.")
+
+    overall_score, overall_interval = _mean_and_interval(overall_scores)
+    properties = []
+    for property_name, scores in property_scores.items():
+        score, interval = _mean_and_interval(scores)
+        properties.append({"Property": property_name, "Score": score, "CI95": interval})
+
+    return {
+        "Overall Score": overall_score,
+        "Overall CI95": overall_interval,
+        "Properties": properties,
+        "Sampling": {"sample_size": sample_size, "repeats": repeats, "seed": seed},
+        "Parts": {"recomputed": recomputed, "reused": reused},
+    }
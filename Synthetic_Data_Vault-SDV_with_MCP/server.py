@@ -7,57 +7,96 @@ Script server.py
 Aqui, temos um script de servidor que expõe a ferramenta usando a 
 biblioteca MCP, decorando as funções usando o tooldecorador.
 
+As ferramentas pesadas rodam como jobs em um pool de processos (ver jobs.py):
+cada chamada retorna um ID de job, acompanhado com sdv_job_status e sdv_job_result.
+
 Com ferramentas e servidor prontos, vamos integrá-lo ao nosso Cursor IDE!
 """
+import asyncio
 from mcp.server.fastmcp import FastMCP
-from tools import generate, evaluate, visualize
+from jobs import get_job_manager, shutdown_job_manager
 
 
 # Criar instância FastMCP:
 mcp = FastMCP("sdv_mcp")
 
 
+def _submit(kind: str, **kwargs) -> dict:
+    job_id = get_job_manager().submit(kind, **kwargs)
+    return {
+        "job_id": job_id,
+        "status": "pending",
+        "message": f"Job '{kind}' submetido. Acompanhe com sdv_job_status e obtenha o resultado com sdv_job_result.",
+    }
+
+
 @mcp.tool() # <--- Registra tools para o MCP
-def sdv_generate(folder_name: str) -> str:
+def sdv_generate(
+    folder_name: str,
+    scale: float = 1.0,
+    max_rows: int | None = None,
+    output_format: str = "csv",
+) -> dict:
     """Gerar dados sintéticos com base em dados reais usando o sintetizador SDV.
 
     Esta ferramenta lê arquivos CSV da pasta especificada, cria uma versão sintética
-    desses dados e salva em uma pasta 'synthetic_data'.
+    desses dados e salva em uma pasta 'synthetic_data'. O sintetizador treinado fica
+    salvo na pasta 'synthetic_models' e é reutilizado enquanto os dados não mudarem.
+    A geração roda em segundo plano: use sdv_job_status para acompanhar o progresso
+    (linhas geradas e linhas/s) e sdv_job_result para obter a mensagem final.
+    Um generate espera os jobs que estão lendo 'synthetic_data' terminarem, e os
+    jobs submetidos depois dele esperam a nova geração ficar completa.
 
     Args:
         folder_name (str): Path para a pasta contendo arquivos CSV de dados e metadata.json
+        scale (float): Fator de escala em relação ao tamanho dos dados reais (padrão: 1.0)
+        max_rows (int | None): Número máximo de linhas geradas somando todas as tabelas, dividido entre elas na proporção do tamanho real
+        output_format (str): Formato dos arquivos gerados: 'csv', 'parquet' ou 'arrow' (padrão: 'csv')
 
     Returns:
-        str: Mensagem de sucesso com informações sobre as tabelas geradas
+        dict: ID do job submetido
     """
-    try:
-        return generate(folder_name)
-    except FileNotFoundError as e:
-        return f"Erro: {str(e)}"
-    except RuntimeError as e:
-        return f"Erro: {str(e)}"
+    return _submit(
+        "generate",
+        folder_name=folder_name,
+        scale=scale,
+        max_rows=max_rows,
+        output_format=output_format,
+    )
 
 
 @mcp.tool()
-def sdv_evaluate(folder_name: str) -> dict:
+def sdv_evaluate(
+    folder_name: str,
+    table_format: str = "auto",
+    sample_size: int | None = None,
+    repeats: int = 3,
+    incremental: bool = False,
+) -> dict:
     """Avaliar a qualidade dos dados sintéticos em comparação com dados reais.
 
     Esta ferramenta compara os dados sintéticos na pasta 'synthetic_data'
     com os dados reais na pasta especificada e gera métricas de qualidade.
+    A avaliação roda em segundo plano como um job.
 
     Args:
         folder_name (str): Path para a pasta contendo os arquivos CSV de dados originais e metadata.json
+        table_format (str): 'csv', 'parquet', 'arrow' ou 'auto' para usar o arquivo mais recente de cada tabela
+        sample_size (int | None): Avaliar em amostras estratificadas com este número de linhas por tabela
+        repeats (int): Número de amostras usadas para o intervalo de confiança (com sample_size)
+        incremental (bool): Avaliar por tabela/relacionamento, recalculando apenas o que mudou
 
     Returns:
-        dict: Resultados da avaliação incluindo pontuação geral e propriedades detalhadas
+        dict: ID do job submetido; o resultado (pontuação geral e propriedades) vem de sdv_job_result
     """
-    try:
-        result = evaluate(folder_name)
-        return result
-    except FileNotFoundError as e:
-        return {"error": f"Arquivo não encontrado: {str(e)}"}
-    except RuntimeError as e:
-        return {"error": f"Avaliação falhou: {str(e)}"}
+    return _submit(
+        "evaluate",
+        folder_name=folder_name,
+        table_format=table_format,
+        sample_size=sample_size,
+        repeats=repeats,
+        incremental=incremental,
+    )
 
 
 @mcp.tool()
@@ -65,29 +104,145 @@ def sdv_visualize(
     folder_name: str,
     table_name: str,
     column_name: str,
-) -> str:
+    table_format: str = "auto",
+) -> dict:
     """Gerar visualização comparando dados reais e sintéticos para uma coluna específica.
 
     Esta ferramenta cria uma visualização comparativa entre os dados reais na pasta especificada
     e os dados sintéticos na pasta 'synthetic_data' para uma coluna específica de uma tabela.
-    A visualização é salva como um arquivo PNG na pasta 'evaluation_plots'.
+    A visualização é salva como um arquivo PNG na pasta 'evaluation_plots' por um job em segundo plano.
 
     Args:
         folder_name (str): Path para a pasta contendo os arquivos CSV de dados originais e metadata.json
         table_name (str): Nome da tabela a ser visualizada (deve existir nos metadados)
         column_name (str): Nome da coluna a ser visualizada dentro da tabela especificada
+        table_format (str): 'csv', 'parquet', 'arrow' ou 'auto' para usar o arquivo mais recente de cada tabela
 
     Returns:
-        str: Mensagem de sucesso com o caminho para a visualização salva ou mensagem de erro
+        dict: ID do job submetido; o caminho da visualização salva vem de sdv_job_result
     """
+    return _submit(
+        "visualize",
+        folder_name=folder_name,
+        table_name=table_name,
+        column_name=column_name,
+        table_format=table_format,
+    )
+
+
+@mcp.tool()
+def sdv_visualize_many(
+    folder_name: str,
+    columns: list[str] | None = None,
+    table_name: str | None = None,
+    table_format: str = "auto",
+) -> dict:
+    """Gerar visualizações comparando dados reais e sintéticos para várias colunas de uma vez.
+
+    Cada tabela é carregada uma única vez e os arquivos PNG são renderizados em paralelo
+    pelos processos do pool de jobs, na pasta 'evaluation_plots'. Use no lugar de várias
+    chamadas ao sdv_visualize.
+
+    Args:
+        folder_name (str): Path para a pasta contendo os arquivos CSV de dados originais e metadata.json
+        columns (list[str] | None): Colunas no formato 'tabela.coluna' (ex.: ['guests.amenities_fee'])
+        table_name (str | None): Se 'columns' for omitido, visualiza todas as colunas plotáveis desta tabela
+        table_format (str): 'csv', 'parquet', 'arrow' ou 'auto' para usar o arquivo mais recente de cada tabela
+
+    Returns:
+        dict: ID do job submetido; o manifesto com o caminho, os tempos ou o erro de cada plot vem de sdv_job_result
+    """
+    return _submit(
+        "visualize_many",
+        folder_name=folder_name,
+        columns=columns,
+        table_name=table_name,
+        table_format=table_format,
+    )
+
+
+@mcp.tool()
+def sdv_job_status(job_id: str) -> dict:
+    """Consultar o status, o progresso e o tempo decorrido de um job.
+
+    Args:
+        job_id (str): ID retornado por sdv_generate, sdv_evaluate, sdv_visualize ou sdv_visualize_many
+
+    Returns:
+        dict: Status ('pending', 'running', 'done' ou 'failed'), progresso, tempos e erro, se houver
+    """
+    try:
+        return get_job_manager().status(job_id)
+    except KeyError:
+        return {"error": f"Job {job_id} não encontrado"}
+
+
+@mcp.tool()
+async def sdv_job_result(job_id: str, wait_seconds: float = 0.0) -> dict:
+    """Obter o resultado de um job, opcionalmente aguardando a sua conclusão.
+
+    Args:
+        job_id (str): ID retornado por sdv_generate, sdv_evaluate, sdv_visualize ou sdv_visualize_many
+        wait_seconds (float): Tempo máximo para aguardar o término do job (padrão: 0, não espera)
+
+    Returns:
+        dict: Status do job com o campo 'result' (ou 'error') preenchido quando terminado
+    """
+    manager = get_job_manager()
+    future = manager.future(job_id)
+    if future is not None and wait_seconds > 0:
+        # Aguardar sem bloquear o event loop; erros do job aparecem no campo 'error':
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=wait_seconds)
+        except Exception:
+            pass
     try:
-        return visualize(folder_name, table_name, column_name)
-    except FileNotFoundError as e:
-        return f"Erro: {str(e)}"
-    except RuntimeError as e:
-        return f"Erro: {str(e)}"
+        return manager.result(job_id)
+    except KeyError:
+        return {"error": f"Job {job_id} não encontrado"}
+
+
+@mcp.tool()
+def sdv_list_jobs() -> list[dict]:
+    """Listar os jobs submetidos recentemente com o seu status.
+
+    Returns:
+        list[dict]: Status de cada job (sem os resultados)
+    """
+    return get_job_manager().list_jobs()
+
+
+@mcp.tool()
+def sdv_cache_stats() -> dict:
+    """Obter as estatísticas do cache em memória de tabelas e metadados.
+
+    Cada processo de trabalho mantém o seu próprio cache, independente dos outros
+    (uma tabela usada por dois processos é lida duas vezes, e um acerto depende de
+    qual processo pega o job). O orçamento SDV_TABLE_CACHE_MB é dividido igualmente
+    entre os SDV_JOB_WORKERS processos. São retornadas as últimas estatísticas de
+    cada processo e a soma delas.
+
+    Returns:
+        dict: Acertos, falhas e taxa de acerto somados sobre os caches independentes,
+            o orçamento total de memória, o número de caches e o detalhe por processo de trabalho
+    """
+    manager = get_job_manager()
+    workers = manager.worker_cache_stats()
+    hits = sum(stats["hits"] for stats in workers.values())
+    misses = sum(stats["misses"] for stats in workers.values())
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+        "max_memory_mb": manager.cache_memory_mb,
+        "independent_caches": len(workers),
+        "workers": workers,
+    }
 
 
 # Executar o servidor:
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    try:
+        mcp.run(transport="stdio")
+    finally:
+        shutdown_job_manager()
@@ -0,0 +1,141 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.; Dr. Eddy Giusepe Chirinos Isidro
+
+Script table_cache.py
+=====================
+Cache LRU em memória de DataFrames e objetos Metadata, compartilhado pelas
+ferramentas do processo sdv_mcp.
+
+Cada entrada guarda o mtime e o tamanho do arquivo de origem; se o arquivo
+mudar em disco, a entrada é descartada e o arquivo é lido de novo. O cache é
+limitado pelo total de memória estimado dos DataFrames armazenados.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from sdv.metadata import Metadata
+from table_io import AUTO_FORMAT, read_table_file, resolve_table_path
+
+
+DEFAULT_MAX_MEMORY_MB = int(os.environ.get("SDV_TABLE_CACHE_MB", "512"))
+
+
+def file_stamp(path: str) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class TableCache:
+    """Cache LRU limitado por memória, invalidado por mtime/tamanho do arquivo."""
+
+    def __init__(self, max_memory_mb: int = DEFAULT_MAX_MEMORY_MB):
+        self.max_bytes = max_memory_mb * 1024 * 1024
+        self._entries = OrderedDict()  # chave -> (stamp, valor, bytes)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key, stamp):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                # Arquivo alterado em disco: descartar a entrada antiga.
+                self._discard(key)
+            return None
+
+    def _store(self, key, stamp, value, size: int):
+        with self._lock:
+            self.misses += 1
+            if key in self._entries:
+                self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (stamp, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._discard(oldest_key)
+                self.evictions += 1
+
+    def _discard(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get_table(
+        self,
+        folder_name: str,
+        table_name: str,
+        table_format: str = AUTO_FORMAT,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Obter uma tabela (ou apenas `columns` dela) do cache ou do disco.
+
+        O DataFrame retornado é compartilhado entre chamadas e não deve ser modificado in-place.
+        """
+        path, resolved_format = resolve_table_path(folder_name, table_name, table_format)
+        path = os.path.abspath(path)
+        stamp = file_stamp(path)
+
+        # Uma tabela completa em cache também atende pedidos de colunas específicas:
+        full_table = self._lookup(("table", path, None), stamp)
+        if full_table is not None:
+            return full_table if columns is None else full_table[columns]
+
+        if columns is not None:
+            key = ("table", path, tuple(columns))
+            cached = self._lookup(key, stamp)
+            if cached is not None:
+                return cached
+        else:
+            key = ("table", path, None)
+
+        df = read_table_file(path, resolved_format, columns=columns)
+        self._store(key, stamp, df, int(df.memory_usage(deep=True).sum()))
+        return df
+
+    def get_metadata(self, metadata_file: str) -> Metadata:
+        """Obter o Metadata de um metadata.json do cache ou do disco."""
+        path = os.path.abspath(metadata_file)
+        stamp = file_stamp(path)
+        key = ("metadata", path)
+
+        cached = self._lookup(key, stamp)
+        if cached is not None:
+            return cached
+
+        metadata = Metadata.load_from_json(path)
+        # O custo em memória do Metadata é pequeno; o tamanho do JSON serve como estimativa.
+        self._store(key, stamp, metadata, stamp[1])
+        return metadata
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Contadores de acertos/falhas e ocupação atual do cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "memory_mb": self._bytes / 1024 / 1024,
+                "max_memory_mb": self.max_bytes / 1024 / 1024,
+            }
+
+
+# Instância compartilhada pelas ferramentas do servidor (processo de longa duração):
+table_cache = TableCache()
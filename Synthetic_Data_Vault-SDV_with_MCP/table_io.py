@@ -0,0 +1,178 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.; Dr. Eddy Giusepe Chirinos Isidro
+
+Script table_io.py
+==================
+Leitura e escrita de tabelas em formatos intercambiáveis: CSV, Parquet e Arrow IPC.
+
+Os formatos colunares evitam o re-parse de texto do CSV e permitem carregar apenas
+as colunas necessárias (projeção de colunas). O pyarrow só é importado quando
+um formato colunar é de fato usado.
+"""
+import os
+import pandas as pd
+
+
+TABLE_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+AUTO_FORMAT = "auto"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "O pacote 'pyarrow' é necessário para os formatos Parquet e Arrow. Instale com: uv add pyarrow"
+        ) from e
+    return pyarrow
+
+
+def _check_format(table_format: str):
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(
+            f"Formato de tabela '{table_format}' não suportado. Use um de {list(TABLE_FORMATS)}."
+        )
+
+
+def table_path(folder_name: str, table_name: str, table_format: str) -> str:
+    """Caminho do arquivo de uma tabela no formato especificado."""
+    _check_format(table_format)
+    return os.path.join(folder_name, f"{table_name}{TABLE_FORMATS[table_format]}")
+
+
+def resolve_table_path(folder_name: str, table_name: str, table_format: str = AUTO_FORMAT) -> tuple[str, str]:
+    """Encontrar o arquivo de uma tabela e retornar (caminho, formato).
+
+    No modo 'auto' é escolhido o arquivo modificado mais recentemente entre os formatos existentes.
+    """
+    if table_format != AUTO_FORMAT:
+        path = table_path(folder_name, table_name, table_format)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Arquivo da tabela não encontrado: {path}")
+        return path, table_format
+
+    candidates = [
+        (path, fmt)
+        for fmt in TABLE_FORMATS
+        if os.path.exists(path := table_path(folder_name, table_name, fmt))
+    ]
+    if not candidates:
+        raise FileNotFoundError(
+            f"Arquivo da tabela '{table_name}' não encontrado em {folder_name} (formatos: {list(TABLE_FORMATS)})"
+        )
+    return max(candidates, key=lambda candidate: os.path.getmtime(candidate[0]))
+
+
+def list_table_files(folder_name: str) -> list[str]:
+    """Listar os arquivos de tabela (de qualquer formato suportado) de uma pasta."""
+    extensions = tuple(TABLE_FORMATS.values())
+    return sorted(
+        os.path.join(folder_name, name)
+        for name in os.listdir(folder_name)
+        if name.endswith(extensions)
+    )
+
+
+def read_table_file(path: str, table_format: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Ler um arquivo de tabela, carregando apenas `columns` quando especificado."""
+    _check_format(table_format)
+    if table_format == "csv":
+        return pd.read_csv(path, usecols=columns)
+
+    _import_pyarrow()
+    if table_format == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+
+def read_table(
+    folder_name: str,
+    table_name: str,
+    table_format: str = AUTO_FORMAT,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Ler uma tabela de uma pasta, detectando o formato quando table_format='auto'."""
+    path, resolved_format = resolve_table_path(folder_name, table_name, table_format)
+    return read_table_file(path, resolved_format, columns=columns)
+
+
+def read_tables(folder_name: str, table_names, table_format: str = AUTO_FORMAT) -> dict[str, pd.DataFrame]:
+    """Ler várias tabelas de uma pasta em um dicionário {nome_da_tabela: DataFrame}."""
+    return {
+        table_name: read_table(folder_name, table_name, table_format)
+        for table_name in table_names
+    }
+
+
+class TableWriter:
+    """Escreve uma tabela de forma incremental, um bloco (DataFrame) por vez.
+
+    Uso:
+        with TableWriter(path, "parquet") as writer:
+            writer.write(df_chunk)
+    """
+
+    def __init__(self, path: str, table_format: str):
+        _check_format(table_format)
+        self.path = path
+        self.table_format = table_format
+        self.rows_written = 0
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame):
+        if self.table_format == "csv":
+            df.to_csv(self._tmp_path, index=False, mode="a" if self.rows_written else "w", header=not self.rows_written)
+        else:
+            self._write_arrow(df)
+        self.rows_written += len(df)
+
+    def _write_arrow(self, df: pd.DataFrame):
+        pyarrow = _import_pyarrow()
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        if self._writer is None:
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            if self.table_format == "parquet":
+                self._writer = pyarrow.parquet.ParquetWriter(self._tmp_path, self._schema)
+            else:
+                self._writer = pyarrow.ipc.new_file(self._tmp_path, self._schema)
+        else:
+            # Os blocos seguintes seguem o schema do primeiro (ex.: colunas só com nulos):
+            table = pyarrow.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+
+        self._writer.write_table(table)
+
+    def close(self):
+        """Finalizar o arquivo e movê-lo atomicamente para o caminho final."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self._tmp_path):
+            os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Descartar o arquivo parcial."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
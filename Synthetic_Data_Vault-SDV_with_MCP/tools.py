@@ -7,18 +7,66 @@ Script tools.py
 Este script contém ferramentas para gerar dados sintéticos, avaliar a qualidade desses dados e visualizá-los.
 """
 import os
-import pandas as pd
-from sdv.io.local import CSVHandler
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from typing import Callable
 from sdv.metadata import Metadata
 from sdv.multi_table import HMASynthesizer
 from sdv.evaluation.multi_table import evaluate_quality, get_column_plot
+from model_store import ModelStore, compute_data_fingerprint
+from plot_render import render_figure
+from quality_evaluation import evaluate_by_parts
+from table_cache import table_cache
+from table_io import AUTO_FORMAT, TABLE_FORMATS, TableWriter, read_tables, table_path
+
+
+# Escala máxima amostrada por vez; cada bloco é gravado em disco e descartado da memória:
+DEFAULT_CHUNK_SCALE = 1.0
+
+# Tipos semânticos que o get_column_plot consegue visualizar:
+PLOTTABLE_SDTYPES = {"numerical", "datetime", "categorical", "boolean"}
+
+
+def _split_row_budget(max_rows: int, table_sizes: dict[str, int]) -> dict[str, int]:
+    """Dividir `max_rows` entre as tabelas na proporção do seu tamanho real.
+
+    As sobras do arredondamento vão para as tabelas com a maior parte fracionária,
+    de modo que a soma das cotas é exatamente `max_rows` (se houver linhas reais).
+    """
+    total = sum(table_sizes.values())
+    if total == 0:
+        return {table_name: 0 for table_name in table_sizes}
+    shares = {table_name: max_rows * size / total for table_name, size in table_sizes.items()}
+    budgets = {table_name: int(share) for table_name, share in shares.items()}
+    leftover = max_rows - sum(budgets.values())
+    for table_name in sorted(shares, key=lambda name: shares[name] - budgets[name], reverse=True)[:leftover]:
+        budgets[table_name] += 1
+    return budgets
 
 
 # Tool 1: Data Generation: Esta ferramenta cria dados sintéticos a partir de dados reais 
                          # usando o sintetizador SDV. A SDV oferece uma variedade de sintetizadores,
                          # cada um utilizando algoritmos diferentes para produzir dados sintéticos.
-def generate(folder_name: str):
-    """Gerar dados sintéticos a partir de dados reais usando o sintetizador SDV."""
+def generate(
+    folder_name: str,
+    scale: float = 1.0,
+    max_rows: int | None = None,
+    chunk_scale: float = DEFAULT_CHUNK_SCALE,
+    progress_callback: Callable[[dict], None] | None = None,
+    output_format: str = "csv",
+):
+    """Gerar dados sintéticos a partir de dados reais usando o sintetizador SDV.
+
+    A amostragem é feita em blocos de no máximo `chunk_scale` e cada bloco é
+    anexado aos arquivos de saída, de modo que o uso de memória não cresce com `scale`.
+    `max_rows` limita o total de linhas (somando todas as tabelas), dividido entre as
+    tabelas na proporção do tamanho de cada uma nos dados reais, para que uma tabela
+    pai não gaste o orçamento inteiro antes das filhas. `progress_callback` recebe
+    um dicionário com o progresso após cada bloco.
+    `output_format` escolhe o formato dos arquivos gerados: 'csv', 'parquet' ou 'arrow'.
+    """
     # Verificar se a pasta de dados existe:
     if not os.path.exists(folder_name):
         raise FileNotFoundError(f"A pasta {folder_name} não existe.")
@@ -29,27 +77,95 @@ def generate(folder_name: str):
         raise FileNotFoundError(f"O arquivo de metadados {metadata_file} não existe.")
 
     try:
-        # Carregar arquivos CSV de dados da pasta especificada:
-        connector = CSVHandler()
-        data = connector.read(folder_name=folder_name)
-
-        # Carregar metadados:
-        metadata = Metadata.load_from_json(metadata_file)
-
-        # Criar e treinar o sintetizador:
-        synthesizer = HMASynthesizer(metadata)
-        synthesizer.fit(data)
-
-        # Gerar dados sintéticos:
-        synthetic_data = synthesizer.sample(scale=1)
-
-        # Salvar dados sintéticos em arquivos CSV:
+        if scale <= 0 or chunk_scale <= 0:
+            raise ValueError("Os parâmetros 'scale' e 'chunk_scale' devem ser positivos.")
+        if max_rows is not None and max_rows <= 0:
+            raise ValueError("O parâmetro 'max_rows' deve ser positivo.")
+        if output_format not in TABLE_FORMATS:
+            raise ValueError(f"Formato de saída '{output_format}' não suportado. Use um de {list(TABLE_FORMATS)}.")
+
+        # Reutilizar o sintetizador já treinado se os CSVs e os metadados não mudaram:
+        store = ModelStore()
+        model_key = compute_data_fingerprint(folder_name)
+        synthesizer = store.load(model_key)
+        # Linhas de cada tabela real (o HMASynthesizer amostra scale * tamanho original de cada tabela):
+        table_sizes = store.load_table_sizes(model_key)
+        cache_hit = synthesizer is not None
+
+        if not cache_hit or not table_sizes:
+            # Carregar metadados:
+            metadata = Metadata.load_from_json(metadata_file)
+
+            # Carregar as tabelas de dados (CSV, Parquet ou Arrow) da pasta especificada:
+            data = read_tables(folder_name, metadata.tables)
+            table_sizes = {table_name: len(df) for table_name, df in data.items()}
+
+            if cache_hit:
+                # Modelo salvo sem os tamanhos das tabelas: guardá-los agora, sem treinar de novo.
+                store.save_table_sizes(model_key, table_sizes)
+            else:
+                # Criar, treinar e salvar o sintetizador:
+                synthesizer = HMASynthesizer(metadata)
+                synthesizer.fit(data)
+                store.save(model_key, synthesizer, table_sizes)
+            del data
+
+        # Gerar dados sintéticos em blocos e anexar cada bloco aos arquivos de saída:
         os.makedirs("synthetic_data", exist_ok=True)
-        for table_name, df in synthetic_data.items():
-            output_file = os.path.join("synthetic_data", f"{table_name}.csv")
-            df.to_csv(output_file, index=False)
-
-        return f"Dados gerados com sucesso e salvos na pasta 'synthetic_data' com {len(synthetic_data)} tabelas nomeadas como {list(synthetic_data.keys())} arquivos CSV."
+        rows_per_table = {}
+        rows_written = 0
+        sampled_scale = 0.0
+        # Estimativa inicial de linhas por unidade de escala: o total de linhas das tabelas reais.
+        rows_per_scale = sum(table_sizes.values()) or None
+        table_budgets = _split_row_budget(max_rows, table_sizes) if max_rows is not None else None
+        start_time = time.perf_counter()
+
+        with ExitStack() as writers:
+            table_writers = {}
+            while sampled_scale < scale and (max_rows is None or rows_written < max_rows):
+                block_scale = min(chunk_scale, scale - sampled_scale)
+
+                # Reduzir o bloco para respeitar o orçamento de linhas (estimativa do fit ou dos blocos anteriores):
+                if max_rows is not None and rows_per_scale:
+                    block_scale = min(block_scale, (max_rows - rows_written) / rows_per_scale)
+
+                synthetic_chunk = synthesizer.sample(scale=block_scale)
+                chunk_rows = sum(len(df) for df in synthetic_chunk.values())
+                if chunk_rows == 0:
+                    break
+                for table_name, df in synthetic_chunk.items():
+                    # A estimativa pode errar para cima; a cota de linhas da tabela nunca é ultrapassada:
+                    if table_budgets is not None:
+                        df = df.iloc[:max(table_budgets.get(table_name, 0) - rows_per_table.get(table_name, 0), 0)]
+                    if table_name not in table_writers:
+                        output_file = table_path("synthetic_data", table_name, output_format)
+                        table_writers[table_name] = writers.enter_context(TableWriter(output_file, output_format))
+                    table_writers[table_name].write(df)
+                    rows_per_table[table_name] = rows_per_table.get(table_name, 0) + len(df)
+                    rows_written += len(df)
+                del synthetic_chunk
+
+                sampled_scale += block_scale
+                rows_per_scale = rows_written / sampled_scale
+                elapsed = time.perf_counter() - start_time
+
+                if progress_callback is not None:
+                    progress_callback({
+                        "scale_done": sampled_scale,
+                        "scale_total": scale,
+                        "rows_written": rows_written,
+                        "rows_per_second": rows_written / elapsed if elapsed > 0 else 0.0,
+                    })
+
+        elapsed = time.perf_counter() - start_time
+        rows_per_second = rows_written / elapsed if elapsed > 0 else 0.0
+        model_status = "modelo reutilizado do cache" if cache_hit else "modelo treinado e salvo no cache"
+        return (
+            f"Dados gerados com sucesso e salvos na pasta 'synthetic_data' com {len(rows_per_table)} tabelas "
+            f"nomeadas como {list(rows_per_table.keys())} arquivos {output_format.upper()} ({model_status}). "
+            f"Linhas por tabela: {rows_per_table}; total de {rows_written} linhas em {elapsed:.1f}s "
+            f"({rows_per_second:.0f} linhas/s)."
+        )
 
     # Tratamento de exceções durante a geração de dados:
     except Exception as e:
@@ -57,8 +173,22 @@ def generate(folder_name: str):
 
 # Tool 2: Data Evaluation: Esta ferramenta avalia a qualidade de dados sintéticos em comparação com dados reais.
                          # Avaliaremos a similaridade estatística para determinar quais padrões de dados reais são capturados pelos dados sintéticos.
-def evaluate(folder_name: str):
-    """Avaliar a qualidade de dados sintéticos em comparação com dados reais."""
+def evaluate(
+    folder_name: str,
+    table_format: str = AUTO_FORMAT,
+    sample_size: int | None = None,
+    repeats: int = 3,
+    incremental: bool = False,
+):
+    """Avaliar a qualidade de dados sintéticos em comparação com dados reais.
+
+    `table_format` força o formato dos arquivos ('csv', 'parquet', 'arrow') ou,
+    com 'auto', usa o arquivo mais recente de cada tabela.
+
+    Com `sample_size` (linhas por tabela) ou `incremental=True`, a avaliação é feita
+    por tabela e por relacionamento, com resultados em cache (ver quality_evaluation.py);
+    com `sample_size`, a pontuação vem de `repeats` amostras estratificadas com intervalo de confiança.
+    """
     # Verificar se as pastas de dados reais e sintéticos existem:
     if not os.path.exists(folder_name):
         raise FileNotFoundError(f"A pasta de dados reais {folder_name} não existe.")
@@ -73,8 +203,12 @@ def evaluate(folder_name: str):
         raise FileNotFoundError(f"O arquivo de metadados {metadata_file} não existe.")
 
     try:
-        # Carregar metadados:
-        metadata = Metadata.load_from_json(metadata_file)
+        # Carregar metadados (do cache em memória, se o arquivo não mudou):
+        metadata = table_cache.get_metadata(metadata_file)
+
+        # Avaliação incremental/por amostragem:
+        if incremental or sample_size is not None:
+            return evaluate_by_parts(folder_name, metadata, table_format, sample_size=sample_size, repeats=repeats)
 
         # Obter a lista de tabelas a partir dos metadados:
         table_names = metadata.tables
@@ -83,20 +217,10 @@ def evaluate(folder_name: str):
         real_data_dict = {}
         synthetic_data_dict = {}
 
-        # Carregar cada tabela a partir de arquivos CSV:
+        # Carregar cada tabela (CSV, Parquet ou Arrow) através do cache em memória:
         for table_name in table_names:
-            real_path = os.path.join(folder_name, f"{table_name}.csv")
-            synthetic_path = os.path.join("synthetic_data", f"{table_name}.csv")
-
-            if not os.path.exists(real_path):
-                raise FileNotFoundError(f"Arquivo de dados reais não encontrado: {real_path}")
-            if not os.path.exists(synthetic_path):
-                raise FileNotFoundError(
-                    f"Arquivo de dados sintéticos não encontrado: {synthetic_path}"
-                )
-
-            real_data_dict[table_name] = pd.read_csv(real_path)
-            synthetic_data_dict[table_name] = pd.read_csv(synthetic_path)
+            real_data_dict[table_name] = table_cache.get_table(folder_name, table_name, table_format)
+            synthetic_data_dict[table_name] = table_cache.get_table("synthetic_data", table_name, table_format)
 
         # Executar avaliação:
         quality_report = evaluate_quality(
@@ -125,8 +249,12 @@ def visualize(
     table_name: str,
     column_name: str,
     visualization_folder: str = "evaluation_plots",
+    table_format: str = AUTO_FORMAT,
 ):
-    """Gerar visualização comparando dados reais e sintéticos para uma coluna específica."""
+    """Gerar visualização comparando dados reais e sintéticos para uma coluna específica.
+
+    Apenas a coluna pedida é carregada dos arquivos (projeção de colunas).
+    """
     # Verificar se as pastas de dados reais e sintéticos existem:
     if not os.path.exists(folder_name):
         raise FileNotFoundError(f"A pasta de dados reais {folder_name} não existe.")
@@ -141,32 +269,23 @@ def visualize(
         raise FileNotFoundError(f"O arquivo de metadados {metadata_file} não existe.")
 
     try:
-        # Carregar metadados:
-        metadata = Metadata.load_from_json(metadata_file)
+        # Carregar metadados (do cache em memória, se o arquivo não mudou):
+        metadata = table_cache.get_metadata(metadata_file)
 
         # Verificar se a tabela existe:
         if table_name not in metadata.tables:
             raise ValueError(f"A tabela '{table_name}' não foi encontrada nos metadados")
 
-        # Carregar dados reais e sintéticos para a tabela especificada:
-        real_path = os.path.join(folder_name, f"{table_name}.csv")
-        synthetic_path = os.path.join("synthetic_data", f"{table_name}.csv")
-
-        # Verificar se os arquivos de dados reais e sintéticos existem:
-        if not os.path.exists(real_path):
-            raise FileNotFoundError(f"Arquivo de dados reais não encontrado: {real_path}")
-        if not os.path.exists(synthetic_path):
-            raise FileNotFoundError(f"Arquivo de dados sintéticos não encontrado: {synthetic_path}")
-
-        real_data = pd.read_csv(real_path)
-        synthetic_data = pd.read_csv(synthetic_path)
-
         # Verificar se a coluna existe:
-        if column_name not in real_data.columns:
+        if column_name not in metadata.tables[table_name].columns:
             raise ValueError(
                 f"A coluna '{column_name}' não foi encontrada na tabela '{table_name}'"
             )
 
+        # Carregar apenas a coluna pedida dos dados reais e sintéticos:
+        real_data = table_cache.get_table(folder_name, table_name, table_format, columns=[column_name])
+        synthetic_data = table_cache.get_table("synthetic_data", table_name, table_format, columns=[column_name])
+
         # Criar dicionários de dados como exigido pelo get_column_plot:
         real_data_dict = {table_name: real_data}
         synthetic_data_dict = {table_name: synthetic_data}
@@ -189,9 +308,7 @@ def visualize(
             )
 
         # Criar nome de arquivo:
-        safe_column_name = column_name.replace(" ", "_").replace("/", "_")
-        filename = f"{table_name}_{safe_column_name}.png"
-        filepath = os.path.join(visualization_folder, filename)
+        filepath = _plot_filepath(visualization_folder, table_name, column_name)
 
         # Salvar a figura e retornar mensagem de sucesso:
         fig.write_image(filepath)
@@ -200,4 +317,164 @@ def visualize(
     # Tratamento de exceções durante a visualização:
     except Exception as e:
         raise RuntimeError(f"Ocorreu um erro durante a visualização: {e}")
-    
\ No newline at end of file
+
+
+def _plot_filepath(visualization_folder: str, table_name: str, column_name: str) -> str:
+    safe_column_name = column_name.replace(" ", "_").replace("/", "_")
+    return os.path.join(visualization_folder, f"{table_name}_{safe_column_name}.png")
+
+
+_render_executor = None
+_render_executor_lock = threading.Lock()
+
+
+def _get_render_executor(max_workers: int | None) -> ProcessPoolExecutor:
+    """Pool de renderização do visualize_many chamado como biblioteca, compartilhado entre chamadas.
+
+    `max_workers` só vale para a criação do pool, na primeira chamada. Nos jobs do
+    sdv_mcp a renderização usa o pool do próprio JobManager (ver jobs.py).
+    """
+    global _render_executor
+    with _render_executor_lock:
+        if _render_executor is None:
+            _render_executor = ProcessPoolExecutor(max_workers=max_workers)
+        return _render_executor
+
+
+def render_plots(manifest: dict, executor) -> dict:
+    """Renderizar no `executor` os PNGs pendentes de um manifesto do visualize_many(render=False)."""
+    start_time = time.perf_counter()
+    plots = manifest["plots"]
+    futures = {
+        executor.submit(render_figure, figure_json, filepath): (plots[index], filepath)
+        for index, figure_json, filepath in manifest.pop("pending_renders")
+    }
+    for future in as_completed(futures):
+        entry, filepath = futures[future]
+        try:
+            entry["render_seconds"] = future.result()
+            entry["path"] = filepath
+        except Exception as e:
+            entry["error"] = str(e)
+    manifest["succeeded"] = sum("path" in entry for entry in plots)
+    manifest["failed"] = sum("error" in entry for entry in plots)
+    manifest["total_seconds"] += time.perf_counter() - start_time
+    return manifest
+
+
+# Tool 4: Batch Visualization: Esta ferramenta gera as visualizações de várias colunas de uma só vez.
+                             # Cada tabela é carregada uma única vez e os PNGs são renderizados em paralelo num pool de processos.
+def visualize_many(
+    folder_name: str,
+    columns: list[str] | None = None,
+    table_name: str | None = None,
+    visualization_folder: str = "evaluation_plots",
+    table_format: str = AUTO_FORMAT,
+    max_workers: int | None = None,
+    render: bool = True,
+):
+    """Gerar visualizações comparando dados reais e sintéticos para várias colunas.
+
+    `columns` é uma lista no formato 'tabela.coluna'. Se for omitida, são visualizadas
+    todas as colunas plotáveis (numéricas, datas, categóricas e booleanas) de `table_name`.
+    Retorna um manifesto com o caminho e os tempos de cada plot; falhas em uma coluna
+    são registradas no manifesto sem interromper as demais.
+
+    As figuras são montadas neste processo e os PNGs, renderizados num pool de processos.
+    Com `render=False` nada é renderizado: o manifesto traz em 'pending_renders' o JSON
+    e o caminho de cada figura, para que render_plots os renderize noutro pool (é o
+    que o JobManager faz com o seu próprio pool).
+    """
+    # Verificar se as pastas de dados reais e sintéticos existem:
+    if not os.path.exists(folder_name):
+        raise FileNotFoundError(f"A pasta de dados reais {folder_name} não existe.")
+    if not os.path.exists("synthetic_data"):
+        raise FileNotFoundError(
+            "A pasta de dados sintéticos não foi encontrada. Por favor, gere dados sintéticos primeiro."
+        )
+
+    # Verificar se o arquivo de metadados existe:
+    metadata_file = os.path.join(folder_name, "metadata.json")
+    if not os.path.exists(metadata_file):
+        raise FileNotFoundError(f"O arquivo de metadados {metadata_file} não existe.")
+
+    try:
+        start_time = time.perf_counter()
+        metadata = table_cache.get_metadata(metadata_file)
+
+        # Montar a lista de (tabela, coluna) a visualizar:
+        if columns is None:
+            if table_name is None:
+                raise ValueError("Informe 'columns' ('tabela.coluna') ou 'table_name' para visualizar todas as colunas.")
+            if table_name not in metadata.tables:
+                raise ValueError(f"A tabela '{table_name}' não foi encontrada nos metadados")
+            targets = [
+                (table_name, column_name)
+                for column_name, column_metadata in metadata.tables[table_name].columns.items()
+                if column_metadata.get("sdtype") in PLOTTABLE_SDTYPES
+            ]
+        else:
+            targets = []
+            for column in columns:
+                target_table, _, column_name = column.partition(".")
+                if not column_name:
+                    raise ValueError(f"Coluna '{column}' inválida: use o formato 'tabela.coluna'")
+                if target_table not in metadata.tables:
+                    raise ValueError(f"A tabela '{target_table}' não foi encontrada nos metadados")
+                if column_name not in metadata.tables[target_table].columns:
+                    raise ValueError(
+                        f"A coluna '{column_name}' não foi encontrada na tabela '{target_table}'"
+                    )
+                targets.append((target_table, column_name))
+
+        os.makedirs(visualization_folder, exist_ok=True)
+
+        # Carregar cada tabela uma única vez, apenas com as colunas pedidas:
+        columns_by_table = {}
+        for target_table, column_name in targets:
+            columns_by_table.setdefault(target_table, []).append(column_name)
+        real_data_dict = {
+            target_table: table_cache.get_table(folder_name, target_table, table_format, columns=table_columns)
+            for target_table, table_columns in columns_by_table.items()
+        }
+        synthetic_data_dict = {
+            target_table: table_cache.get_table("synthetic_data", target_table, table_format, columns=table_columns)
+            for target_table, table_columns in columns_by_table.items()
+        }
+
+        # Construir as figuras neste processo; os PNGs são renderizados depois, em paralelo:
+        plots = []
+        pending_renders = []
+        for target_table, column_name in targets:
+            entry = {"table_name": target_table, "column_name": column_name}
+            plots.append(entry)
+            build_start = time.perf_counter()
+            try:
+                fig = get_column_plot(
+                    real_data=real_data_dict,
+                    synthetic_data=synthetic_data_dict,
+                    metadata=metadata,
+                    table_name=target_table,
+                    column_name=column_name,
+                )
+                if fig is None:
+                    raise ValueError(f"Não foi possível gerar visualização para {target_table}.{column_name}")
+            except Exception as e:
+                entry["error"] = str(e)
+                continue
+            entry["build_seconds"] = time.perf_counter() - build_start
+            filepath = os.path.abspath(_plot_filepath(visualization_folder, target_table, column_name))
+            pending_renders.append((len(plots) - 1, fig.to_json(), filepath))
+
+        manifest = {
+            "plots": plots,
+            "pending_renders": pending_renders,
+            "total_seconds": time.perf_counter() - start_time,
+        }
+        if not render:
+            return manifest
+        return render_plots(manifest, _get_render_executor(max_workers))
+
+    # Tratamento de exceções durante a visualização:
+    except Exception as e:
+        raise RuntimeError(f"Ocorreu um erro durante a visualização em lote: {e}")
@@ -0,0 +1,112 @@
+"""
+Operações em lote sobre os lembretes (endpoints /reminders/bulk*).
+
+Cada lote vai ao MongoDB em uma única chamada não ordenada (insert_many ou
+bulk_write com ordered=False): um item com erro não interrompe os demais, e o
+resultado traz o status de cada item pela sua posição no pedido.
+"""
+import json
+from collections.abc import AsyncIterator
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+BULK_MAX_ITEMS = 10_000
+NDJSON_BATCH_SIZE = 1000
+NDJSON_SPOOL_BYTES = 1024 * 1024
+
+
+def _write_errors(error: BulkWriteError) -> dict[int, str]:
+    """Mensagem de erro de cada operação que falhou, pela posição no lote."""
+    return {item["index"]: item.get("errmsg", "erro de escrita") for item in error.details.get("writeErrors", [])}
+
+
+def item_result(index: int, reminder_id, status: str, error: str | None = None) -> dict:
+    result = {"index": index, "id": reminder_id, "status": status}
+    if error is not None:
+        result["error"] = error
+    return result
+
+
+async def insert_reminders(collection, items: list[tuple[int, dict]]) -> list[dict]:
+    """Inserir os documentos de `items` (posição no pedido, documento) com um insert_many."""
+    if not items:
+        return []
+    failed = {}
+    try:
+        await collection.insert_many([doc for _, doc in items], ordered=False)
+    except BulkWriteError as e:
+        failed = _write_errors(e)
+    return [
+        item_result(index, doc["id"], "error", failed[i]) if i in failed else item_result(index, doc["id"], "created")
+        for i, (index, doc) in enumerate(items)
+    ]
+
+
+async def update_reminders(collection, updates: list[tuple[str, dict]]) -> list[dict]:
+    """Aplicar `$set` de cada (id, campos alterados) com um bulk_write não ordenado."""
+    if not updates:
+        return []
+    operations, positions = [], []
+    for index, (reminder_id, changes) in enumerate(updates):
+        if changes:
+            operations.append(UpdateOne({"id": reminder_id}, {"$set": changes}))
+            positions.append(index)
+    failed = {}
+    if operations:
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            failed = {positions[i]: message for i, message in _write_errors(e).items()}
+    # O bulk_write só devolve totais; quais ids existem vem de uma consulta coberta pelo índice de id.
+    ids = list({reminder_id for reminder_id, _ in updates})
+    found = {doc["id"] async for doc in collection.find({"id": {"$in": ids}}, {"_id": 0, "id": 1})}
+    results = []
+    for index, (reminder_id, _) in enumerate(updates):
+        if index in failed:
+            results.append(item_result(index, reminder_id, "error", failed[index]))
+        elif reminder_id in found:
+            results.append(item_result(index, reminder_id, "updated"))
+        else:
+            results.append(item_result(index, reminder_id, "not_found"))
+    return results
+
+
+async def delete_reminders(collection, ids: list[str]) -> list[dict]:
+    """Remover os lembretes de `ids` com um delete_many."""
+    if not ids:
+        return []
+    unique_ids = list(set(ids))
+    found = {doc["id"] async for doc in collection.find({"id": {"$in": unique_ids}}, {"_id": 0, "id": 1})}
+    if found:
+        await collection.delete_many({"id": {"$in": list(found)}})
+    return [item_result(index, reminder_id, "deleted" if reminder_id in found else "not_found") for index, reminder_id in enumerate(ids)]
+
+
+async def iter_ndjson_batches(chunks: AsyncIterator[bytes], batch_size: int = NDJSON_BATCH_SIZE) -> AsyncIterator[list]:
+    """Agrupar as linhas não vazias de um corpo NDJSON em lotes de (posição, linha).
+
+    O corpo é lido aos pedaços, conforme chega, então a memória fica limitada a
+    um lote, qualquer que seja o tamanho da importação.
+    """
+    buffer = b""
+    batch = []
+    index = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                batch.append((index, line))
+                index += 1
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+    if buffer.strip():
+        batch.append((index, buffer))
+    if batch:
+        yield batch
+
+
+def ndjson_line(result: dict) -> str:
+    return json.dumps(result, ensure_ascii=False) + "\n"
@@ -0,0 +1,75 @@
+"""
+Caminho rápido das listagens de lembretes (GET /reminders/?stream=json|ndjson).
+
+No caminho padrão o FastAPI valida cada documento com o response_model e passa
+tudo pelo jsonable_encoder antes de montar o corpo inteiro em memória. Aqui:
+
+- a consulta projeta só os campos do modelo (sem _id nem campos extras);
+- cada documento é serializado direto para bytes, com o orjson quando ele está
+  instalado (senão, com o json da biblioteca padrão);
+- o corpo sai em pedaços de ~64 KB conforme o cursor do MongoDB avança, como um
+  único objeto JSON {"items": [...], "next_cursor": ...} ou em NDJSON (um
+  lembrete por linha e, no fim, uma linha {"next_cursor": ...}).
+
+Os documentos não são validados de novo: o caminho supõe que a coleção só
+contém lembretes gravados pela própria API.
+"""
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from app.queries import encode_cursor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STREAM_FORMATS = ("json", "ndjson")
+STREAM_MAX_PAGE_SIZE = 100_000
+STREAM_CHUNK_BYTES = 64 * 1024
+MEDIA_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+def projection(model) -> dict:
+    """Projeção do MongoDB com apenas os campos de um modelo Pydantic."""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+
+async def stream_page(documents: AsyncIterator[dict], limit: int, fmt: str) -> AsyncIterator[bytes]:
+    """Serializar até `limit` documentos; um documento a mais indica que há próxima página."""
+    ndjson = fmt == "ndjson"
+    chunk = [] if ndjson else [b'{"items":[']
+    size = 0
+    count = 0
+    last = None
+    next_cursor = None
+    async for document in documents:
+        if count == limit:
+            next_cursor = encode_cursor(last)
+            break
+        encoded = dumps(document) + b"\n" if ndjson else (b"," if count else b"") + dumps(document)
+        chunk.append(encoded)
+        size += len(encoded)
+        if size >= STREAM_CHUNK_BYTES:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+        last = document
+        count += 1
+    if ndjson:
+        chunk.append(dumps({"next_cursor": next_cursor}) + b"\n")
+    else:
+        chunk.append(b'],"next_cursor":' + dumps(next_cursor) + b"}")
+    yield b"".join(chunk)
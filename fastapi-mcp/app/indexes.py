@@ -0,0 +1,71 @@
+"""
+Índices da coleção de lembretes, criados na inicialização da aplicação.
+
+- id (único): usado por GET/PUT/DELETE /reminders/{reminder_id}; sem ele cada
+  busca percorre a coleção inteira;
+- (created_at, id, due_date): ordem e cursor da listagem paginada (app/queries.py).
+  A ordenação vem primeiro porque os filtros de vencimento são faixas: um índice
+  que começasse por due_date não entregaria os documentos na ordem (created_at, id)
+  e cada página seria ordenada em memória. Com due_date no fim do índice, o filtro
+  é avaliado sobre as chaves do índice, sem ler os documentos que não passam.
+  O custo: um filtro muito seletivo percorre mais chaves até encher a página;
+- title: filtro por prefixo do título. Combinado com a ordenação da listagem, o
+  MongoDB escolhe entre este índice (e ordena a página em memória) e o anterior.
+
+create_indexes não faz nada para índices que já existem com a mesma definição,
+então reiniciar a aplicação é barato. Na inicialização ele roda numa tarefa em
+segundo plano, com novas tentativas enquanto o MongoDB não responde: a API sobe
+mesmo que o banco ainda não esteja pronto.
+"""
+import asyncio
+import logging
+import time
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger("uvicorn.error")
+
+MAX_RETRY_DELAY = 60.0
+
+REMINDER_INDEXES = [
+    IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    IndexModel([("created_at", ASCENDING), ("id", ASCENDING), ("due_date", ASCENDING)], name="created_at_id_due_date"),
+    IndexModel([("title", ASCENDING)], name="title"),
+]
+
+
+async def ensure_indexes(collection, retry_delay: float | None = None) -> list[str]:
+    """Criar (se faltarem) os índices de REMINDER_INDEXES e registrar o resultado no log.
+
+    Com `retry_delay`, erros de conexão são repetidos com espera crescente (até
+    MAX_RETRY_DELAY); sem ele, são só registrados.
+    """
+    while True:
+        start = time.perf_counter()
+        try:
+            names = await collection.create_indexes(REMINDER_INDEXES)
+            existing = await collection.index_information()
+        except OperationFailure as e:
+            # Ex.: ids duplicados impedem o índice único. A API continua no ar, só mais lenta.
+            logger.error("Falha ao criar os índices de '%s': %s", collection.name, e)
+            return []
+        except PyMongoError as e:
+            # Ex.: o mongod ainda não aceita conexões (o depends_on do compose não espera por isso).
+            if retry_delay is None:
+                logger.error("MongoDB indisponível; índices de '%s' não criados: %s", collection.name, e)
+                return []
+            logger.warning(
+                "MongoDB indisponível (%s); nova tentativa de criar os índices de '%s' em %.1f s",
+                e, collection.name, retry_delay,
+            )
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+            continue
+        logger.info(
+            "Índices de '%s' prontos em %.2f s: %s",
+            collection.name,
+            time.perf_counter() - start,
+            ", ".join(f"{name} {dict(existing[name]['key'])}" for name in names if name in existing),
+        )
+        return names
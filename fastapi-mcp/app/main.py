@@ -1,10 +1,21 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import Body, FastAPI, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, ValidationError
+from pymongo import ReturnDocument
+from typing import Literal, Optional, List
 from datetime import datetime
+import asyncio
+import tempfile
 import uuid
 from fastapi_mcp import FastApiMCP
+from app.bulk import (
+    BULK_MAX_ITEMS, NDJSON_SPOOL_BYTES, delete_reminders, insert_reminders, item_result, iter_ndjson_batches, ndjson_line, update_reminders
+)
+from app.fast_json import MEDIA_TYPES, STREAM_MAX_PAGE_SIZE, projection, stream_page
+from app.indexes import ensure_indexes
+from app.queries import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SORT_ORDER, build_filter, encode_cursor
 
 # Metadados da API aprimorados:
 app = FastAPI(
@@ -28,9 +39,12 @@ mcp.mount_http()
 async def startup_db_client():
     app.mongodb_client = AsyncIOMotorClient("mongodb://mongodb:27017")
     app.mongodb = app.mongodb_client["reminders_db"]
+    # Em segundo plano: a API sobe mesmo que o MongoDB ainda não esteja pronto.
+    app.index_task = asyncio.create_task(ensure_indexes(app.mongodb["reminders"], retry_delay=1.0))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.index_task.cancel()
     app.mongodb_client.close()
 
 # Modelos Pydantic:
@@ -42,6 +56,11 @@ class ReminderBase(BaseModel):
 class ReminderCreate(ReminderBase):
     pass
 
+class ReminderUpdate(BaseModel):
+    title: Optional[str] = Field(None, description="Novo título do lembrete")
+    description: Optional[str] = Field(None, description="Nova descrição do lembrete")
+    due_date: Optional[datetime] = Field(None, description="Nova data de vencimento do lembrete")
+
 class Reminder(ReminderBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Identificador único para o lembrete")
     created_at: datetime = Field(default_factory=datetime.now, description="Timestamp de quando o lembrete foi criado")
@@ -57,6 +76,28 @@ class Reminder(ReminderBase):
             }
         }
 
+class ReminderPage(BaseModel):
+    items: List[Reminder] = Field(..., description="Lembretes desta página, ordenados por created_at e id")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (null na última)")
+
+class ReminderBulkUpdate(ReminderUpdate):
+    id: str = Field(..., description="Identificador do lembrete a ser atualizado")
+
+class BulkItemResult(BaseModel):
+    index: int = Field(..., description="Posição do item no pedido")
+    id: Optional[str] = Field(None, description="Identificador do lembrete")
+    status: str = Field(..., description="created, updated, deleted, not_found ou error")
+    error: Optional[str] = Field(None, description="Motivo da falha, quando status é error")
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+def bulk_summary(results: list[dict]) -> dict:
+    failed = sum(result["status"] in ("error", "not_found") for result in results)
+    return {"succeeded": len(results) - failed, "failed": failed, "results": results}
+
 # Endpoint raiz com informações da API:
 @app.get("/", tags=["Raiz"])
 async def root():
@@ -69,9 +110,14 @@ async def root():
         "documentation": "/docs",
         "endpoints": {
             "create_reminder": "POST /reminders/",
-            "get_all_reminders": "GET /reminders/",
+            "create_reminders_bulk": "POST /reminders/bulk",
+            "create_reminders_ndjson": "POST /reminders/bulk/ndjson (corpo NDJSON, resposta NDJSON)",
+            "update_reminders_bulk": "POST /reminders/bulk/update",
+            "delete_reminders_bulk": "POST /reminders/bulk/delete",
+            "get_all_reminders": "GET /reminders/?limit=&cursor=",
             "get_reminder": "GET /reminders/{reminder_id}",
             "update_reminder": "PUT /reminders/{reminder_id}",
+            "patch_reminder": "PATCH /reminders/{reminder_id}",
             "delete_reminder": "DELETE /reminders/{reminder_id}"
         }
     }
@@ -103,21 +149,150 @@ async def create_reminder(reminder: ReminderCreate):
     await app.mongodb["reminders"].insert_one(new_reminder.model_dump())
     return new_reminder
 
+@app.post(
+    "/reminders/bulk",
+    response_model=BulkResult,
+    tags=["Reminders"],
+    summary="Criar lembretes em lote",
+    description=f"Criar até {BULK_MAX_ITEMS} lembretes em uma única operação, com o resultado de cada item."
+)
+async def create_reminders_bulk(reminders: List[ReminderCreate] = Body(..., max_length=BULK_MAX_ITEMS)):
+    """
+    Criar vários lembretes de uma vez (um único insert_many não ordenado).
+    
+    - **reminders**: Lista de lembretes, cada um com title, description e due_date
+    
+    Retorna, para cada item (pela posição no pedido), o ID gerado e o status created ou error.
+    Para importações maiores, use POST /reminders/bulk/ndjson.
+    """
+    items = [(index, Reminder(**reminder.model_dump()).model_dump()) for index, reminder in enumerate(reminders)]
+    return bulk_summary(await insert_reminders(app.mongodb["reminders"], items))
+
+@app.post("/reminders/bulk/ndjson", include_in_schema=False)
+async def create_reminders_ndjson(request: Request):
+    """
+    Importar lembretes de um corpo NDJSON (um lembrete JSON por linha), de qualquer tamanho.
+    
+    O corpo é lido e inserido em lotes conforme chega. A resposta, também NDJSON, traz o
+    resultado de cada linha; ela é montada num arquivo temporário (em memória enquanto for
+    pequena), pois o corpo do pedido precisa ser lido inteiro antes de a resposta começar.
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=NDJSON_SPOOL_BYTES, mode="w+", encoding="utf-8")
+    try:
+        async for batch in iter_ndjson_batches(request.stream()):
+            items, invalid = [], []
+            for index, line in batch:
+                try:
+                    reminder = ReminderCreate.model_validate_json(line)
+                except ValidationError as e:
+                    invalid.append(item_result(index, None, "error", str(e)))
+                    continue
+                items.append((index, Reminder(**reminder.model_dump()).model_dump()))
+            for result in invalid + await insert_reminders(app.mongodb["reminders"], items):
+                output.write(ndjson_line(result))
+    except BaseException:
+        # Erro do MongoDB, desconexão do cliente ou cancelamento: a resposta não sai, então fechar o arquivo aqui.
+        output.close()
+        raise
+    output.seek(0)
+    return StreamingResponse(output, media_type="application/x-ndjson", background=BackgroundTask(output.close))
+
+@app.post(
+    "/reminders/bulk/update",
+    response_model=BulkResult,
+    tags=["Reminders"],
+    summary="Atualizar lembretes em lote",
+    description=f"Atualizar parcialmente até {BULK_MAX_ITEMS} lembretes em uma única operação."
+)
+async def update_reminders_bulk(reminders: List[ReminderBulkUpdate] = Body(..., max_length=BULK_MAX_ITEMS)):
+    """
+    Atualizar vários lembretes de uma vez (um único bulk_write não ordenado).
+    
+    - **reminders**: Lista com o id de cada lembrete e os campos a alterar (como no PATCH)
+    
+    Retorna, para cada item, o status updated, not_found ou error.
+    """
+    updates, invalid = [], {}
+    for index, reminder in enumerate(reminders):
+        changes = reminder.model_dump(exclude_unset=True, exclude={"id"})
+        if changes.get("title", "") is None:
+            invalid[index] = item_result(index, reminder.id, "error", "O título não pode ser nulo")
+            changes = {}
+        updates.append((reminder.id, changes))
+    results = await update_reminders(app.mongodb["reminders"], updates)
+    return bulk_summary([invalid.get(result["index"], result) for result in results])
+
+@app.post(
+    "/reminders/bulk/delete",
+    response_model=BulkResult,
+    tags=["Reminders"],
+    summary="Deletar lembretes em lote",
+    description=f"Deletar até {BULK_MAX_ITEMS} lembretes pelos seus IDs em uma única operação."
+)
+async def delete_reminders_bulk(reminder_ids: List[str] = Body(..., max_length=BULK_MAX_ITEMS)):
+    """
+    Deletar vários lembretes de uma vez (um único delete_many).
+    
+    - **reminder_ids**: Lista de IDs
+    
+    Retorna, para cada ID, o status deleted ou not_found.
+    """
+    return bulk_summary(await delete_reminders(app.mongodb["reminders"], reminder_ids))
+
 @app.get(
     "/reminders/", 
-    response_model=List[Reminder],
+    response_model=ReminderPage,
     tags=["Reminders"],
-    summary="Obter todos os lembretes",
-    description="Obter uma lista de todos os lembretes armazenados na base de dados."
+    summary="Listar lembretes",
+    description="Listar lembretes em páginas (paginação por cursor), com filtros opcionais por data de vencimento, prefixo do título e atraso."
 )
-async def read_reminders():
+async def read_reminders(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamanho máximo da página"),
+    cursor: Optional[str] = Query(None, description="Valor de next_cursor da página anterior"),
+    due_after: Optional[datetime] = Query(None, description="Só lembretes com vencimento a partir desta data"),
+    due_before: Optional[datetime] = Query(None, description="Só lembretes com vencimento antes desta data"),
+    title_prefix: Optional[str] = Query(None, description="Só lembretes cujo título começa com este texto"),
+    overdue: Optional[bool] = Query(None, description="true: só vencidos; false: só não vencidos (ou sem data)"),
+    stream: Optional[Literal["json", "ndjson"]] = Query(
+        None, description="Caminho rápido: resposta em streaming, como JSON (mesmo formato) ou NDJSON"
+    ),
+    stream_limit: Optional[int] = Query(
+        None, ge=1, le=STREAM_MAX_PAGE_SIZE,
+        description=f"Com stream: tamanho máximo da página (até {STREAM_MAX_PAGE_SIZE}), no lugar de limit"
+    ),
+):
     """
-    Obter todos os lembretes.
+    Listar lembretes em páginas.
+    
+    - **limit**: Tamanho máximo da página (1 a 1000)
+    - **cursor**: Valor de `next_cursor` da página anterior (omitir na primeira)
+    - **due_after** / **due_before**: Intervalo da data de vencimento
+    - **title_prefix**: Prefixo do título
+    - **overdue**: Filtrar por lembretes vencidos ou não
+    - **stream**: `json` ou `ndjson` para o caminho rápido (projeção, orjson e streaming, sem revalidar os documentos)
+    - **stream_limit**: Com `stream`, tamanho máximo da página (1 a 100000), no lugar de `limit`
     
-    Retorna uma lista de todos os lembretes armazenados na base de dados (limitado a 1000 entradas).
+    Retorna os lembretes da página e o `next_cursor`, que é null na última página.
+    Os filtros são aplicados pelo MongoDB e cada página custa o mesmo, qualquer que seja a posição.
+    Em NDJSON, cada linha é um lembrete e a última linha traz o `next_cursor`.
     """
-    reminders = await app.mongodb["reminders"].find().to_list(1000)
-    return reminders
+    if stream is None and stream_limit is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="stream_limit só é aceito com stream=json ou stream=ndjson"
+        )
+    try:
+        query = build_filter(cursor, due_after, due_before, title_prefix, overdue)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if stream is not None:
+        limit = stream_limit or limit
+        documents = app.mongodb["reminders"].find(query, projection(Reminder)).sort(SORT_ORDER).limit(limit + 1)
+        return StreamingResponse(stream_page(documents, limit, stream), media_type=MEDIA_TYPES[stream])
+    # Um documento a mais indica se existe próxima página:
+    reminders = await app.mongodb["reminders"].find(query).sort(SORT_ORDER).limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_cursor(reminders[limit - 1]) if len(reminders) > limit else None
+    return {"items": reminders[:limit], "next_cursor": next_cursor}
 
 @app.get(
     "/reminders/{reminder_id}", 
@@ -158,20 +333,47 @@ async def update_reminder(reminder_id: str, reminder: ReminderBase):
     
     Retorna o lembrete atualizado se encontrado, caso contrário, retorna um erro 404.
     """
-    update_result = await app.mongodb["reminders"].update_one(
-        {"id": reminder_id},
-        {"$set": reminder.model_dump()}
-    )
+    return await apply_update(reminder_id, reminder.model_dump())
+
+@app.patch(
+    "/reminders/{reminder_id}", 
+    response_model=Reminder,
+    tags=["Reminders"],
+    summary="Atualizar parte de um lembrete",
+    description="Atualizar apenas os campos enviados de um lembrete existente."
+)
+async def patch_reminder(reminder_id: str, reminder: ReminderUpdate):
+    """
+    Atualizar apenas os campos enviados de um lembrete existente.
+    
+    - **reminder_id**: O identificador único do lembrete a ser atualizado
+    - **reminder**: Os campos a alterar (os omitidos ficam como estão; null apaga description ou due_date)
     
-    if update_result.modified_count == 0:
-        reminder_exists = await app.mongodb["reminders"].find_one({"id": reminder_id})
-        if not reminder_exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, 
-                detail=f"Lembrete com ID {reminder_id} não encontrado"
-            )
-        
-    updated_reminder = await app.mongodb["reminders"].find_one({"id": reminder_id})
+    Retorna o lembrete atualizado se encontrado, caso contrário, retorna um erro 404.
+    """
+    changes = reminder.model_dump(exclude_unset=True)
+    if changes.get("title", "") is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O título não pode ser nulo"
+        )
+    return await apply_update(reminder_id, changes)
+
+async def apply_update(reminder_id: str, changes: dict):
+    # Uma única ida ao banco: atualiza e devolve o documento já atualizado (ou None se não existir).
+    if changes:
+        updated_reminder = await app.mongodb["reminders"].find_one_and_update(
+            {"id": reminder_id},
+            {"$set": changes},
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        updated_reminder = await app.mongodb["reminders"].find_one({"id": reminder_id})
+    if updated_reminder is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, 
+            detail=f"Lembrete com ID {reminder_id} não encontrado"
+        )
     return updated_reminder
 
 @app.delete(
@@ -0,0 +1,71 @@
+"""
+Consultas de listagem dos lembretes: filtros e paginação por cursor (keyset).
+
+A listagem é ordenada por (created_at, id). O cursor guarda o par da última
+entrega da página e a página seguinte pede só os documentos depois dele, de modo
+que cada página custa o mesmo, seja a primeira ou a milésima (ao contrário de
+skip/offset, que percorre tudo o que ficou para trás).
+"""
+import base64
+import binascii
+import json
+import re
+from datetime import datetime
+from typing import Optional
+
+SORT_ORDER = [("created_at", 1), ("id", 1)]
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(reminder: dict) -> str:
+    payload = {"c": reminder["created_at"].isoformat(), "i": reminder["id"]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """(created_at, id) do cursor; ValueError se ele for inválido."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["c"]), str(payload["i"])
+    except (binascii.Error, json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def build_filter(
+    cursor: Optional[str] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    title_prefix: Optional[str] = None,
+    overdue: Optional[bool] = None,
+    now: Optional[datetime] = None,
+) -> dict:
+    """Filtro do MongoDB para a listagem; todas as condições são aplicadas no servidor."""
+    conditions = []
+    if due_after is not None or due_before is not None:
+        due_range = {}
+        if due_after is not None:
+            due_range["$gte"] = due_after
+        if due_before is not None:
+            due_range["$lt"] = due_before
+        conditions.append({"due_date": due_range})
+    if title_prefix:
+        # Prefixo ancorado e sensível a maiúsculas: pode usar um índice em title.
+        conditions.append({"title": {"$regex": f"^{re.escape(title_prefix)}"}})
+    if overdue is not None:
+        now = now or datetime.now()
+        if overdue:
+            conditions.append({"due_date": {"$ne": None, "$lt": now}})
+        else:
+            conditions.append({"$or": [{"due_date": None}, {"due_date": {"$gte": now}}]})
+    if cursor:
+        created_at, reminder_id = decode_cursor(cursor)
+        conditions.append({
+            "$or": [
+                {"created_at": {"$gt": created_at}},
+                {"created_at": created_at, "id": {"$gt": reminder_id}},
+            ]
+        })
+    if not conditions:
+        return {}
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
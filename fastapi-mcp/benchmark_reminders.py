@@ -0,0 +1,305 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+benchmark_reminders.py
+======================
+Benchmarks da coleção de lembretes contra um mongod local (ou o mongomock, com
+--mongomock, quando não há MongoDB disponível).
+
+lookup: popula --docs lembretes numa base descartável e mede a latência
+(p50/p99) de buscas pelo campo id, primeiro sem índices e depois com os
+índices de app/indexes.py.
+
+update: com os índices criados, compara a latência do PUT antigo (update_one +
+find_one de existência + find_one do resultado) com a de um único
+find_one_and_update que devolve o documento atualizado.
+
+bulk: vazão (itens/s) de criar, atualizar e deletar --items lembretes um a um
+(uma chamada por item, como nos endpoints individuais) e em lotes de
+--batch-size com as funções de app/bulk.py usadas pelos endpoints /reminders/bulk*.
+
+serialize: popula --items lembretes e percorre GET /reminders/ da aplicação (em
+processo, via ASGI): o caminho padrão (response_model, até 1000 por página) e o
+caminho rápido (stream=json e stream=ndjson), nas mesmas páginas de 1000 e numa
+página só. Com --profile imprime as funções mais caras (cProfile) de cada modo.
+
+Observação: o mongomock não usa índices (toda busca percorre e ordena a
+coleção) e não tem ida e volta pela rede, então com --mongomock os números só
+servem para conferir o script; os reais vêm de um mongod.
+
+Run
+===
+cd fastapi-mcp
+docker compose up -d mongodb
+python benchmark_reminders.py lookup --docs 1000000 --lookups 2000
+python benchmark_reminders.py update --docs 100000 --updates 2000
+python benchmark_reminders.py bulk --items 50000 --batch-size 1000
+python benchmark_reminders.py serialize --items 10000 --profile
+python benchmark_reminders.py --mongomock lookup --docs 20000 --lookups 200
+"""
+import argparse
+import asyncio
+import cProfile
+import json
+import logging
+import pstats
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+
+from app.bulk import delete_reminders, insert_reminders, update_reminders
+from app.indexes import ensure_indexes
+
+INSERT_BATCH = 10_000
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def make_client(uri: str, mongomock: bool):
+    if mongomock:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError as e:
+            raise SystemExit("--mongomock requer o pacote 'mongomock-motor' (pip install mongomock-motor)") from e
+        return AsyncMongoMockClient()
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    return AsyncIOMotorClient(uri)
+
+
+def make_reminder(i: int, base: datetime, rng: random.Random) -> dict:
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "title": f"Lembrete {i}",
+        "description": "Gerado pelo benchmark",
+        "due_date": base + timedelta(minutes=rng.randint(-500_000, 500_000)) if i % 4 else None,
+        "created_at": base + timedelta(milliseconds=i),
+    }
+
+
+async def populate(collection, docs: int, seed: int = 0) -> list[str]:
+    """Inserir `docs` lembretes em lotes e devolver os ids gerados."""
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    ids = []
+    start = time.perf_counter()
+    for offset in range(0, docs, INSERT_BATCH):
+        batch = [make_reminder(i, base, rng) for i in range(offset, min(offset + INSERT_BATCH, docs))]
+        ids.extend(doc["id"] for doc in batch)
+        await collection.insert_many(batch, ordered=False)
+    print(f"{docs} documentos inseridos em {time.perf_counter() - start:.1f} s")
+    return ids
+
+
+async def time_lookups(collection, ids: list[str], lookups: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    latencies = []
+    for reminder_id in (rng.choice(ids) for _ in range(lookups)):
+        start = time.perf_counter()
+        await collection.find_one({"id": reminder_id})
+        latencies.append(time.perf_counter() - start)
+    return {"p50_ms": statistics.median(latencies) * 1000, "p99_ms": percentile(latencies, 0.99) * 1000}
+
+
+async def benchmark_lookup(collection, args):
+    ids = await populate(collection, args.docs)
+    print(f"{'cenário':<20}{'p50 ms':>10}{'p99 ms':>10}")
+
+    # Sem índice as buscas são lentas; poucas bastam para a mediana.
+    result = await time_lookups(collection, ids, min(args.lookups, args.unindexed_lookups))
+    print(f"{'sem índices':<20}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+    start = time.perf_counter()
+    await ensure_indexes(collection)
+    print(f"(índices criados em {time.perf_counter() - start:.1f} s)")
+    result = await time_lookups(collection, ids, args.lookups)
+    print(f"{'com índices':<20}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+
+async def update_three_trips(collection, reminder_id: str, changes: dict):
+    """O PUT original: até três idas ao banco por atualização."""
+    result = await collection.update_one({"id": reminder_id}, {"$set": changes})
+    if result.modified_count == 0:
+        if not await collection.find_one({"id": reminder_id}):
+            return None
+    return await collection.find_one({"id": reminder_id})
+
+
+async def update_one_trip(collection, reminder_id: str, changes: dict):
+    return await collection.find_one_and_update(
+        {"id": reminder_id}, {"$set": changes}, return_document=ReturnDocument.AFTER
+    )
+
+
+async def benchmark_update(collection, args):
+    ids = await populate(collection, args.docs)
+    await ensure_indexes(collection)
+    print(f"{'cenário':<28}{'p50 ms':>10}{'p99 ms':>10}")
+    for label, update in (("update_one + 2x find_one", update_three_trips), ("find_one_and_update", update_one_trip)):
+        rng = random.Random(2)
+        latencies = []
+        for n in range(args.updates):
+            reminder_id = rng.choice(ids)
+            start = time.perf_counter()
+            await update(collection, reminder_id, {"title": f"Atualizado {n}"})
+            latencies.append(time.perf_counter() - start)
+        print(
+            f"{label:<28}{statistics.median(latencies) * 1000:>10.2f}{percentile(latencies, 0.99) * 1000:>10.2f}"
+        )
+
+
+async def benchmark_bulk(collection, args):
+    await ensure_indexes(collection)
+    rng = random.Random(3)
+    base = datetime(2024, 1, 1)
+    batch_size = args.batch_size
+
+    def batches(items: list) -> list[list]:
+        return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    async def one_by_one(docs):
+        ids = [doc["id"] for doc in docs]
+        for doc in docs:
+            await collection.insert_one(doc)
+        yield "criar"
+        for reminder_id in ids:
+            await collection.update_one({"id": reminder_id}, {"$set": {"title": "Atualizado"}})
+        yield "atualizar"
+        for reminder_id in ids:
+            await collection.delete_one({"id": reminder_id})
+        yield "deletar"
+
+    async def in_batches(docs):
+        ids = [doc["id"] for doc in docs]
+        for batch in batches(list(enumerate(docs))):
+            await insert_reminders(collection, batch)
+        yield "criar"
+        for batch in batches([(reminder_id, {"title": "Atualizado"}) for reminder_id in ids]):
+            await update_reminders(collection, batch)
+        yield "atualizar"
+        for batch in batches(ids):
+            await delete_reminders(collection, batch)
+        yield "deletar"
+
+    print(f"{'modo':<22}{'criar/s':>12}{'atualizar/s':>14}{'deletar/s':>12}")
+    for label, mode in (("um a um", one_by_one), (f"lotes de {batch_size}", in_batches)):
+        docs = [make_reminder(i, base, rng) for i in range(args.items)]
+        rates = []
+        start = time.perf_counter()
+        async for _ in mode(docs):
+            rates.append(args.items / (time.perf_counter() - start))
+            start = time.perf_counter()
+        print(f"{label:<22}{rates[0]:>12.0f}{rates[1]:>14.0f}{rates[2]:>12.0f}")
+
+
+async def fetch_all(client, params: dict) -> int:
+    """Percorrer todas as páginas de GET /reminders/ e devolver o total de bytes recebidos."""
+    received = 0
+    cursor = None
+    while True:
+        response = await client.get("/reminders/", params={**params, **({"cursor": cursor} if cursor else {})})
+        response.raise_for_status()
+        received += len(response.content)
+        if params.get("stream") == "ndjson":
+            cursor = json.loads(response.content.rsplit(b"\n", 2)[-2])["next_cursor"]
+        else:
+            cursor = response.json()["next_cursor"]
+        if not cursor:
+            return received
+
+
+async def benchmark_serialize(collection, args):
+    import httpx
+
+    from app.fast_json import orjson
+    from app.main import app
+    from app.queries import MAX_PAGE_SIZE
+
+    await populate(collection, args.items)
+    await ensure_indexes(collection)
+    app.mongodb = collection.database
+    modes = (
+        ("padrão (response_model)", {"limit": MAX_PAGE_SIZE}),
+        (f"stream=json, {MAX_PAGE_SIZE}/página", {"limit": MAX_PAGE_SIZE, "stream": "json"}),
+        ("stream=json, 1 página", {"stream_limit": args.items, "stream": "json"}),
+        ("stream=ndjson, 1 página", {"stream_limit": args.items, "stream": "ndjson"}),
+    )
+    print(f"encoder do caminho rápido: {'orjson' if orjson is not None else 'json (orjson não instalado)'}")
+    print(f"{'modo':<26}{'ms (mediana)':>14}{'MB':>8}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for label, params in modes:
+            await fetch_all(client, params)  # aquecimento
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                received = await fetch_all(client, params)
+                timings.append(time.perf_counter() - start)
+            print(f"{label:<26}{statistics.median(timings) * 1000:>14.1f}{received / 1e6:>8.2f}")
+            if args.profile:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                await fetch_all(client, params)
+                profiler.disable()
+                pstats.Stats(profiler).sort_stats("tottime").print_stats(args.profile_lines)
+
+
+async def run(args):
+    client = make_client(args.uri, args.mongomock)
+    database = client[args.database]
+    collection = database["reminders"]
+    await collection.drop()
+    try:
+        await args.benchmark(collection, args)
+    finally:
+        if not args.keep:
+            await database.drop_collection("reminders")
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="reminders_benchmark", help="Base descartável (a coleção é apagada)")
+    parser.add_argument("--mongomock", action="store_true", help="Usar o mongomock em vez de um mongod")
+    parser.add_argument("--keep", action="store_true", help="Não apagar a coleção no fim")
+    subparsers = parser.add_subparsers(required=True)
+
+    lookup = subparsers.add_parser("lookup", help="Latência de busca por id, sem e com índices")
+    lookup.add_argument("--docs", type=int, default=1_000_000)
+    lookup.add_argument("--lookups", type=int, default=2000)
+    lookup.add_argument("--unindexed-lookups", type=int, default=50)
+    lookup.set_defaults(benchmark=benchmark_lookup)
+
+    update = subparsers.add_parser("update", help="Latência do PUT: três idas ao banco x find_one_and_update")
+    update.add_argument("--docs", type=int, default=100_000)
+    update.add_argument("--updates", type=int, default=2000)
+    update.set_defaults(benchmark=benchmark_update)
+
+    bulk = subparsers.add_parser("bulk", help="Itens/s de criar, atualizar e deletar: um a um x em lote")
+    bulk.add_argument("--items", type=int, default=50_000)
+    bulk.add_argument("--batch-size", type=int, default=1000)
+    bulk.set_defaults(benchmark=benchmark_bulk)
+
+    serialize = subparsers.add_parser("serialize", help="GET /reminders/: caminho padrão x stream=json/ndjson")
+    serialize.add_argument("--items", type=int, default=10_000)
+    serialize.add_argument("--repeat", type=int, default=5)
+    serialize.add_argument("--profile", action="store_true", help="Imprimir o perfil (cProfile) de cada modo")
+    serialize.add_argument("--profile-lines", type=int, default=15)
+    serialize.set_defaults(benchmark=benchmark_serialize)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+benchmark_weather.py
+====================
+Mede a latência por chamada da ferramenta get_forecast contra um servidor NWS
+falso local, comparando um httpx.AsyncClient novo por requisição (comportamento
+antigo) com o cliente compartilhado do weather.py.
+
+O servidor falso pode atrasar cada nova conexão (--connect-delay-ms) para simular
+o custo de DNS + TCP + TLS de uma conexão real com api.weather.gov.
+
+Run
+===
+uv run benchmark_weather.py --calls 50 --connect-delay-ms 40
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import weather
+
+
+def start_stub_server(connect_delay: float) -> tuple[ThreadingHTTPServer, str]:
+    """Sobe um servidor HTTP/1.1 com keep-alive que imita /points e /forecast."""
+
+    class StubNWSHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            # Executado uma vez por conexão: simula o handshake de uma conexão nova.
+            time.sleep(connect_delay)
+            super().setup()
+
+        def do_GET(self):
+            base = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+            if self.path.startswith("/points/"):
+                # Uma grade por coordenada, para que o cache de previsões não mascare a medição:
+                point = self.path.removeprefix("/points/")
+                payload = {"properties": {"forecast": f"{base}/gridpoints/TEST/{point}/forecast"}}
+            elif self.path.endswith("/forecast"):
+                period = {
+                    "name": "Tonight",
+                    "temperature": 20,
+                    "temperatureUnit": "C",
+                    "windSpeed": "5 mph",
+                    "windDirection": "N",
+                    "detailedForecast": "Clear.",
+                }
+                payload = {"properties": {"periods": [period] * 5}}
+            else:
+                payload = {"features": []}
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/geo+json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubNWSHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+async def request_with_new_client(url: str, ttl: float | None = None):
+    """Comportamento antigo: um AsyncClient (e uma conexão) novo por requisição, sem cache."""
+    headers = {"User-Agent": weather.USER_AGENT, "Accept": "application/geo+json"}
+    async with httpx.AsyncClient() as client:
+        try:
+            response = await client.get(url, headers=headers, timeout=30.0)
+            response.raise_for_status()
+            return response.json()
+        except Exception:
+            return None
+
+
+async def measure(calls: int) -> list[float]:
+    # Cache vazio e coordenadas distintas: cada chamada vai à rede (/points + /forecast).
+    weather.nws_cache = weather.NWSCache()
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await weather.get_forecast(38.0 + i * 0.01, -77.0)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summary(name: str, latencies: list[float]):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22}{statistics.mean(latencies):>10.2f}{statistics.median(latencies):>10.2f}{p95:>10.2f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50, help="Chamadas de get_forecast por cenário")
+    parser.add_argument("--connect-delay-ms", type=float, default=40.0, help="Atraso simulado por nova conexão")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.connect_delay_ms / 1000)
+    weather.NWS_API_BASE = base_url
+    print(f"Servidor NWS falso em {base_url} ({args.connect_delay_ms:.0f} ms por nova conexão)\n")
+    print(f"{'cenário (ms/chamada)':<22}{'média':>10}{'mediana':>10}{'p95':>10}")
+
+    try:
+        shared_request = weather.make_nws_request
+        weather.make_nws_request = request_with_new_client
+        summary("cliente por requisição", await measure(args.calls))
+
+        weather.make_nws_request = shared_request
+        summary("cliente compartilhado", await measure(args.calls))
+    finally:
+        await weather.close_http_client()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+#! /usr/bin/env python3
+"""
+Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+nws_cache.py
+============
+Cache em camadas para a API NWS usada pelo weather.py:
+
+- pontos: coordenadas arredondadas -> URL de previsão da grade. O mapeamento quase
+  nunca muda, então fica em cache de forma praticamente permanente;
+- respostas: payloads de previsões e alertas com TTL. Depois de expirar, a entrada é
+  revalidada com If-None-Match / If-Modified-Since (um 304 renova o TTL sem baixar
+  o payload novamente).
+
+Opcionalmente as duas camadas são gravadas em um arquivo SQLite, para que o cache
+sobreviva a reinicializações do servidor.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+COORDINATE_DECIMALS = 4  # Precisão aceita pela API /points
+MAX_MEMORY_RESPONSES = 1024
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CachedResponse:
+    payload: dict
+    etag: str | None
+    last_modified: str | None
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+def ttl_from_headers(headers, default_ttl: float) -> float:
+    """TTL a partir do Cache-Control: max-age da resposta ou o padrão."""
+    match = _MAX_AGE_PATTERN.search(headers.get("cache-control", ""))
+    return float(match.group(1)) if match else default_ttl
+
+
+def points_key(latitude: float, longitude: float) -> str:
+    return f"{latitude:.{COORDINATE_DECIMALS}f},{longitude:.{COORDINATE_DECIMALS}f}"
+
+
+class NWSCache:
+    """Cache de pontos e de respostas, em memória e opcionalmente em SQLite."""
+
+    def __init__(self, db_path: str | None = None, max_memory_responses: int = MAX_MEMORY_RESPONSES):
+        self.max_memory_responses = max_memory_responses
+        self._points = {}
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "points": {"hits": 0, "misses": 0},
+            "responses": {"hits": 0, "misses": 0, "revalidated": 0, "refreshed": 0},
+        }
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS points (
+                    key TEXT PRIMARY KEY,
+                    forecast_url TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expires_at REAL NOT NULL
+                );
+                """
+            )
+
+    # --- Camada de pontos ---
+    def get_forecast_url(self, latitude: float, longitude: float) -> str | None:
+        key = points_key(latitude, longitude)
+        with self._lock:
+            forecast_url = self._points.get(key)
+            if forecast_url is None and self._db is not None:
+                row = self._db.execute("SELECT forecast_url FROM points WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    forecast_url = self._points[key] = row[0]
+            self._stats["points"]["hits" if forecast_url else "misses"] += 1
+            return forecast_url
+
+    def set_forecast_url(self, latitude: float, longitude: float, forecast_url: str):
+        key = points_key(latitude, longitude)
+        with self._lock:
+            self._points[key] = forecast_url
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO points (key, forecast_url) VALUES (?, ?)",
+                        (key, forecast_url),
+                    )
+
+    # --- Camada de respostas ---
+    def get_response(self, url: str) -> CachedResponse | None:
+        """Entrada em cache para a URL (fresca ou não) ou None."""
+        with self._lock:
+            entry = self._responses.get(url)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT payload, etag, last_modified, expires_at FROM responses WHERE url = ?", (url,)
+                ).fetchone()
+                if row is not None:
+                    entry = CachedResponse(json.loads(row[0]), row[1], row[2], row[3])
+                    self._remember(url, entry)
+            if entry is not None:
+                self._responses.move_to_end(url)
+            return entry
+
+    def record_lookup(self, fresh_hit: bool):
+        with self._lock:
+            self._stats["responses"]["hits" if fresh_hit else "misses"] += 1
+
+    def set_response(self, url: str, payload: dict, etag: str | None, last_modified: str | None, ttl: float):
+        entry = CachedResponse(payload, etag, last_modified, time.time() + ttl)
+        with self._lock:
+            self._remember(url, entry)
+            self._stats["responses"]["refreshed"] += 1
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (url, payload, etag, last_modified, expires_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (url, json.dumps(payload), etag, last_modified, entry.expires_at),
+                    )
+
+    def renew_response(self, url: str, entry: CachedResponse, ttl: float):
+        """Renovar o TTL de uma entrada após uma revalidação com 304 Not Modified."""
+        entry.expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(url, entry)
+            self._stats["responses"]["revalidated"] += 1
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("UPDATE responses SET expires_at = ? WHERE url = ?", (entry.expires_at, url))
+
+    def _remember(self, url: str, entry: CachedResponse):
+        self._responses[url] = entry
+        self._responses.move_to_end(url)
+        while len(self._responses) > self.max_memory_responses:
+            self._responses.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Contadores e taxas de acerto de cada camada."""
+        with self._lock:
+            result = {}
+            for tier, counters in self._stats.items():
+                lookups = counters["hits"] + counters["misses"]
+                result[tier] = {**counters, "hit_ratio": counters["hits"] / lookups if lookups else 0.0}
+            result["points"]["entries"] = len(self._points)
+            result["responses"]["entries"] = len(self._responses)
+            result["persistent"] = self._db is not None
+            return result
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
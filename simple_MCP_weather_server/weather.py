@@ -1,29 +1,216 @@
 #! /usr/bin/env python3
 """
 Senior Data Scientist.: Dr. Eddy Giusepe Chirinos Isidro
+
+Todas as chamadas à API NWS compartilham um único httpx.AsyncClient (pool de
+conexões com keep-alive e HTTP/2 pelo pacote 'h2' do extra httpx[http2]), criado
+na inicialização do servidor e fechado no encerramento. Os limites do pool
+podem ser ajustados pelas variáveis de ambiente NWS_MAX_CONNECTIONS,
+NWS_MAX_KEEPALIVE_CONNECTIONS e NWS_KEEPALIVE_EXPIRY.
+
+As grades de /points e os payloads de previsões e alertas passam pelo cache do
+nws_cache.py (TTL com revalidação por ETag); defina NWS_CACHE_DB com o caminho de
+um arquivo SQLite para que o cache sobreviva a reinicializações.
 """
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 import httpx
-from mcp.server.fastmcp import FastMCP
-
-# Inicia servidor FastMCP:
-mcp = FastMCP("weather")
+from mcp.server.fastmcp import Context, FastMCP
+from nws_cache import NWSCache, points_key, ttl_from_headers
 
 # Constantes:
 NWS_API_BASE = "https://api.weather.gov"
 USER_AGENT = "weather-app/1.0"
+REQUEST_TIMEOUT = 30.0
 
+# Limites do pool de conexões:
+MAX_CONNECTIONS = int(os.environ.get("NWS_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("NWS_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.environ.get("NWS_KEEPALIVE_EXPIRY", "60"))
 
-async def make_nws_request(url: str) -> dict[str, Any] | None:
-    """Faz uma solicitação à API NWS com tratamento de erros apropriado."""
-    headers = {"User-Agent": USER_AGENT, "Accept": "application/geo+json"}
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
-            return None
+# TTL padrão (segundos) quando a resposta não traz Cache-Control: max-age:
+FORECAST_TTL = float(os.environ.get("NWS_FORECAST_TTL", "3600"))  # Previsões são atualizadas a cada hora
+ALERTS_TTL = float(os.environ.get("NWS_ALERTS_TTL", "60"))
+
+# Orçamentos padrão das ferramentas em lote (podem ser sobrescritos por chamada):
+BATCH_CONCURRENCY = int(os.environ.get("NWS_BATCH_CONCURRENCY", "8"))
+BATCH_TIMEOUT = float(os.environ.get("NWS_BATCH_TIMEOUT", "15"))
+BATCH_RETRIES = int(os.environ.get("NWS_BATCH_RETRIES", "2"))
+RETRY_BACKOFF = 0.5
+
+_http_client: httpx.AsyncClient | None = None
+nws_cache = NWSCache(os.environ.get("NWS_CACHE_DB"))
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Cria o cliente HTTP compartilhado com pool de conexões e keep-alive."""
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        headers={"User-Agent": USER_AGENT, "Accept": "application/geo+json"},
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Retorna o cliente compartilhado, criando-o se o servidor ainda não o fez."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+    return _http_client
+
+
+async def close_http_client():
+    """Fecha o cliente compartilhado e as conexões abertas."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Abre o pool de conexões na inicialização do servidor e o fecha no encerramento."""
+    get_http_client()
+    try:
+        yield
+    finally:
+        await close_http_client()
+
+
+# Inicia servidor FastMCP:
+mcp = FastMCP("weather", lifespan=lifespan)
+
+
+class TransientNWSError(Exception):
+    """Falha que pode passar numa nova tentativa: timeout, erro de transporte, 5xx ou 429."""
+
+
+def is_transient_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+async def make_nws_request(url: str, ttl: float | None = None) -> dict[str, Any] | None:
+    """Faz uma solicitação à API NWS com tratamento de erros apropriado.
+
+    Com `ttl`, a resposta é servida do cache enquanto estiver fresca; depois disso
+    é revalidada com If-None-Match / If-Modified-Since.
+    """
+    try:
+        return await request_nws(url, ttl)
+    except Exception:
+        return None
+
+
+async def request_nws(url: str, ttl: float | None = None) -> dict[str, Any] | None:
+    """Como make_nws_request, mas separando as falhas: retorna None nas permanentes
+    (ex.: 400/404 de um código de estado inválido) e levanta TransientNWSError nas
+    que valem uma nova tentativa.
+    """
+    client = get_http_client()
+    entry = nws_cache.get_response(url) if ttl is not None else None
+    if entry is not None and entry.is_fresh:
+        nws_cache.record_lookup(fresh_hit=True)
+        return entry.payload
+
+    headers = {}
+    if ttl is not None:
+        nws_cache.record_lookup(fresh_hit=False)
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+    try:
+        response = await client.get(url, headers=headers)
+    except httpx.TransportError as e:  # inclui os timeouts do httpx
+        raise TransientNWSError(str(e)) from e
+    except httpx.HTTPError:
+        return None
+    if response.status_code == 304 and entry is not None:
+        nws_cache.renew_response(url, entry, ttl_from_headers(response.headers, ttl))
+        return entry.payload
+    if response.is_error:
+        if is_transient_status(response.status_code):
+            raise TransientNWSError(f"HTTP {response.status_code} em {url}")
+        return None
+    try:
+        payload = response.json()
+    except ValueError:
+        return None
+
+    if ttl is not None:
+        nws_cache.set_response(
+            url,
+            payload,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            ttl=ttl_from_headers(response.headers, ttl),
+        )
+    return payload
+
+
+def alerts_url(state: str) -> str:
+    return f"{NWS_API_BASE}/alerts/active/area/{state.upper()}"
+
+
+def points_url(latitude: float, longitude: float) -> str:
+    return f"{NWS_API_BASE}/points/{points_key(latitude, longitude)}"
+
+
+def parse_location(location: dict) -> tuple[float, float]:
+    """Latitude e longitude de uma localização do lote (ValueError se faltarem ou não forem números)."""
+    try:
+        return float(location["latitude"]), float(location["longitude"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Localização inválida: informe 'latitude' e 'longitude' numéricas.") from None
+
+
+def format_alerts(data: dict | None) -> str:
+    """Formata a resposta de /alerts em texto legível."""
+    if not data or "features" not in data:
+        return "Não foi possível buscar alertas ou nenhum alerta encontrado."
+
+    if not data["features"]:
+        return "Nenhum alerta ativo para este estado."
+
+    alerts = [format_alert(feature) for feature in data["features"]]
+    return "\n---\n".join(alerts)
+
+
+def format_forecast(forecast_data: dict | None) -> str:
+    """Formata a resposta de /forecast em texto legível."""
+    if not forecast_data:
+        return "Não foi possível buscar previsão detalhada."
+
+    # Formata os períodos em uma previsão legível
+    periods = forecast_data["properties"]["periods"]
+    forecasts = []
+    for period in periods[:5]:  # Apenas mostrar os próximos 5 períodos
+        forecast = f"""
+{period['name']}:
+Temperatura: {period['temperature']}°{period['temperatureUnit']}
+Vento: {period['windSpeed']} {period['windDirection']}
+Previsão: {period['detailedForecast']}
+"""
+        forecasts.append(forecast)
+
+    return "\n---\n".join(forecasts)
 
 
 def format_alert(feature: dict) -> str:
@@ -45,17 +232,8 @@ async def get_alerts(state: str) -> str:
     Args:
         state: Código de estado dos EUA de dois dígitos (e.g. CA, NY)
     """
-    url = f"{NWS_API_BASE}/alerts/active/area/{state}"
-    data = await make_nws_request(url)
-
-    if not data or "features" not in data:
-        return "Não foi possível buscar alertas ou nenhum alerta encontrado."
-
-    if not data["features"]:
-        return "Nenhum alerta ativo para este estado."
-
-    alerts = [format_alert(feature) for feature in data["features"]]
-    return "\n---\n".join(alerts)
+    data = await make_nws_request(alerts_url(state), ttl=ALERTS_TTL)
+    return format_alerts(data)
 
 
 @mcp.tool()
@@ -66,33 +244,160 @@ async def get_forecast(latitude: float, longitude: float) -> str:
         latitude: Latitude da localização
         longitude: Longitude da localização
     """
-    # Primeiro, obtenha o endpoint de grade de previsão
-    points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    # Primeiro, obtenha o endpoint de grade de previsão (do cache de pontos, se possível)
+    forecast_url = nws_cache.get_forecast_url(latitude, longitude)
+    if forecast_url is None:
+        points_data = await make_nws_request(points_url(latitude, longitude))
 
-    if not points_data:
-        return "Unable to fetch forecast data for this location."
+        if not points_data:
+            return "Unable to fetch forecast data for this location."
 
-    # Obtenha o URL da previsão da resposta de pontos
-    forecast_url = points_data["properties"]["forecast"]
-    forecast_data = await make_nws_request(forecast_url)
+        # Obtenha o URL da previsão da resposta de pontos
+        forecast_url = points_data["properties"]["forecast"]
+        nws_cache.set_forecast_url(latitude, longitude, forecast_url)
 
-    if not forecast_data:
-        return "Não foi possível buscar previsão detalhada."
+    forecast_data = await make_nws_request(forecast_url, ttl=FORECAST_TTL)
+    return format_forecast(forecast_data)
 
-    # Formata os períodos em uma previsão legível
-    periods = forecast_data["properties"]["periods"]
-    forecasts = []
-    for period in periods[:5]:  # Apenas mostrar os próximos 5 períodos
-        forecast = f"""
-{period['name']}:
-Temperatura: {period['temperature']}°{period['temperatureUnit']}
-Vento: {period['windSpeed']} {period['windDirection']}
-Previsão: {period['detailedForecast']}
-"""
-        forecasts.append(forecast)
 
-    return "\n---\n".join(forecasts)
+async def fetch_with_budget(
+    url: str,
+    semaphore: asyncio.Semaphore,
+    timeout: float,
+    retries: int,
+    ttl: float | None = None,
+) -> dict[str, Any] | None:
+    """request_nws limitado pelo semáforo, com timeout e novas tentativas com backoff.
+
+    Só falhas transitórias (timeout, erro de transporte, 5xx, 429) são repetidas;
+    uma resposta 400/404 retorna None na hora, sem gastar o orçamento de tentativas.
+    """
+    for attempt in range(retries + 1):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(request_nws(url, ttl=ttl), timeout)
+            except (asyncio.TimeoutError, TransientNWSError):
+                pass
+        if attempt < retries:
+            await asyncio.sleep(RETRY_BACKOFF * 2**attempt)
+    return None
+
+
+@mcp.tool()
+async def get_alerts_batch(
+    states: list[str],
+    ctx: Context,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+    retries: int | None = None,
+) -> str:
+    """Obtém alertas meteorológicos para vários estados dos EUA de uma só vez.
+
+    As consultas rodam em paralelo (limitadas por `concurrency`) e os resultados
+    aparecem na ordem em que terminam, com progresso reportado ao cliente.
+
+    Args:
+        states: Lista de códigos de estado de dois dígitos (e.g. ["CA", "NY", "TX"])
+        concurrency: Máximo de requisições simultâneas, pelo menos 1 (padrão: NWS_BATCH_CONCURRENCY)
+        timeout: Tempo máximo por requisição em segundos (padrão: NWS_BATCH_TIMEOUT)
+        retries: Novas tentativas por requisição que falhar (padrão: NWS_BATCH_RETRIES)
+    """
+    concurrency = BATCH_CONCURRENCY if concurrency is None else concurrency
+    if concurrency < 1:
+        return "Erro: concurrency deve ser pelo menos 1."
+    semaphore = asyncio.Semaphore(concurrency)
+    timeout = timeout or BATCH_TIMEOUT
+    retries = BATCH_RETRIES if retries is None else retries
+    unique_states = list(dict.fromkeys(state.upper() for state in states))
+
+    async def fetch(state: str) -> tuple[str, dict | None]:
+        return state, await fetch_with_budget(alerts_url(state), semaphore, timeout, retries, ttl=ALERTS_TTL)
+
+    sections = []
+    for done, task in enumerate(asyncio.as_completed([fetch(state) for state in unique_states]), start=1):
+        state, data = await task
+        sections.append(f"### {state}\n{format_alerts(data)}")
+        await ctx.report_progress(done, len(unique_states), f"Alertas de {state} obtidos")
+
+    return "\n\n===\n\n".join(sections)
+
+
+@mcp.tool()
+async def get_forecast_batch(
+    locations: list[dict[str, float]],
+    ctx: Context,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+    retries: int | None = None,
+) -> str:
+    """Obtém previsões do tempo para várias localizações de uma só vez.
+
+    Localizações que caem no mesmo ponto de grade compartilham uma única consulta.
+    As consultas rodam em paralelo (limitadas por `concurrency`) e os resultados
+    aparecem na ordem em que terminam, com progresso reportado ao cliente.
+
+    Args:
+        locations: Lista de localizações, e.g. [{"latitude": 38.9, "longitude": -77.0}]
+        concurrency: Máximo de requisições simultâneas, pelo menos 1 (padrão: NWS_BATCH_CONCURRENCY)
+        timeout: Tempo máximo por requisição em segundos (padrão: NWS_BATCH_TIMEOUT)
+        retries: Novas tentativas por requisição que falhar (padrão: NWS_BATCH_RETRIES)
+    """
+    concurrency = BATCH_CONCURRENCY if concurrency is None else concurrency
+    if concurrency < 1:
+        return "Erro: concurrency deve ser pelo menos 1."
+    semaphore = asyncio.Semaphore(concurrency)
+    timeout = timeout or BATCH_TIMEOUT
+    retries = BATCH_RETRIES if retries is None else retries
+
+    # Coordenadas idênticas (após o arredondamento da API /points) são resolvidas uma vez;
+    # uma localização inválida vira um erro só dela, sem derrubar o lote:
+    points = {}
+    sections = []
+    for location in locations:
+        try:
+            latitude, longitude = parse_location(location)
+        except ValueError as e:
+            sections.append(f"### {location}\n{e}")
+            continue
+        points.setdefault(points_key(latitude, longitude), (latitude, longitude))
+
+    async def resolve(key: str, latitude: float, longitude: float) -> tuple[str, str | None]:
+        forecast_url = nws_cache.get_forecast_url(latitude, longitude)
+        if forecast_url is None:
+            points_data = await fetch_with_budget(points_url(latitude, longitude), semaphore, timeout, retries)
+            if points_data:
+                forecast_url = points_data["properties"]["forecast"]
+                nws_cache.set_forecast_url(latitude, longitude, forecast_url)
+        return key, forecast_url
+
+    resolved = await asyncio.gather(*(resolve(key, *coordinates) for key, coordinates in points.items()))
+
+    # Pontos diferentes podem cair na mesma grade de previsão: agrupar por URL.
+    keys_by_forecast_url = {}
+    for key, forecast_url in resolved:
+        if forecast_url is None:
+            sections.append(f"### {key}\nUnable to fetch forecast data for this location.")
+        else:
+            keys_by_forecast_url.setdefault(forecast_url, []).append(key)
+
+    async def fetch(forecast_url: str) -> tuple[str, dict | None]:
+        return forecast_url, await fetch_with_budget(forecast_url, semaphore, timeout, retries, ttl=FORECAST_TTL)
+
+    total = len(keys_by_forecast_url)
+    for done, task in enumerate(asyncio.as_completed([fetch(url) for url in keys_by_forecast_url]), start=1):
+        forecast_url, forecast_data = await task
+        text = format_forecast(forecast_data)
+        keys = keys_by_forecast_url[forecast_url]
+        sections.append(f"### {' | '.join(keys)}\n{text}")
+        await ctx.report_progress(done, total, f"Previsão para {', '.join(keys)} obtida")
+
+    return "\n\n===\n\n".join(sections)
+
+
+@mcp.tool()
+async def get_cache_stats() -> dict:
+    """Obtém as estatísticas do cache da API NWS (acertos, falhas e revalidações por camada)."""
+    return nws_cache.stats()
 
 
 if __name__ == "__main__":